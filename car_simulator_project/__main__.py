@@ -2,14 +2,79 @@ import sys
 
 from .car_simulator_interface.interface import CarSimulatorInterface
 
-def main():
-    """Main execution."""
+def parse_arguments(arguments: list[str]):
+    """Parse command line arguments.
+
+    Arguments:
+        arguments: (list[str]) Command line arguments.
+
+    Returns:
+        argparse.Namespace: Parsed arguments.
+    """
+    # Only imported when arguments are given, to keep plain launches fast.
+    import argparse
+    from .car_simulator_controller.admission import add_admission_arguments
+
+    parser = argparse.ArgumentParser(description="Auto Driving Car Simulation.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Report per-phase timings, step histogram, counters and allocations to stderr on exit.")
+    parser.add_argument("--profile-stats", metavar="FILE",
+                        help="Dump cProfile stats of the simulation runs to FILE. Implies --profile.")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="Serve metrics in Prometheus text format at http://127.0.0.1:PORT/metrics.")
+    parser.add_argument("--metrics-dump", metavar="FILE",
+                        help="Dump metrics as JSON to FILE periodically and on exit.")
+    add_admission_arguments(parser)
+    return parser.parse_args(arguments)
+
+def main(arguments: list[str] | None = None):
+    """Main execution.
+
+    Arguments:
+        arguments: (list[str]) Command line arguments, defaults to sys.argv.
+    """
+    arguments     = sys.argv[1:] if arguments is None else arguments
+    profile       = False
+    profile_stats = None
+    metrics_port  = None
+    metrics_dump  = None
+    admission     = None
+    if arguments:
+        parsed        = parse_arguments(arguments)
+        profile_stats = parsed.profile_stats
+        profile       = parsed.profile or bool(profile_stats)
+        metrics_port  = parsed.metrics_port
+        metrics_dump  = parsed.metrics_dump
+
+        from .car_simulator_controller.admission import create_admission
+        admission = create_admission(parsed)
+
     interface = CarSimulatorInterface()
-    interface.display()
+    registry  = None
+    if admission is not None:
+        interface.controller.set_admission(admission)
+    if metrics_port is not None or metrics_dump:
+        registry = interface.controller.enable_metrics()
+        if metrics_port is not None:
+            host, port = registry.serve(port = metrics_port)
+            print(f"Metrics served at http://{host}:{port}/metrics", file=sys.stderr)
+        if metrics_dump:
+            registry.start_dump(metrics_dump)
+    if profile:
+        interface.controller.enable_profiling(profile_stats)
+
+    try:
+        interface.display()
+    finally:
+        if registry is not None:
+            registry.close()
+        if profile:
+            import json
+            print(json.dumps(interface.controller.get_profile_report(), indent=2), file=sys.stderr)
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
         print("Program exited.")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
@@ -0,0 +1,269 @@
+import json
+import logging
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from .config                         import CONFIG_STARTUPRUNS, CONFIG_STARTUPBUDGET_SECONDS, CONFIG_SEED, CONFIG_BATCHSCENARIOS, \
+                                            CONFIG_BATCHCARS, CONFIG_BATCHCOMMANDS, CONFIG_MEMORYCARS, CONFIG_MEMORYCOMMANDS, \
+                                            CONFIG_THREADSCARS, CONFIG_THREADSCOMMANDS, CONFIG_THREADS, CONFIG_COSTSAMPLES
+from ..car_simulator.simulator       import CarSimulator
+from ..car_simulator.scenario        import Scenario, generate_random_scenario
+from ..car_simulator.batch_simulator import BatchSimulator, simulate_scenarios
+from ..car_simulator.packed_fleet    import PackedFleet
+from ..car_simulator.engine_enum     import Engine
+from ..car_simulator.thread_engine   import is_free_threaded
+from ..car_simulator_controller.admission import CostModel, CommandLengths
+from ..utility.position              import Vector2D, Direction
+
+def project_root() -> Path:
+    """Returns the directory containing the root package."""
+    return Path(__file__).parents[2]
+
+def measure_launch(code: str, runs: int) -> float:
+    """Measure the median wall time of launching an interpreter running code.
+
+    Arguments:
+        code: (str) Python code to run.
+        runs: (int) Number of launches.
+
+    Returns:
+        float: Median wall time in seconds.
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=project_root(), check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def benchmark_startup() -> dict:
+    """Benchmark startup time of the CLI entry point against its budget.
+
+    Returns:
+        dict: Benchmark result.
+    """
+    interpreter_seconds = measure_launch("pass", CONFIG_STARTUPRUNS)
+    launch_seconds      = measure_launch("import car_simulator_project.__main__", CONFIG_STARTUPRUNS)
+    import_seconds      = max(0.0, launch_seconds - interpreter_seconds)
+
+    return {
+        "name"               : "startup",
+        "interpreter_seconds": interpreter_seconds,
+        "launch_seconds"     : launch_seconds,
+        "import_seconds"     : import_seconds,
+        "budget_seconds"     : CONFIG_STARTUPBUDGET_SECONDS,
+        "within_budget"      : import_seconds <= CONFIG_STARTUPBUDGET_SECONDS,
+    }
+
+def create_logger() -> logging.Logger:
+    """Create a disabled logger for benchmarked simulators."""
+    logger = logging.getLogger(__name__)
+    logger.disabled = True
+    return logger
+
+def benchmark_batch() -> dict:
+    """Benchmark simulating many small scenarios one by one against one batch.
+
+    Returns:
+        dict: Benchmark result.
+    """
+    rng       = random.Random(CONFIG_SEED)
+    scenarios = [generate_random_scenario(rng, max_cars=CONFIG_BATCHCARS, max_commands=CONFIG_BATCHCOMMANDS)
+                 for _ in range(CONFIG_BATCHSCENARIOS)]
+    logger    = create_logger()
+
+    start = time.perf_counter()
+    for scenario in scenarios:
+        simulator = CarSimulator(logger)
+        simulator.set_world_dimension(scenario.dimension)
+        simulator.add_cars(scenario.create_cars())
+        simulator.simulate()
+        simulator.get_simulation_result()
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    simulate_scenarios(scenarios)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "name"          : "batch",
+        "scenarios"     : len(scenarios),
+        "serial_seconds": serial_seconds,
+        "batch_seconds" : batch_seconds,
+        "speedup"       : serial_seconds / batch_seconds,
+    }
+
+def measure_memory(function) -> tuple[int, int]:
+    """Measure memory allocated by a function.
+
+    Arguments:
+        function: (Callable[[], object]) Function to measure, its result is kept alive
+        until measured.
+
+    Returns:
+        tuple[int, int]: Bytes still allocated after the function and peak bytes allocated.
+    """
+    tracemalloc.start()
+    result = function()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak
+
+def benchmark_memory() -> dict:
+    """Benchmark memory of a large fleet as car objects against a packed fleet. The
+    cars are generated inside every measured run, so the command strings are counted.
+
+    Returns:
+        dict: Benchmark result, with bytes per car of each engine.
+    """
+    side      = int((CONFIG_MEMORYCARS * 16) ** 0.5)
+    dimension = Vector2D(side, side)
+
+    def generate_cars():
+        rng = random.Random(CONFIG_SEED)
+        for index, cell in enumerate(rng.sample(range(side * side), CONFIG_MEMORYCARS)):
+            yield (f"C{index}", Vector2D(cell % side, cell // side), rng.choice(list(Direction)),
+                   "".join(rng.choices("FFLR", k=CONFIG_MEMORYCOMMANDS)))
+
+    def run_objects():
+        simulator = CarSimulator(create_logger(), use_fast_forward = False)
+        simulator.set_engine(Engine.STEPWISE)
+        simulator.set_world_dimension(dimension)
+        simulator.add_cars(Scenario(dimension, list(generate_cars())).create_cars())
+        simulator.simulate()
+        return simulator
+
+    def run_packed():
+        fleet = PackedFleet()
+        for name, position, direction, commands in generate_cars():
+            fleet.add_car(0, name, position.x, position.y, direction, commands)
+        simulator = BatchSimulator()
+        simulator.add_fleet(dimension, fleet)
+        simulator.simulate()
+        return simulator
+
+    object_bytes, object_peak = measure_memory(run_objects)
+    packed_bytes, packed_peak = measure_memory(run_packed)
+
+    return {
+        "name"                : "memory",
+        "cars"                : CONFIG_MEMORYCARS,
+        "object_bytes_per_car": object_bytes / CONFIG_MEMORYCARS,
+        "object_peak_per_car" : object_peak  / CONFIG_MEMORYCARS,
+        "packed_bytes_per_car": packed_bytes / CONFIG_MEMORYCARS,
+        "packed_peak_per_car" : packed_peak  / CONFIG_MEMORYCARS,
+        "reduction"           : object_bytes / packed_bytes,
+    }
+
+def benchmark_threads() -> dict:
+    """Benchmark the thread pool engine against the serial stepwise engine. On an
+    interpreter with the GIL the moves are planned in one thread, so the speedup only
+    shows the overhead of the two phases.
+
+    Returns:
+        dict: Benchmark result.
+    """
+    rng       = random.Random(CONFIG_SEED)
+    side      = int((CONFIG_THREADSCARS * 16) ** 0.5)
+    dimension = Vector2D(side, side)
+    cells     = rng.sample(range(side * side), CONFIG_THREADSCARS)
+    scenario  = Scenario(dimension, [(f"C{index}", Vector2D(cell % side, cell // side), rng.choice(list(Direction)),
+                                      "".join(rng.choices("FFLR", k=CONFIG_THREADSCOMMANDS))) for index, cell in enumerate(cells)])
+
+    def run(engine: Engine) -> tuple[float, CarSimulator]:
+        simulator = CarSimulator(create_logger(), use_fast_forward = False, threads = CONFIG_THREADS)
+        simulator.set_engine(engine)
+        simulator.set_world_dimension(dimension)
+        simulator.add_cars(scenario.create_cars())
+        start = time.perf_counter()
+        simulator.simulate()
+        return time.perf_counter() - start, simulator
+
+    serial_seconds, serial    = run(Engine.STEPWISE)
+    threads_seconds, threaded = run(Engine.THREADS)
+
+    return {
+        "name"           : "threads",
+        "cars"           : CONFIG_THREADSCARS,
+        "threads"        : CONFIG_THREADS,
+        "free_threaded"  : is_free_threaded(),
+        "serial_seconds" : serial_seconds,
+        "threads_seconds": threads_seconds,
+        "speedup"        : serial_seconds / threads_seconds,
+        "matched"        : serial.get_simulation_result() == threaded.get_simulation_result(),
+    }
+
+def benchmark_cost() -> dict:
+    """Calibrate the cost model of admission control on runs of various fleet sizes,
+    command length distributions and field sizes, and measure its prediction errors.
+    The last sample is a few cars with enormous commands.
+
+    Returns:
+        dict: Benchmark result, with the calibrated model.
+    """
+    rng     = random.Random(CONFIG_SEED)
+    samples = []
+    for cars, max_commands, cells_per_car in CONFIG_COSTSAMPLES:
+        side      = int((cars * cells_per_car) ** 0.5)
+        dimension = Vector2D(side, side)
+        cells     = rng.sample(range(side * side), cars)
+        scenario  = Scenario(dimension, [(f"C{index}", Vector2D(cell % side, cell // side), rng.choice(list(Direction)),
+                                          "".join(rng.choices("FFLR", k=rng.randint(0, max_commands)))) for index, cell in enumerate(cells)])
+
+        def run(history: bool = False) -> CarSimulator:
+            simulator = CarSimulator(create_logger())
+            if history:
+                simulator.enable_history()
+            simulator.set_world_dimension(dimension)
+            simulator.add_cars(scenario.create_cars())
+            simulator.simulate()
+            return simulator
+
+        start   = time.perf_counter()
+        run()
+        seconds = time.perf_counter() - start
+        lengths = CommandLengths([len(commands) for _, _, _, commands in scenario.cars])
+        samples.append((lengths, side * side, seconds, measure_memory(run)[1], measure_memory(lambda: run(True))[1]))
+
+    history_bytes = max(sum(sample[4] - sample[3] for sample in samples) /
+                        sum(sample[0].get_car_steps(sample[0].get_max_steps()) for sample in samples), 0.0)
+    model         = CostModel.fit([sample[:4] for sample in samples], history_bytes)
+
+    errors = []
+    for lengths, area, seconds, bytes, _ in samples:
+        estimate = model.estimate(lengths, area)
+        errors.append({"cars": len(lengths), "max_commands": lengths.get_max_steps(), "area": area,
+                       "seconds_error": estimate.seconds / seconds - 1, "bytes_error": estimate.bytes / bytes - 1})
+
+    return {
+        "name"  : "cost",
+        "model" : model.to_dict(),
+        "errors": errors,
+    }
+
+BENCHMARKS = [benchmark_startup, benchmark_batch, benchmark_memory, benchmark_threads, benchmark_cost] # Benchmarks run by the benchmark suite.
+
+def run_benchmarks() -> list[dict]:
+    """Run all benchmarks.
+
+    Returns:
+        list[dict]: Benchmark results.
+    """
+    return [benchmark() for benchmark in BENCHMARKS]
+
+def main() -> int:
+    """Run all benchmarks and print results in JSON.
+
+    Returns:
+        int: Exit code, 1 if any benchmark exceeded its budget, otherwise 0.
+    """
+    results = run_benchmarks()
+    print(json.dumps(results, indent=2))
+
+    return 0 if all(result.get("within_budget", True) for result in results) else 1
@@ -0,0 +1,13 @@
+CONFIG_STARTUPRUNS           = 10   # Interpreter launches measured by the startup benchmark.
+CONFIG_STARTUPBUDGET_SECONDS = 0.05 # Import time budget of the CLI entry point above a bare interpreter.
+CONFIG_SEED                  = 0    # Random seed of generated benchmark scenarios.
+CONFIG_BATCHSCENARIOS        = 2000 # Scenarios simulated by the batch benchmark.
+CONFIG_BATCHCARS             = 10   # Max cars per scenario of the batch benchmark.
+CONFIG_BATCHCOMMANDS         = 100  # Max command length per car of the batch benchmark.
+CONFIG_MEMORYCARS            = 50_000  # Cars of the fleet measured by the memory benchmark.
+CONFIG_MEMORYCOMMANDS        = 20      # Command length per car of the memory benchmark.
+CONFIG_THREADSCARS           = 20_000  # Cars of the scenario stepped by the thread pool benchmark.
+CONFIG_THREADSCOMMANDS       = 50      # Command length per car of the thread pool benchmark.
+CONFIG_THREADS               = 4       # Threads of the thread pool benchmark.
+CONFIG_COSTSAMPLES           = ((500, 20, 16), (500, 200, 16), (5000, 20, 16), (5000, 100, 4),
+                                (2000, 50, 4096), (20, 20_000, 16)) # Cars, max command length and cells per car of the cost benchmark runs.
@@ -0,0 +1,464 @@
+from array       import array
+from collections import defaultdict
+from typing      import Iterator
+
+from .scenario          import Scenario
+from .packed_fleet      import PackedFleet, CONST_DIRECTIONS
+from .collision_enum    import CollisionMode
+from .occupancy_enum    import OccupancyBackend
+from .occupancy         import create_occupancy
+from .progress          import SimulationProgress, TimeSlicer
+from ..utility.position import Vector2D
+
+CONST_DELTAX     = (0, 1, 0, -1)   # x-axis move of each heading index.
+CONST_DELTAY     = (1, 0, -1, 0)   # y-axis move of each heading index.
+CONST_COMMANDL   = ord("L")        # Rotate left command byte.
+CONST_COMMANDR   = ord("R")        # Rotate right command byte.
+
+class BatchSimulator:
+    """Simulator of many scenarios in one pass.
+
+    Cars of all scenarios are stacked into a packed fleet with a scenario id axis, and
+    are stepped together in one loop. Positions are keyed by a cell id that is unique
+    across scenarios, so collisions stay separate per scenario. Results match running
+    every scenario in its own CarSimulator.
+
+    Simulation state is kept in arrays as well, so the batch simulator is also the
+    low-memory engine for very large fleets.
+
+    Attributes:
+        collision_mode: (CollisionMode) Collision detection mode of all scenarios.
+        occupancy_backend: (OccupancyBackend) Occupancy backend of cells.
+        widths: (array[int]) Field width of each scenario.
+        heights: (array[int]) Field height of each scenario.
+        cell_bases: (array[int]) First cell id of each scenario.
+        max_steps: (array[int]) Number of steps of each scenario, its longest command
+        length unless set.
+        scenario_starts: (array[int]) First car index of each scenario, and total number of cars.
+        fleet: (PackedFleet) Cars of all scenarios.
+        collided_steps: (array[int]) Collision step of each car, -1 if not collided.
+        collided_cars: (dict{int->list}) Map from collided car to the cars it collided with.
+        step_observer: (Callable[[int], None]) Called with the step after every simulated
+        step, None to disable.
+        steps: (int) Number of steps of the last simulation.
+    """
+
+    def __init__(self, collision_mode: CollisionMode = CollisionMode.CELL,
+                 occupancy_backend: OccupancyBackend = OccupancyBackend.HASH):
+        """Initialization.
+
+        Arguments:
+            collision_mode: (CollisionMode) Collision detection mode of all scenarios.
+            occupancy_backend: (OccupancyBackend) Occupancy backend of cells.
+        """
+        self.collision_mode    = collision_mode
+        self.occupancy_backend = occupancy_backend
+
+        # Scenario axis.
+        self.widths          = array("q")
+        self.heights         = array("q")
+        self.cell_bases      = array("q", [0])
+        self.max_steps       = array("q")
+        self.scenario_starts = array("q", [0])
+
+        # Car axis.
+        self.fleet           = PackedFleet()
+        self.collided_steps  = array("i")
+        self.collided_cars   = {}
+        self.step_observer   = None
+        self.steps           = 0
+
+    def add_scenario(self, scenario: Scenario) -> int:
+        """Add a validated scenario to the batch.
+
+        Arguments:
+            scenario: (Scenario) Scenario to be added.
+
+        Returns:
+            int: Scenario id.
+        """
+        scenario_id = self.add_dimension(scenario.dimension)
+        for name, position, direction, commands in scenario.cars:
+            self.fleet.add_car(scenario_id, name, position.x, position.y, direction, commands)
+
+        return self.end_scenario(scenario_id)
+
+    def add_fleet(self, dimension: Vector2D, fleet: PackedFleet, max_steps: int | None = None) -> int:
+        """Add a validated packed fleet as one scenario. The fleet is adopted without
+        copying when it is the first scenario of the batch.
+
+        Arguments:
+            dimension: (Vector2D) Width and height of the world field.
+            fleet: (PackedFleet) Cars of the scenario, all with scenario id 0.
+            max_steps: (int) Number of steps of the scenario, None for its longest command
+            length. A part of a larger scenario runs for the steps of the whole scenario.
+
+        Returns:
+            int: Scenario id.
+        """
+        scenario_id = self.add_dimension(dimension)
+        if scenario_id == 0:
+            self.fleet = fleet
+        else:
+            for car in range(len(fleet)):
+                self.fleet.add_car(scenario_id, fleet.get_name(car), fleet.xs[car], fleet.ys[car],
+                                   CONST_DIRECTIONS[fleet.headings[car]], fleet.get_commands(car))
+
+        return self.end_scenario(scenario_id, max_steps)
+
+    def add_dimension(self, dimension: Vector2D) -> int:
+        """Start a new scenario of a dimension.
+
+        Arguments:
+            dimension: (Vector2D) Width and height of the world field.
+
+        Returns:
+            int: Scenario id.
+        """
+        self.widths.append(dimension.x)
+        self.heights.append(dimension.y)
+        self.cell_bases.append(self.cell_bases[-1] + dimension.x * dimension.y)
+
+        return len(self.widths) - 1
+
+    def end_scenario(self, scenario_id: int, max_steps: int | None = None) -> int:
+        """End a scenario after its cars are added.
+
+        Arguments:
+            scenario_id: (int) Scenario id.
+            max_steps: (int) Number of steps of the scenario, None for its longest command length.
+
+        Returns:
+            int: Scenario id.
+        """
+        start = self.scenario_starts[-1]
+        if max_steps is None:
+            max_steps = max(map(self.fleet.get_command_length, range(start, len(self.fleet))), default=0)
+        self.max_steps.append(max_steps)
+        self.scenario_starts.append(len(self.fleet))
+
+        return scenario_id
+
+    def get_cell(self, car: int) -> int:
+        """Get the cell id of the current position of a car.
+
+        Arguments:
+            car: (int) Car index.
+
+        Returns:
+            int: Cell id unique across scenarios.
+        """
+        scenario_id = self.fleet.scenario_ids[car]
+        return self.cell_bases[scenario_id] + self.fleet.ys[car] * self.widths[scenario_id] + self.fleet.xs[car]
+
+    def simulate(self):
+        """Run simulation for all the scenarios together to the end.
+
+        Time Complexity: O(p*n), p is length of longest command, n is number of cars
+        of all scenarios.
+        """
+        for _ in self.simulate_iter():
+            pass
+
+    def simulate_iter(self, slice_steps: int | None = None, slice_ms: float | None = None,
+                      slicer: TimeSlicer | None = None) -> Iterator[SimulationProgress]:
+        """Run simulation for all the scenarios together, yielding the progress between
+        time slices.
+
+        Occupancy stores a single car index per cell, and a list only for cells with
+        several cars. Active cars are an array with alive flags, compacted when most
+        of them are retired.
+
+        Time Complexity: O(p*n), p is length of longest command, n is number of cars
+        of all scenarios.
+
+        Arguments:
+            slice_steps: (int) Steps per slice, None for no limit.
+            slice_ms: (float) Milliseconds per slice, None for no limit.
+            slicer: (TimeSlicer) Time slices of the run, instead of steps and milliseconds.
+
+        Yields:
+            SimulationProgress: Progress after every slice.
+        """
+        slicer = slicer or TimeSlicer(slice_steps, slice_ms)
+        fleet  = self.fleet
+        count  = len(fleet)
+
+        self.collided_steps = array("i", [-1]) * count
+        self.collided_cars  = {}
+        self.steps          = 0
+
+        occupancy = create_occupancy(self.occupancy_backend, self.cell_bases[-1])
+        for car in range(count):
+            self.add_occupant(occupancy, self.get_cell(car), car)
+
+        # Cars sorted by the step they run out of commands.
+        end_order = array("q", sorted(range(count), key=fleet.get_command_length))
+        end_index = 0
+
+        alive     = bytearray(b"\x01") * count
+        active    = array("q", range(count))
+        remaining = count
+        retired   = 0
+
+        dirty     = {}
+        crossings = defaultdict(set)
+        max_steps = max(self.max_steps, default=0)
+        for step in range(max_steps):
+            collided = self.update_collisions(step, occupancy, dirty, crossings, alive)
+
+            while end_index < count and fleet.get_command_length(end_order[end_index]) <= step:
+                car = end_order[end_index]
+                if alive[car]:
+                    alive[car] = 0
+                    collided  += 1
+                end_index += 1
+
+            remaining -= collided
+            retired   += collided
+            if not remaining:
+                break
+
+            if retired > len(active) // 2:
+                active  = array("q", (car for car in active if alive[car]))
+                retired = 0
+
+            dirty, crossings = self.simulate_step(step, occupancy, active, alive)
+            self.steps += 1
+
+            if self.step_observer:
+                self.step_observer(step)
+
+            if slicer.due():
+                yield SimulationProgress(step + 1, max_steps, remaining)
+                slicer.reset()
+
+    @staticmethod
+    def add_occupant(occupancy, cell: int, car: int):
+        """Add a car to a cell.
+
+        Arguments:
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            cell: (int) Cell id.
+            car: (int) Car index.
+        """
+        occupants = occupancy[cell]
+        if occupants is None:
+            occupancy[cell] = car
+        elif isinstance(occupants, list):
+            occupants.append(car)
+        else:
+            occupancy[cell] = [occupants, car]
+
+    @staticmethod
+    def remove_occupant(occupancy, cell: int, car: int):
+        """Remove a car from a cell.
+
+        Arguments:
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            cell: (int) Cell id.
+            car: (int) Car index.
+        """
+        occupants = occupancy[cell]
+        if isinstance(occupants, list):
+            occupants.remove(car)
+            if len(occupants) == 1:
+                occupancy[cell] = occupants[0]
+        else:
+            occupancy.clear_cell(cell)
+
+    @staticmethod
+    def get_occupants(occupancy, cell: int) -> list[int]:
+        """Get cars in a cell.
+
+        Arguments:
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            cell: (int) Cell id.
+
+        Returns:
+            list[int]: List of cars in the cell.
+        """
+        occupants = occupancy[cell]
+        if occupants is None:
+            return []
+        if isinstance(occupants, list):
+            return occupants
+        return [occupants]
+
+    def update_collisions(self, step: int, occupancy, dirty: dict, crossings: defaultdict, alive: bytearray) -> int:
+        """Update collisions in the cells entered during the previous step.
+
+        Collisions from the last step of a scenario are not detected, the same as a
+        scenario simulated on its own.
+
+        Arguments:
+            step: (int) Current simulating step.
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            dirty: (dict{int->int}) Map from cell id entered in the previous step to scenario id.
+            crossings: (defaultdict{int->set}) Map from car to cars it swapped cells with in the previous step.
+            alive: (bytearray) Flag of each car, 1 if currently simulating.
+
+        Returns:
+            int: Number of cars removed from simulation.
+        """
+        candidates = []
+        for cell, scenario_id in dirty.items():
+            occupants = occupancy[cell]
+            if isinstance(occupants, list) and step < self.max_steps[scenario_id]:
+                candidates.extend(occupants)
+        candidates.extend(car for car in crossings if step < self.max_steps[self.fleet.scenario_ids[car]])
+
+        removed = 0
+        for car in candidates:
+            if not alive[car]:
+                continue
+
+            others = self.get_collided_cars(car, occupancy, crossings)
+            self.collided_steps[car] = step
+            self.collided_cars[car]  = others
+
+            for other in others:
+                if self.collided_steps[other] < 0:
+                    self.collided_steps[other] = step
+                    self.collided_cars[other]  = self.get_collided_cars(other, occupancy, crossings)
+
+            alive[car] = 0
+            removed   += 1
+
+        return removed
+
+    def get_collided_cars(self, car: int, occupancy, crossings: defaultdict) -> list[int]:
+        """Get all the cars collided with a car.
+
+        Arguments:
+            car: (int) Car index.
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            crossings: (defaultdict{int->set}) Map from car to cars it swapped cells with.
+
+        Returns:
+            list[int]: List of cars in the same cell or swapped cells with the car.
+        """
+        others = [other for other in self.get_occupants(occupancy, self.get_cell(car)) if other != car]
+        if car in crossings:
+            others.extend(crossings[car].difference(others))
+        return others
+
+    def simulate_step(self, step: int, occupancy, active: array, alive: bytearray) -> tuple[dict, defaultdict]:
+        """Simulate the current step of all active cars.
+
+        Arguments:
+            step: (int) Current simulating step.
+            occupancy: (HashOccupancy | GridOccupancy) Car, or list of cars, of each cell.
+            active: (array[int]) Cars that may be simulating.
+            alive: (bytearray) Flag of each car, 1 if currently simulating.
+
+        Returns:
+            tuple[dict, defaultdict]: Map from cell id entered in this step to scenario id,
+            and map from car to cars it swapped cells with in this step.
+        """
+        fleet               = self.fleet
+        xs, ys, headings    = fleet.xs, fleet.ys, fleet.headings
+        buffer, offsets     = fleet.command_buffer, fleet.command_starts
+        scenario_ids        = fleet.scenario_ids
+        widths, heights     = self.widths, self.heights
+        cell_bases          = self.cell_bases
+        edge_mode           = self.collision_mode == CollisionMode.EDGE
+        add_occupant        = self.add_occupant
+        remove_occupant     = self.remove_occupant
+
+        dirty     = {}
+        edges     = {}
+        crossings = defaultdict(set)
+        for car in active:
+            if not alive[car]:
+                continue
+
+            command = buffer[offsets[car] + step]
+            if command == CONST_COMMANDL:
+                headings[car] = (headings[car] - 1) & 3
+            elif command == CONST_COMMANDR:
+                headings[car] = (headings[car] + 1) & 3
+            else:
+                scenario_id = scenario_ids[car]
+                heading     = headings[car]
+                x, y        = xs[car], ys[car]
+                new_x       = x + CONST_DELTAX[heading]
+                new_y       = y + CONST_DELTAY[heading]
+                width       = widths[scenario_id]
+                if not (0 <= new_x < width and 0 <= new_y < heights[scenario_id]):
+                    continue
+
+                old_cell = cell_bases[scenario_id] + y * width + x
+                new_cell = cell_bases[scenario_id] + new_y * width + new_x
+
+                remove_occupant(occupancy, old_cell, car)
+                add_occupant(occupancy, new_cell, car)
+                xs[car], ys[car] = new_x, new_y
+                dirty[new_cell]  = scenario_id
+
+                if edge_mode:
+                    edges[(old_cell, new_cell)] = car
+                    other = edges.get((new_cell, old_cell))
+                    if other is not None:
+                        crossings[car].add(other)
+                        crossings[other].add(car)
+
+        return dirty, crossings
+
+    # Results #
+
+    def get_current_status(self, car: int) -> str:
+        """Get car current status in string, the same format as Car.get_current_status.
+
+        Arguments:
+            car: (int) Car index.
+
+        Returns:
+            str: Current status of the car.
+        """
+        fleet    = self.fleet
+        name     = fleet.get_name(car)
+        position = f"({fleet.xs[car]},{fleet.ys[car]})"
+        if self.collided_steps[car] >= 0:
+            names = ",".join(sorted(fleet.get_name(other) for other in self.collided_cars[car]))
+            return f"{name}, collides with {names} at {position} at step {self.collided_steps[car]}"
+        return f"{name}, {position} {CONST_DIRECTIONS[fleet.headings[car]].name}"
+
+    def get_simulation_results(self) -> list[list[str]]:
+        """Return current status of all cars split per scenario.
+
+        Returns:
+            list[list[str]]: For every scenario, list of string of current simulation
+            status of its cars.
+        """
+        return [[f"- {self.get_current_status(car)}" for car in range(start, end)]
+                for start, end in zip(self.scenario_starts, self.scenario_starts[1:])]
+
+    def nbytes(self) -> int:
+        """Get memory used by the arrays of the batch, excluding transient simulation state.
+
+        Returns:
+            int: Number of bytes.
+        """
+        arrays = (self.widths, self.heights, self.cell_bases, self.max_steps, self.scenario_starts, self.collided_steps)
+        return self.fleet.nbytes() + sum(len(a) * a.itemsize for a in arrays)
+
+def simulate_scenarios(scenarios: list[Scenario], collision_mode: CollisionMode = CollisionMode.CELL,
+                       occupancy_backend: OccupancyBackend = OccupancyBackend.HASH) -> list[list[str]]:
+    """Simulate many scenarios in one batch.
+
+    Arguments:
+        scenarios: (list[Scenario]) Validated scenarios.
+        collision_mode: (CollisionMode) Collision detection mode of all scenarios.
+        occupancy_backend: (OccupancyBackend) Occupancy backend of cells.
+
+    Returns:
+        list[list[str]]: For every scenario, list of string of current simulation status of its cars.
+    """
+    simulator = BatchSimulator(collision_mode, occupancy_backend)
+    for scenario in scenarios:
+        simulator.add_scenario(scenario)
+
+    simulator.simulate()
+
+    return simulator.get_simulation_results()
@@ -13,6 +13,7 @@ class Car:
         initial_direction: (Direction) Initial forward direction of car.
         direction: (Direction) Current forward direction of car.
         commands: (list[Command]) Simulation commands of car.
+        initial_status: (str) Initial status of car, formatted on first use.
     """
 
     def __init__(self, name: str, position: Vector2D, direction: Direction, commands: list[Command]):
@@ -38,9 +39,22 @@ class Car:
         self.commands          = commands
 
         # Collision information.
-        self.collided_cars     = []   # List of collided cars.
+        self.collision_events  = ()   # Collision events shared with the collided cars.
         self.collided_step     = None # Collision at step.
 
+        # Initial status, formatted once as the initial state never changes.
+        self.initial_status    = None
+
+    def copy(self) -> Self:
+        """Copy the car, sharing its commands and collision events.
+
+        Returns:
+            Car: Copy of the car.
+        """
+        car = Car.__new__(Car)
+        car.__dict__.update(self.__dict__)
+        return car
+
     def get_new_forward_position(self) -> Vector2D:
         """Gets a new forward position in (x, y) by car's current position
         and forward direction.
@@ -64,7 +78,9 @@ class Car:
         Returns:
             str: Initial status of the car's name, position, direction and commands.
         """
-        return f"{self.name}, {self.initial_position} {self.initial_direction.name}, {Command.commands_to_string(self.commands)}"
+        if self.initial_status is None:
+            self.initial_status = f"{self.name}, {self.initial_position} {self.initial_direction.name}, {Command.commands_to_string(self.commands)}"
+        return self.initial_status
     
     def get_current_status(self) -> str:
         """Get car current status in string.
@@ -73,8 +89,8 @@ class Car:
             str: Current status of the car's name, position, direction and if it 
             has collided with other cars.
         """
-        if self.collided_cars:
-            return f"{self.name}, collides with {','.join(sorted(c.name for c in self.collided_cars))} at {self.position} at step {self.collided_step}"
+        if self.collision_events:
+            return f"{self.name}, collides with {self.get_collided_names()} at {self.position} at step {self.collided_step}"
         else:
             return f"{self.name}, {self.position} {self.direction.name}"
         
@@ -84,14 +100,38 @@ class Car:
         Returns:
             bool: True if collided with other cars, otherwise False.
         """
-        return len(self.collided_cars) > 0
+        return len(self.collision_events) > 0
+
+    @property
+    def collided_cars(self) -> list[Self]:
+        """Cars collided with this car, from its collision events.
+
+        Returns:
+            list[Car]: List of collided cars.
+        """
+        # Compared by name, events of a forked run may hold the car it was copied from.
+        if len(self.collision_events) == 1:
+            return [car for car in self.collision_events[0].members if car.name != self.name]
+        return list(dict.fromkeys(car for event in self.collision_events for car in event.members if car.name != self.name))
+
+    def get_collided_names(self) -> str:
+        """Get sorted names of collided cars in string, using the names sorted once per event.
+
+        Time Complexity: O(k), k is number of collided cars, for a car in one event.
+
+        Returns:
+            str: Comma separated names of collided cars.
+        """
+        if len(self.collision_events) == 1:
+            return ",".join(name for name in self.collision_events[0].get_sorted_names() if name != self.name)
+        return ",".join(sorted({car.name for car in self.collided_cars}))
 
-    def set_collision(self, collided_cars: list[Self], collided_step: int):
+    def set_collision(self, collision_events: tuple, collided_step: int):
         """Set collide information of car.
 
         Arguments:
-            collided_cars: (list[Car]) Cars collided with this car.
+            collision_events: (tuple[CollisionEvent]) Collision events of this car.
             collided_step: (int) Step of the collision.
         """
-        self.collided_cars = collided_cars
-        self.collided_step = collided_step
\ No newline at end of file
+        self.collision_events = collision_events
+        self.collided_step    = collided_step
\ No newline at end of file
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class CollisionMode(Enum):
+    """Collision detection modes."""
+
+    CELL: str = "Same cell"                    # Cars collide when ending a step in the same cell.
+    EDGE: str = "Same cell and edge crossing"  # Cars also collide when swapping cells head-on.
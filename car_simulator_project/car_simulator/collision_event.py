@@ -0,0 +1,140 @@
+from .world             import World
+from ..utility.position import Vector2D
+
+class CollisionEvent:
+    """A collision of cars in a cell, or of cars swapping cells head-on, at a step.
+
+    Every car in the event references the same event instead of holding its own list
+    of collided cars, so a pile-up of k cars costs O(k) memory.
+
+    Attributes:
+        position: (Vector2D) Cell of the collision. For a head-on swap, cell entered by
+        the first member.
+        step: (int) Step of the collision.
+        members: (list[Car]) Cars in the collision.
+        crossing: (bool) True if the cars swapped cells head-on.
+    """
+
+    def __init__(self, position: Vector2D, step: int, members: list, crossing: bool = False):
+        """Initialization.
+
+        Arguments:
+            position: (Vector2D) Cell of the collision.
+            step: (int) Step of the collision.
+            members: (list[Car]) Cars in the collision.
+            crossing: (bool) True if the cars swapped cells head-on.
+        """
+        self.position = position
+        self.step     = step
+        self.members  = members
+        self.crossing = crossing
+        self.names    = None
+        self.applied  = False # True once the collision is set on its members.
+
+    def get_sorted_names(self) -> list[str]:
+        """Get sorted names of the members, sorted once per event.
+
+        Returns:
+            list[str]: Sorted names of the members.
+        """
+        if self.names is None:
+            self.names = sorted(car.name for car in self.members)
+        return self.names
+
+class CollisionLog:
+    """Log of all the collision events of a simulation.
+
+    Attributes:
+        events: (list[CollisionEvent]) Collision events in order of detection.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.events          = []
+        self.cache_step      = None
+        self.cell_events     = {} # Map from position to event of the current step.
+        self.crossing_events = {} # Map from pair of cars to event of the current step.
+
+    def get_events(self, car, world: World, step: int) -> tuple[CollisionEvent, ...]:
+        """Get the collision events of a car at the current step, recording new events.
+
+        Time Complexity: O(k) for the first car of an event, k is number of its members,
+        then O(1).
+
+        Arguments:
+            car: (Car) Collided car.
+            world: (World) World of the car.
+            step: (int) Current simulating step.
+
+        Returns:
+            tuple[CollisionEvent]: Events of the cell and the head-on swaps of the car.
+        """
+        if self.cache_step != step:
+            self.cache_step = step
+            self.cell_events.clear()
+            self.crossing_events.clear()
+
+        events = []
+        if world.count_cars_at_position(car.position) >= 2:
+            event = self.cell_events.get(car.position)
+            if event is None:
+                event = CollisionEvent(car.position, step, world.get_cars_at_position(car.position))
+                self.cell_events[car.position] = event
+                self.events.append(event)
+            events.append(event)
+
+        for other in world.crossing_map.get(car, ()):
+            key   = frozenset((car, other))
+            event = self.crossing_events.get(key)
+            if event is None:
+                event = CollisionEvent(car.position, step, [car, other], crossing = True)
+                self.crossing_events[key] = event
+                self.events.append(event)
+            events.append(event)
+
+        return tuple(events)
+
+    # Exporters, their dependencies are only imported on export. #
+
+    def write_csv(self, file):
+        """Write the events as a car to event edge list in CSV, one row per member.
+
+        Arguments:
+            file: (TextIO) File opened for writing with newline="".
+        """
+        import csv
+
+        writer = csv.writer(file)
+        writer.writerow(["event", "step", "x", "y", "crossing", "car"])
+        for index, event in enumerate(self.events):
+            for name in event.get_sorted_names():
+                writer.writerow([index, event.step, event.position.x, event.position.y, int(event.crossing), name])
+
+    def to_node_link(self) -> dict:
+        """Convert the events to a bipartite graph of cars and events in node-link format.
+
+        Returns:
+            dict: Graph with car and event nodes, and a link from every car to its events.
+        """
+        nodes, links, cars = [], [], set()
+        for index, event in enumerate(self.events):
+            event_id = f"event:{index}"
+            nodes.append({"id": event_id, "type": "event", "step": event.step,
+                          "x": event.position.x, "y": event.position.y, "crossing": event.crossing})
+            for name in event.get_sorted_names():
+                if name not in cars:
+                    cars.add(name)
+                    nodes.append({"id": f"car:{name}", "type": "car", "name": name})
+                links.append({"source": f"car:{name}", "target": event_id})
+
+        return {"directed": False, "multigraph": False, "graph": {}, "nodes": nodes, "links": links}
+
+    def write_json(self, file):
+        """Write the events as a node-link graph in JSON.
+
+        Arguments:
+            file: (TextIO) File opened for writing.
+        """
+        import json
+
+        json.dump(self.to_node_link(), file)
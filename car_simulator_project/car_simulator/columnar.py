@@ -0,0 +1,182 @@
+import ast
+import mmap
+import sys
+from array   import array
+from pathlib import Path
+
+from .car          import Car
+from .components   import find_root
+from .packed_fleet import CONST_DIRECTIONS
+
+CONST_NPYMAGIC   = b"\x93NUMPY\x01\x00" # Magic string and version 1.0 of the .npy format.
+CONST_NPYALIGN   = 64                   # Alignment of the array data after the .npy header.
+CONST_NAMESFILE  = "names.txt"          # File of the car names, one per line.
+CONST_NPYDTYPES  = {"q": "<i8", "i": "<i4", "b": "|i1"}           # .npy dtype of each array typecode.
+CONST_COLUMNS    = {"x": "q", "y": "q", "heading": "b", "collided": "b",
+                    "collision_step": "q", "collision_group": "i"} # Typecode of each result column.
+
+def get_result_columns(cars: list[Car]) -> dict[str, array]:
+    """Get the final state of cars as aligned columns.
+
+    Headings are indices of the directions in N, E, S, W order. Collision step and
+    group are -1 for cars that have not collided. Cars of a collision event, directly
+    or through other events, share a collision group, numbered in order of the first
+    car of every group.
+
+    Time Complexity: O(n + k), n is number of cars, k is total number of members of
+    all the collision events.
+
+    Arguments:
+        cars: (list[Car]) Simulated cars.
+
+    Returns:
+        dict[str, array]: Map from column name to column.
+    """
+    columns  = {name: array(typecode) for name, typecode in CONST_COLUMNS.items()}
+    headings = {direction: heading for heading, direction in enumerate(CONST_DIRECTIONS)}
+
+    # Collision groups by union of the members of every collision event.
+    indices = {car.name: index for index, car in enumerate(cars)}
+    parents = list(range(len(cars)))
+    events  = set()
+    for car in cars:
+        for event in car.collision_events:
+            if id(event) in events:
+                continue
+            events.add(id(event))
+            root = find_root(parents, indices[event.members[0].name])
+            for member in event.members[1:]:
+                parents[find_root(parents, indices[member.name])] = root
+
+    groups = {}
+    for index, car in enumerate(cars):
+        columns["x"].append(car.position.x)
+        columns["y"].append(car.position.y)
+        columns["heading"].append(headings[car.direction])
+        if car.collision_events:
+            columns["collided"].append(1)
+            columns["collision_step"].append(car.collided_step)
+            columns["collision_group"].append(groups.setdefault(find_root(parents, index), len(groups)))
+        else:
+            columns["collided"].append(0)
+            columns["collision_step"].append(-1)
+            columns["collision_group"].append(-1)
+
+    return columns
+
+# Exporters #
+
+def write_columns(cars: list[Car], directory: str):
+    """Write the final state of cars as one .npy file per column and a file of the
+    car names, in order of the cars.
+
+    Arguments:
+        cars: (list[Car]) Simulated cars.
+        directory: (str) Output directory, created if missing.
+    """
+    path = Path(directory)
+    path.mkdir(parents = True, exist_ok = True)
+
+    for name, column in get_result_columns(cars).items():
+        write_npy(path / f"{name}.npy", column)
+
+    with open(path / CONST_NAMESFILE, "w", encoding = "utf-8") as file:
+        file.write("\n".join(car.name for car in cars))
+
+def write_npy(path: Path, column: array):
+    """Write a column in the .npy format, readable by numpy.load.
+
+    Arguments:
+        path: (Path) Output file.
+        column: (array) Column of 64-bit, 32-bit or 8-bit integers.
+    """
+    header = f"{{'descr': '{CONST_NPYDTYPES[column.typecode]}', 'fortran_order': False, 'shape': ({len(column)},), }}"
+    header = header.ljust(len(header) + -(len(CONST_NPYMAGIC) + 2 + len(header) + 1) % CONST_NPYALIGN) + "\n"
+
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+
+    with open(path, "wb") as file:
+        file.write(CONST_NPYMAGIC)
+        file.write(len(header).to_bytes(2, "little"))
+        file.write(header.encode("latin1"))
+        column.tofile(file)
+
+# Reader #
+
+class ResultColumns:
+    """Final state of simulated cars, read from memory-mapped column files without
+    parsing. Columns are read only memory views in order of the cars.
+
+    Attributes:
+        directory: (Path) Directory of the column files.
+        x: (memoryview) Final x positions.
+        y: (memoryview) Final y positions.
+        heading: (memoryview) Final headings, indices of the directions in N, E, S, W order.
+        collided: (memoryview) 1 if the car collided, otherwise 0.
+        collision_step: (memoryview) Step of the collision, -1 if not collided.
+        collision_group: (memoryview) Collision group of the car, -1 if not collided.
+    """
+
+    def __init__(self, directory: str):
+        """Initialization. Maps every column file.
+
+        Arguments:
+            directory: (str) Directory of the column files.
+
+        Raises:
+            ValueError: If a column file is not a .npy file of its column type.
+        """
+        self.directory  = Path(directory)
+        self.names_list = None
+        for name, typecode in CONST_COLUMNS.items():
+            setattr(self, name, read_npy(self.directory / f"{name}.npy", typecode))
+
+    def __len__(self) -> int:
+        """Number of cars."""
+        return len(self.x)
+
+    @property
+    def names(self) -> list[str]:
+        """Car names, read on first use.
+
+        Returns:
+            list[str]: Car names in order of the cars.
+        """
+        if self.names_list is None:
+            text            = (self.directory / CONST_NAMESFILE).read_text(encoding = "utf-8")
+            self.names_list = text.split("\n") if text or len(self) else []
+        return self.names_list
+
+def read_npy(path: Path, typecode: str) -> memoryview:
+    """Map a column written by write_npy.
+
+    Arguments:
+        path: (Path) Column file.
+        typecode: (str) Array typecode of the column.
+
+    Returns:
+        memoryview: Read only view of the column.
+
+    Raises:
+        ValueError: If the file is not a .npy file of the column type.
+    """
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) if path.stat().st_size else b""
+
+    if mapped[:len(CONST_NPYMAGIC)] != CONST_NPYMAGIC:
+        raise ValueError(f"{path} is not a .npy file of version 1.0.")
+
+    size   = int.from_bytes(mapped[len(CONST_NPYMAGIC):len(CONST_NPYMAGIC) + 2], "little")
+    start  = len(CONST_NPYMAGIC) + 2
+    header = ast.literal_eval(bytes(mapped[start:start + size]).decode("latin1"))
+    if header["descr"] != CONST_NPYDTYPES[typecode] or header["fortran_order"] or len(header["shape"]) != 1:
+        raise ValueError(f"{path} is not a column of {CONST_NPYDTYPES[typecode]}.")
+
+    view = memoryview(mapped)[start + size:]
+    if sys.byteorder == "big" and array(typecode).itemsize > 1:
+        column = array(typecode, view.tobytes())
+        column.byteswap()
+        return memoryview(column)
+    return view.cast(typecode)
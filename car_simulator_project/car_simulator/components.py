@@ -0,0 +1,141 @@
+import heapq
+from array import array
+
+from .car               import Car
+from .reach             import get_reach_box
+from .trajectory        import TemplateCache
+from .packed_fleet      import PackedFleet
+from .batch_simulator   import BatchSimulator
+from .collision_enum    import CollisionMode
+from .occupancy_enum    import OccupancyBackend
+from ..utility.position import Vector2D
+
+def find_components(cars: list[Car], dimension: Vector2D, templates: TemplateCache | None = None) -> list[list[int]]:
+    """Group cars into components of cars that may interact.
+
+    Two cars are joined if their reach boxes overlap, so cars of different components
+    can never share a position or swap positions. Boxes are swept along the x-axis and
+    joined with a union-find.
+
+    Time Complexity: O(n log n + k), n is number of cars, k is number of box pairs
+    overlapping on the x-axis.
+
+    Arguments:
+        cars: (list[Car]) Cars to group, including cars without remaining commands.
+        dimension: (Vector2D) Width and height of the world field.
+        templates: (TemplateCache) Templates of the commands, None to use the Manhattan
+        reach only.
+
+    Returns:
+        list[list[int]]: Car indices of every component, in order of their first car.
+    """
+    parents = list(range(len(cars)))
+    boxes   = sorted(((get_reach_box(car, dimension, templates = templates), index) for index, car in enumerate(cars)),
+                     key=lambda item: item[0][0])
+
+    active = []
+    for box, car in boxes:
+        min_x, min_y, _, max_y = box
+
+        # Drop boxes ending before the current box on the x-axis.
+        active = [(other_box, other) for other_box, other in active if other_box[2] >= min_x]
+
+        for other_box, other in active:
+            if other_box[1] <= max_y and min_y <= other_box[3]:
+                parents[find_root(parents, car)] = find_root(parents, other)
+
+        active.append((box, car))
+
+    components = {}
+    for car in range(len(cars)):
+        components.setdefault(find_root(parents, car), []).append(car)
+
+    return list(components.values())
+
+def find_root(parents: list[int], car: int) -> int:
+    """Find the root of the component of a car, halving the path on the way.
+
+    Arguments:
+        parents: (list[int]) Parent of every car in the union-find.
+        car: (int) Car index.
+
+    Returns:
+        int: Car index of the root.
+    """
+    while parents[car] != car:
+        parents[car] = parents[parents[car]]
+        car          = parents[car]
+    return car
+
+def split_groups(components: list[list[int]], weights: list[int], count: int) -> list[list[int]]:
+    """Split components into groups of similar weight, the heaviest component first
+    into the lightest group.
+
+    Arguments:
+        components: (list[list[int]]) Car indices of every component.
+        weights: (list[int]) Weight of every car.
+        count: (int) Max number of groups.
+
+    Returns:
+        list[list[int]]: Sorted car indices of every non-empty group.
+    """
+    groups = [(0, index, []) for index in range(max(1, min(count, len(components))))]
+    for component in sorted(components, key=lambda component: sum(weights[car] for car in component), reverse=True):
+        weight, index, group = heapq.heappop(groups)
+        group.extend(component)
+        heapq.heappush(groups, (weight + sum(weights[car] for car in component), index, group))
+
+    return [sorted(group) for _, _, group in sorted(groups, key=lambda item: item[1]) if group]
+
+def create_group_batch(dimension: Vector2D, fleet: PackedFleet, max_steps: int, collision_mode: CollisionMode,
+                       occupancy_backend: OccupancyBackend) -> BatchSimulator:
+    """Create the batch simulator of a group of components.
+
+    The group runs for the steps of the whole scenario, so collisions after the last
+    command of the group are detected the same as in a run of all the cars.
+
+    Arguments:
+        dimension: (Vector2D) Width and height of the world field.
+        fleet: (PackedFleet) Cars of the group.
+        max_steps: (int) Longest command length of the whole scenario.
+        collision_mode: (CollisionMode) Collision detection mode.
+        occupancy_backend: (OccupancyBackend) Occupancy backend of cells.
+
+    Returns:
+        BatchSimulator: Batch simulator of the group.
+    """
+    batch = BatchSimulator(collision_mode, occupancy_backend)
+    batch.add_fleet(dimension, fleet, max_steps)
+    return batch
+
+def get_group_results(batch: BatchSimulator) -> tuple[array, array, array, array, dict, int]:
+    """Get the results of a simulated group.
+
+    Arguments:
+        batch: (BatchSimulator) Simulated batch simulator of the group.
+
+    Returns:
+        tuple[array, array, array, array, dict, int]: x positions, y positions, headings,
+        collision steps, collided cars and number of steps.
+    """
+    fleet = batch.fleet
+    return fleet.xs, fleet.ys, fleet.headings, batch.collided_steps, batch.collided_cars, batch.steps
+
+def simulate_group(dimension: Vector2D, fleet: PackedFleet, max_steps: int, collision_mode: CollisionMode,
+                   occupancy_backend: OccupancyBackend) -> tuple[array, array, array, array, dict, int]:
+    """Simulate a group of components. Runs in a worker process.
+
+    Arguments:
+        dimension: (Vector2D) Width and height of the world field.
+        fleet: (PackedFleet) Cars of the group.
+        max_steps: (int) Longest command length of the whole scenario.
+        collision_mode: (CollisionMode) Collision detection mode.
+        occupancy_backend: (OccupancyBackend) Occupancy backend of cells.
+
+    Returns:
+        tuple[array, array, array, array, dict, int]: x positions, y positions, headings,
+        collision steps, collided cars and number of steps.
+    """
+    batch = create_group_batch(dimension, fleet, max_steps, collision_mode, occupancy_backend)
+    batch.simulate()
+    return get_group_results(batch)
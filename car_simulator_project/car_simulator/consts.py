@@ -1,2 +1,19 @@
 CONST_MINWIDTH  = 1 # Min width of field.
-CONST_MINHEIGHT = 1 # Min height of field.
\ No newline at end of file
+CONST_MINHEIGHT = 1 # Min height of field.
+
+CONST_INDEXSAMPLESTEPS = 64 # Steps between samples of the world index size.
+
+CONST_HISTORYBUCKETSTEPS = 32        # Steps per time bucket of the history index.
+CONST_HISTORYBUCKETCELLS = 32        # Cells per side of a spatial bucket of the history index.
+CONST_HISTORYMAXSEGMENTS = 1_000_000 # Default maximum number of segments stored by the history index.
+
+CONST_PLANSMALLWORK        = 10_000  # Car steps below which the stepwise engine is used.
+CONST_PLANISOLATEDFRACTION = 0.97    # Expected fraction of isolated cars above which they are fast-forwarded.
+CONST_PLANGRIDCELLS        = 1 << 20 # Field area up to which the grid occupancy is always used.
+CONST_PLANGRIDMAXCELLS     = 1 << 24 # Field area up to which the grid occupancy is used for dense fields.
+CONST_PLANGRIDCELLSPERCAR  = 64      # Field area per car up to which a field is dense.
+CONST_PLANPACKEDCELLS      = 1 << 63 # Field area below which cell ids fit the 64-bit arrays of the packed engines.
+
+CONST_COMPONENTGROUPSPERWORKER = 4 # Groups of components per worker of the components engine.
+
+CONST_THREADMINCARS = 1024 # Live cars below which the moves of a step are planned in one thread.
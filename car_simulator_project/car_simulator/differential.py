@@ -0,0 +1,397 @@
+import logging
+import random
+import sys
+
+from .simulator         import CarSimulator
+from .batch_simulator   import BatchSimulator
+from .scenario          import Scenario, generate_random_scenario
+from .collision_enum    import CollisionMode
+from .engine_enum       import Engine
+from .occupancy_enum    import OccupancyBackend
+from ..utility.position import Vector2D, Direction
+
+CONST_HEADINGS = {direction: index for index, direction in enumerate(Direction)} # Heading index of each direction.
+
+class Divergence:
+    """First divergence between the reference engine and an alternate engine.
+
+    Attributes:
+        engine: (str) Name of the alternate engine.
+        case: (int) Index of the random case, reproducible from the seed.
+        collision_mode: (CollisionMode) Collision detection mode of the case.
+        step: (int) First step where the state hashes differ, None if only the final results differ.
+        scenario: (Scenario) Shrunk scenario still diverging.
+        expected: (list[str]) Final results of the reference engine for the shrunk scenario.
+        actual: (list[str]) Final results of the alternate engine for the shrunk scenario.
+    """
+
+    def __init__(self, engine: str, case: int, collision_mode: CollisionMode, step: int | None,
+                 scenario: Scenario, expected: list[str], actual: list[str]):
+        """Initialization.
+
+        Arguments:
+            engine: (str) Name of the alternate engine.
+            case: (int) Index of the random case.
+            collision_mode: (CollisionMode) Collision detection mode of the case.
+            step: (int) First step where the state hashes differ, None if only the final results differ.
+            scenario: (Scenario) Shrunk scenario still diverging.
+            expected: (list[str]) Final results of the reference engine.
+            actual: (list[str]) Final results of the alternate engine.
+        """
+        self.engine         = engine
+        self.case           = case
+        self.collision_mode = collision_mode
+        self.step           = step
+        self.scenario       = scenario
+        self.expected       = expected
+        self.actual         = actual
+
+    def __repr__(self):
+        """Debug purposes.
+
+        Returns:
+            str: Divergence report.
+        """
+        return (f"Engine {self.engine} diverged on case {self.case} ({self.collision_mode.name}) at step {self.step}.\n"
+                f"{self.scenario}\nExpected: {self.expected}\nActual:   {self.actual}")
+
+# Engines #
+
+def create_logger() -> logging.Logger:
+    """Create a disabled logger for simulators under test."""
+    logger = logging.getLogger(__name__)
+    logger.disabled = True
+    return logger
+
+def run_reference(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the reference step by step CarSimulator loop.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) List to append the state hash of every step to, None to skip.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    return run_car_simulator(scenario, collision_mode, trace, use_fast_forward = False)
+
+def run_fast_forward(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the CarSimulator with isolated cars fast-forwarded.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) List to append the state hash of every step to, None to skip.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    return run_car_simulator(scenario, collision_mode, trace, use_fast_forward = True)
+
+def run_threads(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the CarSimulator with the moves of every step planned then merged, by a thread
+    pool on a free-threaded interpreter.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) List to append the state hash of every step to, None to skip.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    return run_car_simulator(scenario, collision_mode, trace, use_fast_forward = False, engine = Engine.THREADS)
+
+def run_car_simulator(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None,
+                      use_fast_forward: bool, engine: Engine | None = None) -> list[str]:
+    """Run the CarSimulator.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) List to append the state hash of every step to, None to skip.
+        use_fast_forward: (bool) True to run the commands of isolated cars at once.
+        engine: (Engine) Stepping engine, None for the stepwise or fast-forward engine.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    if engine is None:
+        engine = Engine.FAST_FORWARD if use_fast_forward else Engine.STEPWISE
+
+    simulator = CarSimulator(create_logger(), collision_mode, use_fast_forward, threads = 2)
+    simulator.set_engine(engine)
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+
+    if trace is not None:
+        cars = simulator.world.cars
+        simulator.step_observer = lambda step: trace.append(hash(tuple(
+            (car.position.x, car.position.y, CONST_HEADINGS[car.direction],
+             -1 if car.collided_step is None else car.collided_step) for car in cars)))
+
+    simulator.simulate()
+
+    return simulator.get_simulation_result()
+
+def run_batch(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the BatchSimulator on a batch of one scenario.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) List to append the state hash of every step to, None to skip.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    simulator = BatchSimulator(collision_mode)
+    simulator.add_scenario(scenario)
+
+    if trace is not None:
+        fleet = simulator.fleet
+        simulator.step_observer = lambda step: trace.append(hash(tuple(
+            zip(fleet.xs, fleet.ys, fleet.headings, simulator.collided_steps))))
+
+    simulator.simulate()
+
+    return simulator.get_simulation_results()[0]
+
+def run_car_simulator_batch(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the CarSimulator on the batch engine with a grid occupancy, with results
+    written back to the cars.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) Not supported, the cars are only updated at the end.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    simulator = CarSimulator(create_logger(), collision_mode)
+    simulator.set_engine(Engine.BATCH, OccupancyBackend.GRID)
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+    simulator.simulate()
+
+    return simulator.get_simulation_result()
+
+def run_car_simulator_components(scenario: Scenario, collision_mode: CollisionMode, trace: list[int] | None) -> list[str]:
+    """Run the CarSimulator on the components engine in this process, with results
+    written back to the cars.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        trace: (list[int]) Not supported, the cars are only updated at the end.
+
+    Returns:
+        list[str]: Final simulation results.
+    """
+    simulator = CarSimulator(create_logger(), collision_mode)
+    simulator.set_engine(Engine.COMPONENTS)
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+    simulator.simulate()
+
+    return simulator.get_simulation_result()
+
+# Alternate engines by name, with True if its steps can be compared with the reference engine.
+ENGINES = {
+    "batch"          : (run_batch,                    True),
+    "fast_forward"   : (run_fast_forward,             False),
+    "simulator_batch": (run_car_simulator_batch,      False),
+    "components"     : (run_car_simulator_components, False),
+    "threads"        : (run_threads,                  True),
+}
+
+# Harness #
+
+def generate_case(rng: random.Random) -> Scenario:
+    """Generate a random scenario biased towards dense collisions, wall bumps and pile-ups.
+
+    Arguments:
+        rng: (random.Random) Random number generator.
+
+    Returns:
+        Scenario: Random scenario.
+    """
+    match rng.randrange(4):
+        case 0: # Dense small field, many collisions and pile-ups.
+            return generate_random_scenario(rng, 3, 3, 9, 12)
+        case 1: # Corridor, head-on swaps and wall bumps.
+            return generate_random_scenario(rng, 1, 8, 8, 12)
+        case 2: # Mid density.
+            return generate_random_scenario(rng, 6, 6, 12, 20)
+        case _: # Sparse field, isolated cars.
+            return generate_random_scenario(rng, 30, 30, 6, 30)
+
+def compare(scenario: Scenario, collision_mode: CollisionMode, engine: str) -> tuple[int | None, list[str], list[str]] | None:
+    """Run the reference engine and an alternate engine side by side.
+
+    Arguments:
+        scenario: (Scenario) Scenario to simulate.
+        collision_mode: (CollisionMode) Collision detection mode.
+        engine: (str) Name of the alternate engine.
+
+    Returns:
+        tuple[int, list[str], list[str]]: First diverging step, None if only the final
+        results differ, with the reference and alternate final results. None if both match.
+    """
+    run_engine, stepwise = ENGINES[engine]
+
+    expected_trace = [] if stepwise else None
+    actual_trace   = [] if stepwise else None
+    expected       = run_reference(scenario, collision_mode, expected_trace)
+    actual         = run_engine(scenario, collision_mode, actual_trace)
+
+    if stepwise and expected_trace != actual_trace:
+        step = next((step for step, (a, b) in enumerate(zip(expected_trace, actual_trace)) if a != b),
+                    min(len(expected_trace), len(actual_trace)))
+        return step, expected, actual
+
+    if expected != actual:
+        return None, expected, actual
+
+    return None
+
+def shrink(scenario: Scenario, collision_mode: CollisionMode, engine: str) -> Scenario:
+    """Shrink a diverging scenario to a minimal case that still diverges.
+
+    Cars are removed, commands are truncated and removed, and the field is narrowed
+    until no smaller candidate diverges.
+
+    Arguments:
+        scenario: (Scenario) Diverging scenario.
+        collision_mode: (CollisionMode) Collision detection mode.
+        engine: (str) Name of the alternate engine.
+
+    Returns:
+        Scenario: Minimal diverging scenario.
+    """
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for candidate in shrink_candidates(scenario):
+            if compare(candidate, collision_mode, engine) is not None:
+                scenario, shrunk = candidate, True
+                break
+
+    return scenario
+
+def shrink_candidates(scenario: Scenario):
+    """Generate smaller candidates of a scenario, the most aggressive first.
+
+    Arguments:
+        scenario: (Scenario) Scenario to shrink.
+
+    Yields:
+        Scenario: Smaller scenario.
+    """
+    cars = scenario.cars
+
+    # Remove a car.
+    for index in range(len(cars)):
+        yield Scenario(scenario.dimension, cars[:index] + cars[index + 1:])
+
+    # Halve, then remove a command of a car.
+    for index, (name, position, direction, commands) in enumerate(cars):
+        for shorter in [commands[:len(commands) // 2]] + [commands[:i] + commands[i + 1:] for i in range(len(commands))]:
+            yield Scenario(scenario.dimension, cars[:index] + [(name, position, direction, shorter)] + cars[index + 1:])
+
+    # Narrow the field.
+    for dimension in (Vector2D(scenario.dimension.x - 1, scenario.dimension.y),
+                      Vector2D(scenario.dimension.x, scenario.dimension.y - 1)):
+        if all(position.x < dimension.x and position.y < dimension.y for _, position, _, _ in cars) and \
+           dimension.x > 0 and dimension.y > 0:
+            yield Scenario(dimension, cars)
+
+def run_differential(engine: str, cases: int, seed: int = 0, start: int = 0) -> Divergence | None:
+    """Run randomized cases on the reference engine and an alternate engine.
+
+    Every case is seeded by its index, so any case can be reproduced on its own.
+
+    Arguments:
+        engine: (str) Name of the alternate engine.
+        cases: (int) Number of cases to run.
+        seed: (int) Random seed of the cases.
+        start: (int) Index of the first case.
+
+    Returns:
+        Divergence: First divergence with its shrunk scenario, None if all cases match.
+    """
+    for case in range(start, start + cases):
+        rng            = random.Random(seed * 1_000_000_007 + case)
+        scenario       = generate_case(rng)
+        collision_mode = rng.choice(list(CollisionMode))
+
+        if compare(scenario, collision_mode, engine) is None:
+            continue
+
+        scenario = shrink(scenario, collision_mode, engine)
+        step, expected, actual = compare(scenario, collision_mode, engine)
+        return Divergence(engine, case, collision_mode, step, scenario, expected, actual)
+
+    return None
+
+def run_differential_parallel(engine: str, cases: int, seed: int = 0, workers: int | None = None) -> Divergence | None:
+    """Run randomized cases split across worker processes.
+
+    Arguments:
+        engine: (str) Name of the alternate engine.
+        cases: (int) Number of cases to run.
+        seed: (int) Random seed of the cases.
+        workers: (int) Number of worker processes, defaults to number of CPUs.
+
+    Returns:
+        Divergence: Divergence of the lowest diverging case, None if all cases match.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from os                 import cpu_count
+
+    workers = workers or cpu_count() or 1
+    chunk   = -(-cases // workers)
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(run_differential, engine, min(chunk, cases - start), seed, start)
+                   for start in range(0, cases, chunk)]
+        divergences = [future.result() for future in futures]
+
+    return next((divergence for divergence in divergences if divergence is not None), None)
+
+def main(arguments: list[str] | None = None) -> int:
+    """Run the differential harness from the command line.
+
+    Arguments:
+        arguments: (list[str]) Command line arguments, defaults to sys.argv.
+
+    Returns:
+        int: Exit code, 1 if any engine diverged, otherwise 0.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Differential testing of simulator engines against the reference engine.")
+    parser.add_argument("--engine",  choices=list(ENGINES), action="append", help="Engine to test, defaults to all.")
+    parser.add_argument("--cases",   type=int, default=10_000, help="Number of random cases per engine.")
+    parser.add_argument("--seed",    type=int, default=0,      help="Random seed of the cases.")
+    parser.add_argument("--workers", type=int, default=1,      help="Number of worker processes.")
+    arguments = parser.parse_args(sys.argv[1:] if arguments is None else arguments)
+
+    status = 0
+    for engine in arguments.engine or list(ENGINES):
+        if arguments.workers > 1:
+            divergence = run_differential_parallel(engine, arguments.cases, arguments.seed, arguments.workers)
+        else:
+            divergence = run_differential(engine, arguments.cases, arguments.seed)
+
+        if divergence is None:
+            print(f"Engine {engine}: {arguments.cases} cases matched.")
+        else:
+            print(divergence)
+            status = 1
+
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+from enum import Enum
+
+class Engine(Enum):
+    """Simulation engines of the car simulator."""
+
+    STEPWISE: str     = "Step by step"                   # Every car stepped on the world.
+    FAST_FORWARD: str = "Step by step with fast-forward" # Isolated cars run in closed form first.
+    BATCH: str        = "Batch on packed arrays"         # Cars packed and stepped by the batch engine.
+    COMPONENTS: str   = "Components on packed arrays"    # Groups of interacting cars stepped apart, in worker processes.
+    THREADS: str      = "Step by step on a thread pool"  # Moves of every step planned by threads, then merged.
@@ -0,0 +1,64 @@
+from itertools import groupby
+
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+def compile_segments(commands: list[Command]) -> list[tuple[int, int]]:
+    """Compile commands into segments of a net rotation followed by a forward run.
+
+    Time Complexity: O(p), p is length of commands.
+
+    Arguments:
+        commands: (list[Command]) Car commands.
+
+    Returns:
+        list[tuple[int, int]]: List of (right quarter turns, forward moves) segments.
+    """
+    segments = []
+    turns    = 0
+    for command, run in groupby(commands):
+        length = sum(1 for _ in run)
+        match command:
+            case Command.L:
+                turns -= length
+            case Command.R:
+                turns += length
+            case Command.F:
+                segments.append((turns % 4, length))
+                turns = 0
+
+    if turns % 4:
+        segments.append((turns % 4, 0))
+
+    return segments
+
+def fast_forward(position: Vector2D, direction: Direction, commands: list[Command], 
+                 dimension: Vector2D) -> tuple[Vector2D, Direction]:
+    """Compute the final position and direction of a car running its commands alone.
+
+    Every forward run is applied at once and clamped at the field bounds, which is 
+    the same as moving one step at a time and failing the moves beyond the bounds.
+
+    Time Complexity: O(p), p is length of commands. O(s) when segments are compiled,
+    s is number of forward runs.
+
+    Arguments:
+        position: (Vector2D) Position of car.
+        direction: (Direction) Forward direction of car.
+        commands: (list[Command]) Remaining commands of car.
+        dimension: (Vector2D) Width and height of the world field.
+
+    Returns:
+        tuple[Vector2D, Direction]: Final position and direction of car.
+    """
+    directions = list(Direction)
+    heading    = directions.index(direction)
+    x, y       = position.x, position.y
+
+    for turns, forward in compile_segments(commands):
+        heading = (heading + turns) % 4
+        vector  = Direction.to_vector(directions[heading])
+        x = min(max(x + vector.x * forward, 0), dimension.x - 1)
+        y = min(max(y + vector.y * forward, 0), dimension.y - 1)
+
+    return Vector2D(x, y), directions[heading]
@@ -0,0 +1,257 @@
+from bisect      import bisect_left
+from collections import defaultdict
+
+from .car               import Car
+from .consts            import CONST_HISTORYBUCKETSTEPS, CONST_HISTORYBUCKETCELLS, CONST_HISTORYMAXSEGMENTS
+from ..utility.position import Vector2D
+
+class HistoryIndex:
+    """Spatial-temporal index of car positions over a simulation.
+
+    The history of every car is stored as segments of constant velocity. A car at
+    time t of a segment (t0, t1, x, y, dx, dy) is at (x + dx*(t-t0), y + dy*(t-t0)).
+    Time t is the state after t simulated steps, time 0 is the initial state.
+
+    Moving segments are split at time bucket boundaries and indexed by time bucket
+    and spatial bucket. Stationary segments are indexed once by spatial bucket and the
+    time bucket they start in, sorted by end time, so a parked car costs one entry
+    however long it stays, and queries skip the segments that ended before their start.
+
+    Attributes:
+        bucket_steps: (int) Number of steps per time bucket.
+        bucket_cells: (int) Number of cells per side of a spatial bucket.
+        max_segments: (int) Maximum number of stored segments. The oldest segments are
+        evicted first when exceeded.
+        segments: (dict{int->tuple}) Map from segment id to segment in (name, t0, t1, x, y, dx, dy).
+        moving_buckets: (defaultdict{tuple->list}) Map from (time bucket, x bucket, y bucket)
+        to ids of moving segments.
+        static_buckets: (defaultdict{tuple->dict}) Map from (x bucket, y bucket) to map from
+        start time bucket to (end time, id) of stationary segments, in order of end time.
+        open_segments: (dict{Car->list}) Map from car to its open segment in [t0, x, y, dx, dy, t_last],
+        where t_last is the last time the velocity of the segment was applied.
+        complete_from: (int) Time from which no segment has been evicted. Queries before
+        it may miss cars.
+    """
+
+    def __init__(self, max_segments: int = CONST_HISTORYMAXSEGMENTS,
+                 bucket_steps: int = CONST_HISTORYBUCKETSTEPS, bucket_cells: int = CONST_HISTORYBUCKETCELLS):
+        """Initialization.
+
+        Arguments:
+            max_segments: (int) Maximum number of stored segments.
+            bucket_steps: (int) Number of steps per time bucket.
+            bucket_cells: (int) Number of cells per side of a spatial bucket.
+        """
+        self.bucket_steps   = bucket_steps
+        self.bucket_cells   = bucket_cells
+        self.max_segments   = max_segments
+        self.segments       = {}
+        self.moving_buckets = defaultdict(list)
+        self.static_buckets = defaultdict(dict)
+        self.open_segments  = {}
+        self.complete_from  = 0
+        self.next_id        = 0
+        self.stale_entries  = 0
+
+    # Recording #
+
+    def start(self, cars: list[Car]):
+        """Start recording from the current positions of the cars at time 0.
+
+        Arguments:
+            cars: (list[Car]) Cars of the simulation.
+        """
+        for car in cars:
+            self.open_segments[car] = [0, car.position.x, car.position.y, 0, 0, 0]
+
+    def record_move(self, car: Car, step: int, vector: Vector2D):
+        """Record a successful forward move of a car. Steps without a move are
+        recorded implicitly as stationary.
+
+        Time Complexity: O(1) amortized.
+
+        Arguments:
+            car: (Car) Moved car.
+            step: (int) Simulated step, moving the car from time step to time step + 1.
+            vector: (Vector2D) Move of the car.
+        """
+        segment = self.open_segments[car]
+        t0, x, y, dx, dy, t_last = segment
+
+        if (dx or dy) and t_last == step and dx == vector.x and dy == vector.y:
+            segment[5] = step + 1
+            return
+
+        # Close the open segment, and the stop following a move.
+        self.close_segment(car, segment, step)
+
+        segment[:] = [step, car.position.x - vector.x, car.position.y - vector.y, vector.x, vector.y, step + 1]
+
+    def finalize(self, time: int):
+        """Close all open segments at the end of the simulation.
+
+        Arguments:
+            time: (int) Final time of the simulation.
+        """
+        for car, segment in self.open_segments.items():
+            self.close_segment(car, segment, time)
+        self.open_segments.clear()
+
+    def close_segment(self, car: Car, segment: list, time: int):
+        """Close an open segment, adding the stationary segment until time after a move.
+
+        Arguments:
+            car: (Car) Car of the segment.
+            segment: (list) Open segment in [t0, x, y, dx, dy, t_last].
+            time: (int) Time the next segment starts.
+        """
+        t0, x, y, dx, dy, t_last = segment
+        if dx or dy:
+            self.add_segment((car.name, t0, t_last, x, y, dx, dy))
+            if t_last < time:
+                moves = t_last - t0
+                self.add_segment((car.name, t_last, time, x + dx * moves, y + dy * moves, 0, 0))
+        else:
+            self.add_segment((car.name, t0, time, x, y, 0, 0))
+
+    def add_segment(self, segment: tuple):
+        """Store and index a closed segment, evicting the oldest segments if needed.
+
+        Arguments:
+            segment: (tuple) Segment in (name, t0, t1, x, y, dx, dy).
+        """
+        segment_id = self.next_id
+        self.next_id += 1
+        self.segments[segment_id] = segment
+
+        _, t0, t1, x, y, dx, dy = segment
+        if dx or dy:
+            # Split at time bucket boundaries, so each part spans few spatial buckets.
+            start = t0
+            while True:
+                end    = min((start // self.bucket_steps + 1) * self.bucket_steps, t1)
+                moves  = start - t0
+                x0, y0 = x + dx * moves, y + dy * moves
+                x1, y1 = x + dx * (end - t0), y + dy * (end - t0)
+                for bucket_x in range(min(x0, x1) // self.bucket_cells, max(x0, x1) // self.bucket_cells + 1):
+                    for bucket_y in range(min(y0, y1) // self.bucket_cells, max(y0, y1) // self.bucket_cells + 1):
+                        self.moving_buckets[(start // self.bucket_steps, bucket_x, bucket_y)].append(segment_id)
+                if end == t1:
+                    break
+                start = end
+        else:
+            # Segments are closed in order of end time, so the entries stay sorted.
+            buckets = self.static_buckets[(x // self.bucket_cells, y // self.bucket_cells)]
+            buckets.setdefault(t0 // self.bucket_steps, []).append((t1, segment_id))
+
+        while len(self.segments) > self.max_segments:
+            self.evict()
+
+    def evict(self):
+        """Evict the oldest stored segment."""
+        segment_id = next(iter(self.segments))
+        segment    = self.segments.pop(segment_id)
+        self.complete_from  = max(self.complete_from, segment[2] + 1)
+        self.stale_entries += 1
+
+        # Remove evicted ids from the buckets once they outnumber the stored segments.
+        if self.stale_entries > len(self.segments):
+            for key in list(self.moving_buckets):
+                self.moving_buckets[key] = [i for i in self.moving_buckets[key] if i in self.segments]
+                if not self.moving_buckets[key]:
+                    del self.moving_buckets[key]
+            for key in list(self.static_buckets):
+                buckets = self.static_buckets[key]
+                for bucket_t in list(buckets):
+                    buckets[bucket_t] = [entry for entry in buckets[bucket_t] if entry[1] in self.segments]
+                    if not buckets[bucket_t]:
+                        del buckets[bucket_t]
+                if not buckets:
+                    del self.static_buckets[key]
+            self.stale_entries = 0
+
+    # Queries #
+
+    def query_region(self, min_x: int, min_y: int, max_x: int, max_y: int, start: int, end: int) -> set[str]:
+        """Find the cars that were inside a rectangle at any time in a time range.
+
+        Time Complexity: O(b + k), b is number of buckets overlapping the query, k is
+        number of segments in those buckets overlapping the time buckets of the query.
+
+        Arguments:
+            min_x: (int) Minimum x of the rectangle, inclusive.
+            min_y: (int) Minimum y of the rectangle, inclusive.
+            max_x: (int) Maximum x of the rectangle, inclusive.
+            max_y: (int) Maximum y of the rectangle, inclusive.
+            start: (int) Start time, inclusive.
+            end: (int) End time, inclusive.
+
+        Returns:
+            set[str]: Names of the cars.
+        """
+        names      = set()
+        candidates = set()
+
+        bucket_xs = range(min_x // self.bucket_cells, max_x // self.bucket_cells + 1)
+        bucket_ys = range(min_y // self.bucket_cells, max_y // self.bucket_cells + 1)
+        end_t     = end // self.bucket_steps
+        for bucket_x in bucket_xs:
+            for bucket_y in bucket_ys:
+                for bucket_t, entries in self.static_buckets.get((bucket_x, bucket_y), {}).items():
+                    if bucket_t <= end_t:
+                        candidates.update(entry[1] for entry in entries[bisect_left(entries, start, key = lambda entry: entry[0]):])
+                for bucket_t in range(start // self.bucket_steps, end // self.bucket_steps + 1):
+                    candidates.update(self.moving_buckets.get((bucket_t, bucket_x, bucket_y), ()))
+
+        for segment_id in candidates:
+            segment = self.segments.get(segment_id)
+            if segment is not None and segment[0] not in names and \
+               self.intersects(segment, min_x, min_y, max_x, max_y, start, end):
+                names.add(segment[0])
+
+        return names
+
+    def query_point(self, position: Vector2D, time: int) -> set[str]:
+        """Find the cars at a position at a time.
+
+        Arguments:
+            position: (Vector2D) Position to query.
+            time: (int) Time to query.
+
+        Returns:
+            set[str]: Names of the cars.
+        """
+        return self.query_region(position.x, position.y, position.x, position.y, time, time)
+
+    @staticmethod
+    def intersects(segment: tuple, min_x: int, min_y: int, max_x: int, max_y: int, start: int, end: int) -> bool:
+        """Check if a segment is inside a rectangle at any time in a time range.
+
+        Arguments:
+            segment: (tuple) Segment in (name, t0, t1, x, y, dx, dy).
+            min_x: (int) Minimum x of the rectangle, inclusive.
+            min_y: (int) Minimum y of the rectangle, inclusive.
+            max_x: (int) Maximum x of the rectangle, inclusive.
+            max_y: (int) Maximum y of the rectangle, inclusive.
+            start: (int) Start time, inclusive.
+            end: (int) End time, inclusive.
+
+        Returns:
+            bool: True if the segment intersects the query.
+        """
+        _, t0, t1, x, y, dx, dy = segment
+        low, high = max(start, t0), min(end, t1)
+
+        # Narrow the time range to the times each axis is inside the rectangle.
+        for position, delta, minimum, maximum in ((x, dx, min_x, max_x), (y, dy, min_y, max_y)):
+            if delta == 0:
+                if not minimum <= position <= maximum:
+                    return False
+            elif delta > 0:
+                low  = max(low,  t0 + minimum - position)
+                high = min(high, t0 + maximum - position)
+            else:
+                low  = max(low,  t0 + position - maximum)
+                high = min(high, t0 + position - minimum)
+
+        return low <= high
@@ -0,0 +1,65 @@
+from .occupancy_enum import OccupancyBackend
+
+class HashOccupancy(dict):
+    """Occupancy of cells in a hash map, memory proportional to occupied cells.
+
+    A cell holds a single car index, or a list of car indices if several cars are in
+    the cell. Empty cells read as None.
+    """
+
+    __slots__ = ()
+
+    def __missing__(self, cell: int):
+        """Empty cell.
+
+        Arguments:
+            cell: (int) Cell id.
+        """
+        return None
+
+    def clear_cell(self, cell: int):
+        """Empty a cell.
+
+        Arguments:
+            cell: (int) Cell id.
+        """
+        del self[cell]
+
+class GridOccupancy(list):
+    """Occupancy of cells in an array of all cells, memory proportional to field area.
+
+    A cell holds a single car index, or a list of car indices if several cars are in
+    the cell. Empty cells are None.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, cells: int):
+        """Initialization.
+
+        Arguments:
+            cells: (int) Number of cells.
+        """
+        super().__init__([None] * cells)
+
+    def clear_cell(self, cell: int):
+        """Empty a cell.
+
+        Arguments:
+            cell: (int) Cell id.
+        """
+        self[cell] = None
+
+def create_occupancy(backend: OccupancyBackend, cells: int) -> HashOccupancy | GridOccupancy:
+    """Create an empty occupancy.
+
+    Arguments:
+        backend: (OccupancyBackend) Occupancy backend.
+        cells: (int) Number of cells.
+
+    Returns:
+        HashOccupancy | GridOccupancy: Empty occupancy of the backend.
+    """
+    if backend == OccupancyBackend.GRID:
+        return GridOccupancy(cells)
+    return HashOccupancy()
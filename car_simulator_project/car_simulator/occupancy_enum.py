@@ -0,0 +1,7 @@
+from enum import Enum
+
+class OccupancyBackend(Enum):
+    """Occupancy backends of the batch engine."""
+
+    HASH: str = "Hash map"   # Map from occupied cell id to cars, for sparse or huge fields.
+    GRID: str = "Grid array" # Array of all cell ids of the field, for dense small fields.
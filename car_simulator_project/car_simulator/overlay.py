@@ -0,0 +1,168 @@
+from .car               import Car
+from ..utility.position import Vector2D
+
+class CarList:
+    """List of cars over a frozen base list, shared by forked worlds.
+
+    Cars of the base are read through the base, a world only stores the cars it
+    copied to change them and the cars added after the fork.
+
+    Attributes:
+        base: (list[Car] | CarList) Frozen cars shared with other worlds.
+        replaced: (dict{Car->Car}) Map from car of the base to its copy in this world.
+        added: (list[Car]) Cars added after the fork.
+    """
+
+    def __init__(self, base: "list[Car] | CarList"):
+        """Initialization.
+
+        Arguments:
+            base: (list[Car] | CarList) Frozen cars shared with other worlds.
+        """
+        self.base     = base
+        self.replaced = {}
+        self.added    = []
+
+    def __len__(self) -> int:
+        """Number of cars."""
+        return len(self.base) + len(self.added)
+
+    def __iter__(self):
+        """Iterate cars in order of addition, copies in place of the base cars."""
+        replaced = self.replaced
+        if replaced:
+            for car in self.base:
+                yield replaced.get(car, car)
+        else:
+            yield from self.base
+        yield from self.added
+
+    def __getitem__(self, index: int) -> Car:
+        """Get a car by index of addition.
+
+        Arguments:
+            index: (int) Index of the car, not negative.
+        """
+        size = len(self.base)
+        if index >= size:
+            return self.added[index - size]
+
+        car = self.base[index]
+        return self.replaced.get(car, car)
+
+    def append(self, car: Car):
+        """Add a car.
+
+        Arguments:
+            car: (Car) Car to be added.
+        """
+        self.added.append(car)
+
+    def replace(self, car: Car, copy: Car):
+        """Replace a car of the base by its copy.
+
+        Arguments:
+            car: (Car) Car of the base.
+            copy: (Car) Copy of the car owned by this world.
+        """
+        self.replaced[car] = copy
+
+    def is_modified(self) -> bool:
+        """Check cars were replaced or added since the fork.
+
+        Returns:
+            bool: True if this world has cars of its own.
+        """
+        return bool(self.replaced or self.added)
+
+class StaticMap:
+    """Map from position to a set of retired cars over a frozen base map, shared by
+    forked worlds.
+
+    A position is copied from the base with copies of its cars before it is changed,
+    so cars of the base are never changed. Positions only ever gain cars.
+
+    Attributes:
+        base: (dict{Vector2D->set} | StaticMap) Frozen positions shared with other worlds.
+        local: (dict{Vector2D->set}) Positions copied or added by this world.
+        cars: (CarList) Cars of this world, recording the copied cars.
+    """
+
+    def __init__(self, base: "dict | StaticMap", cars: CarList):
+        """Initialization.
+
+        Arguments:
+            base: (dict{Vector2D->set} | StaticMap) Frozen positions shared with other worlds.
+            cars: (CarList) Cars of this world, recording the copied cars.
+        """
+        self.base  = base
+        self.local = {}
+        self.cars  = cars
+
+    def __contains__(self, position: Vector2D) -> bool:
+        """Check any retired car is in position."""
+        return position in self.local or position in self.base
+
+    def __len__(self) -> int:
+        """Number of positions with retired cars.
+
+        Time Complexity: O(l), l is number of positions copied or added by this world.
+        """
+        return len(self.base) + sum(1 for position in self.local if position not in self.base)
+
+    def get(self, position: Vector2D, default = None):
+        """Get the retired cars in position.
+
+        Arguments:
+            position: (Vector2D) Position to get cars of.
+            default: Returned if no retired car is in position.
+
+        Returns:
+            set[Car]: Cars in position, must not be changed.
+        """
+        cars = self.local.get(position)
+        if cars is not None:
+            return cars
+        return self.base.get(position, default)
+
+    def own(self, position: Vector2D) -> set[Car]:
+        """Copy a position of the base with copies of its cars, before the cars or the
+        position are changed.
+
+        Time Complexity: O(k), k is number of cars in position, on first change of the position.
+
+        Arguments:
+            position: (Vector2D) Position to be changed.
+
+        Returns:
+            set[Car]: Cars in position owned by this world.
+        """
+        cars = self.local.get(position)
+        if cars is None:
+            cars = set()
+            for car in self.base.get(position, ()):
+                copy = car.copy()
+                self.cars.replace(car, copy)
+                cars.add(copy)
+            self.local[position] = cars
+        return cars
+
+    def setdefault(self, position: Vector2D, default: set) -> set[Car]:
+        """Get the retired cars in position owned by this world, to add a car.
+
+        Arguments:
+            position: (Vector2D) Position to get cars of.
+            default: (set) Unused, positions are created by the overlay.
+
+        Returns:
+            set[Car]: Cars in position owned by this world.
+        """
+        return self.own(position)
+
+    def is_modified(self) -> bool:
+        """Check positions were copied or added since the fork.
+
+        Returns:
+            bool: True if this world has positions of its own.
+        """
+        return bool(self.local)
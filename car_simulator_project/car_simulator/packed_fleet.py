@@ -0,0 +1,181 @@
+import sys
+from array import array
+
+from .car                   import Car
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+CONST_DIRECTIONS = list(Direction) # Direction of each heading index.
+
+class PackedFleet:
+    """Cars packed into flat arrays, for fleets too large for one Car object per car.
+
+    Names and commands of all cars are stored in shared byte buffers with offsets,
+    instead of one string and one command list per car. Cars with identical commands
+    share one range of the command buffer, found by the hash of the commands so no
+    string is kept per distinct commands.
+
+    Attributes:
+        scenario_ids: (array[int]) Scenario id of each car.
+        xs: (array[int]) x position of each car, 64-bit so any field coordinate fits.
+        ys: (array[int]) y position of each car, 64-bit so any field coordinate fits.
+        headings: (array[int]) Heading index of each car, in order of Direction.
+        name_buffer: (bytearray) UTF-8 names of all cars.
+        name_offsets: (array[int]) Offset of the name of each car in the buffer, and
+        total length of the buffer.
+        command_buffer: (bytearray) Distinct commands of all cars.
+        command_starts: (array[int]) Offset of the commands of each car in the buffer.
+        command_lengths: (array[int]) Number of commands of each car.
+        command_index: (dict{int->int}) Map from hash of distinct commands to their offset
+        in the buffer.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.scenario_ids    = array("i")
+        self.xs              = array("q")
+        self.ys              = array("q")
+        self.headings        = array("b")
+        self.name_buffer     = bytearray()
+        self.name_offsets    = array("q", [0])
+        self.command_buffer  = bytearray()
+        self.command_starts  = array("q")
+        self.command_lengths = array("i")
+        self.command_index   = {}
+
+    def __len__(self) -> int:
+        """Number of cars.
+
+        Returns:
+            int: Number of cars in the fleet.
+        """
+        return len(self.xs)
+
+    def add_car(self, scenario_id: int, name: str, x: int, y: int, direction: Direction, commands: str):
+        """Add a car to the fleet.
+
+        Arguments:
+            scenario_id: (int) Scenario id of car.
+            name: (str) Name of car.
+            x: (int) x position of car.
+            y: (int) y position of car.
+            direction: (Direction) Forward direction of car.
+            commands: (str) Car commands.
+        """
+        self.scenario_ids.append(scenario_id)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.headings.append(CONST_DIRECTIONS.index(direction))
+        self.name_buffer += name.encode()
+        self.name_offsets.append(len(self.name_buffer))
+        self.add_commands(commands)
+
+    def add_commands(self, commands: str):
+        """Add the commands of the last added car, sharing the range of identical commands.
+
+        Arguments:
+            commands: (str) Car commands.
+        """
+        self.command_starts.append(self.intern_commands(commands.encode("ascii")))
+        self.command_lengths.append(len(commands))
+
+    def intern_commands(self, commands: bytes) -> int:
+        """Get the offset of commands in the buffer, adding them if not in the buffer.
+        Commands colliding by hash with other commands are added without sharing.
+
+        Arguments:
+            commands: (bytes) Car commands.
+
+        Returns:
+            int: Offset of the commands in the buffer.
+        """
+        key   = hash(commands)
+        start = self.command_index.get(key)
+        if start is not None and self.command_buffer[start:start + len(commands)] == commands:
+            return start
+
+        offset = len(self.command_buffer)
+        self.command_buffer += commands
+        if start is None:
+            self.command_index[key] = offset
+        return offset
+
+    def extend(self, other: "PackedFleet"):
+        """Append all cars of another fleet.
+
+        Arguments:
+            other: (PackedFleet) Fleet to append.
+        """
+        name_base = len(self.name_buffer)
+
+        self.scenario_ids.extend(other.scenario_ids)
+        self.xs.extend(other.xs)
+        self.ys.extend(other.ys)
+        self.headings.extend(other.headings)
+        self.name_buffer += other.name_buffer
+        self.name_offsets.extend(offset + name_base for offset in other.name_offsets[1:])
+
+        # Distinct commands of the other fleet are added once, then shared by its cars.
+        starts = {}
+        for key in zip(other.command_starts, other.command_lengths):
+            if key not in starts:
+                start, length = key
+                starts[key]   = self.intern_commands(bytes(other.command_buffer[start:start + length]))
+
+        self.command_starts.extend(starts[key] for key in zip(other.command_starts, other.command_lengths))
+        self.command_lengths.extend(other.command_lengths)
+
+    def get_name(self, car: int) -> str:
+        """Get name of a car.
+
+        Arguments:
+            car: (int) Car index.
+
+        Returns:
+            str: Name of car.
+        """
+        return self.name_buffer[self.name_offsets[car]:self.name_offsets[car + 1]].decode()
+
+    def get_commands(self, car: int) -> str:
+        """Get commands of a car.
+
+        Arguments:
+            car: (int) Car index.
+
+        Returns:
+            str: Car commands.
+        """
+        start = self.command_starts[car]
+        return self.command_buffer[start:start + self.command_lengths[car]].decode("ascii")
+
+    def get_command_length(self, car: int) -> int:
+        """Get number of commands of a car.
+
+        Arguments:
+            car: (int) Car index.
+
+        Returns:
+            int: Number of car commands.
+        """
+        return self.command_lengths[car]
+
+    def create_cars(self) -> list[Car]:
+        """Create new cars of the fleet for simulation.
+
+        Returns:
+            list[Car]: List of cars at their current state.
+        """
+        return [Car(self.get_name(car), Vector2D(self.xs[car], self.ys[car]), CONST_DIRECTIONS[self.headings[car]],
+                    Command.string_to_commands(self.get_commands(car))) for car in range(len(self))]
+
+    def nbytes(self) -> int:
+        """Get memory used by the arrays, buffers and index of distinct commands of the fleet.
+
+        Returns:
+            int: Number of bytes.
+        """
+        arrays = (self.scenario_ids, self.xs, self.ys, self.headings, self.name_offsets, self.command_starts,
+                  self.command_lengths)
+        index  = sys.getsizeof(self.command_index) + sum(sys.getsizeof(key) + sys.getsizeof(start)
+                                                         for key, start in self.command_index.items())
+        return sum(len(a) * a.itemsize for a in arrays) + len(self.name_buffer) + len(self.command_buffer) + index
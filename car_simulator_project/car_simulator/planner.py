@@ -0,0 +1,171 @@
+import math
+
+from .car                   import Car
+from .engine_enum           import Engine
+from .occupancy_enum        import OccupancyBackend
+from .thread_engine         import is_free_threaded
+from .consts                import CONST_PLANSMALLWORK, CONST_PLANISOLATEDFRACTION, CONST_PLANGRIDCELLS, \
+                                   CONST_PLANGRIDMAXCELLS, CONST_PLANGRIDCELLSPERCAR, CONST_PLANPACKEDCELLS
+from ..utility.position     import Vector2D
+from ..utility.command_enum import Command
+
+class SimulationPlan:
+    """Engine and occupancy backend chosen for a simulation, with the reasons.
+
+    Attributes:
+        engine: (Engine) Simulation engine.
+        occupancy_backend: (OccupancyBackend) Occupancy backend of the batch engine.
+        reasons: (list[str]) Reasons of the choices, in order of the decisions.
+        features: (dict) Scenario shape the choices are based on.
+        overridden: (bool) True if the engine or the backend was set manually.
+    """
+
+    def __init__(self, engine: Engine, occupancy_backend: OccupancyBackend, reasons: list[str], features: dict):
+        """Initialization.
+
+        Arguments:
+            engine: (Engine) Simulation engine.
+            occupancy_backend: (OccupancyBackend) Occupancy backend of the batch engine.
+            reasons: (list[str]) Reasons of the choices.
+            features: (dict) Scenario shape the choices are based on.
+        """
+        self.engine            = engine
+        self.occupancy_backend = occupancy_backend
+        self.reasons           = reasons
+        self.features          = features
+        self.overridden        = False
+
+    def to_dict(self) -> dict:
+        """Convert plan to run metadata.
+
+        Returns:
+            dict: Engine, occupancy backend, reasons and features.
+        """
+        return {
+            "engine"           : self.engine.name,
+            "occupancy_backend": self.occupancy_backend.name,
+            "reasons"          : self.reasons,
+            "features"         : self.features,
+            "overridden"       : self.overridden,
+        }
+
+def get_features(cars: list[Car], dimension: Vector2D) -> dict:
+    """Measure the shape of a scenario.
+
+    The expected number of neighbours of a car is the expected number of other cars
+    within twice the mean forward moves in Manhattan distance, if cars are spread
+    uniformly. A car without neighbours in reach can never collide.
+
+    Time Complexity: O(n), n is number of cars.
+
+    Arguments:
+        cars: (list[Car]) Cars of the scenario.
+        dimension: (Vector2D) Width and height of the world field.
+
+    Returns:
+        dict: Scenario features.
+    """
+    count    = len(cars)
+    area     = dimension.x * dimension.y
+    lengths  = [len(car.commands) for car in cars]
+    forwards = sum(car.commands.count(Command.F) for car in cars)
+
+    mean_forward       = forwards / count if count else 0.0
+    reach              = 2 * mean_forward
+    reach_area         = min(area, 2 * reach * reach + 2 * reach + 1)
+    expected_neighbors = (count - 1) * reach_area / area if count else 0.0
+
+    return {
+        "cars"              : count,
+        "area"              : area,
+        "density"           : count / area,
+        "max_commands"      : max(lengths, default=0),
+        "mean_commands"     : sum(lengths) / count if count else 0.0,
+        "mean_forward"      : mean_forward,
+        "work"              : count * max(lengths, default=0),
+        "expected_neighbors": expected_neighbors,
+        "isolated_fraction" : math.exp(-expected_neighbors),
+    }
+
+def plan_simulation(cars: list[Car], dimension: Vector2D, use_fast_forward: bool,
+                    record_history: bool, observe_steps: bool, workers: int = 1, threads: int = 1) -> SimulationPlan:
+    """Choose the engine and occupancy backend for a scenario.
+
+    Runs recording history or observing steps, and small scenarios, use the stepwise
+    engine. Large runs recording history or observing steps plan the moves of every
+    step on a thread pool when there are several threads and the interpreter is
+    free-threaded. Scenarios where almost every car is isolated fast-forward them, any
+    other scenario uses the batch engine, split into interaction components when there
+    are several workers. Fields with more cells than the cell ids of the packed arrays
+    fit are never packed. The batch engine uses a grid occupancy for small or dense
+    fields and a hash occupancy for sparse huge fields.
+
+    Arguments:
+        cars: (list[Car]) Cars of the scenario.
+        dimension: (Vector2D) Width and height of the world field.
+        use_fast_forward: (bool) True if isolated cars may be fast-forwarded.
+        record_history: (bool) True if the run records history.
+        observe_steps: (bool) True if the run calls a step observer.
+        workers: (int) Number of worker processes available to the run.
+        threads: (int) Number of threads available to the run.
+
+    Returns:
+        SimulationPlan: Chosen engine and occupancy backend.
+    """
+    features = get_features(cars, dimension)
+    reasons  = []
+    stepwise = Engine.FAST_FORWARD if use_fast_forward and not record_history else Engine.STEPWISE
+
+    if record_history or observe_steps:
+        reasons.append("History or step observer needs the car objects updated every step.")
+        engine = stepwise
+        if threads > 1 and features["work"] > CONST_PLANSMALLWORK and is_free_threaded():
+            reasons.append(f"Moves of every step are planned by {threads} threads of a free-threaded interpreter.")
+            engine = Engine.THREADS
+    elif features["work"] <= CONST_PLANSMALLWORK:
+        reasons.append(f"Work of {features['work']} car steps is too small to pack the cars.")
+        engine = stepwise
+    elif features["area"] >= CONST_PLANPACKEDCELLS:
+        reasons.append(f"Field of {features['area']} cells is too large for the cell ids of packed arrays.")
+        engine = stepwise
+    elif use_fast_forward and features["isolated_fraction"] >= CONST_PLANISOLATEDFRACTION:
+        reasons.append(f"Expected {features['isolated_fraction']:.1%} isolated cars are run in closed form.")
+        engine = Engine.FAST_FORWARD
+    else:
+        reasons.append(f"Work of {features['work']} car steps with expected {features['isolated_fraction']:.1%} "
+                       f"isolated cars is stepped on packed arrays.")
+        engine = Engine.BATCH
+
+    if engine == Engine.BATCH and workers > 1:
+        reasons.append(f"Interaction components are stepped by {workers} worker processes.")
+        engine = Engine.COMPONENTS
+
+    if engine in (Engine.BATCH, Engine.COMPONENTS):
+        occupancy_backend = plan_occupancy(features, reasons)
+    else:
+        reasons.append("World occupancy is hashed by position.")
+        occupancy_backend = OccupancyBackend.HASH
+
+    return SimulationPlan(engine, occupancy_backend, reasons, features)
+
+def plan_occupancy(features: dict, reasons: list[str]) -> OccupancyBackend:
+    """Choose the occupancy backend of the batch engine.
+
+    Arguments:
+        features: (dict) Scenario features.
+        reasons: (list[str]) Reasons to append the choice to.
+
+    Returns:
+        OccupancyBackend: Chosen occupancy backend.
+    """
+    area = features["area"]
+    if area <= CONST_PLANGRIDCELLS:
+        reasons.append(f"Field of {area} cells fits a grid.")
+        return OccupancyBackend.GRID
+
+    if area <= CONST_PLANGRIDMAXCELLS and area <= features["cars"] * CONST_PLANGRIDCELLSPERCAR:
+        reasons.append(f"Field of {area} cells is dense with {features['cars']} cars.")
+        return OccupancyBackend.GRID
+
+    reasons.append(f"Field of {area} cells is sparse, occupied cells are hashed.")
+    return OccupancyBackend.HASH
@@ -0,0 +1,74 @@
+from time import perf_counter
+
+class SimulationProgress:
+    """Progress of a running simulation, yielded between time slices.
+
+    Attributes:
+        step: (int) Number of steps simulated so far.
+        max_steps: (int) Maximum number of steps of the simulation.
+        simulating: (int) Number of cars still simulating.
+    """
+
+    def __init__(self, step: int, max_steps: int, simulating: int):
+        """Initialization.
+
+        Arguments:
+            step: (int) Number of steps simulated so far.
+            max_steps: (int) Maximum number of steps of the simulation.
+            simulating: (int) Number of cars still simulating.
+        """
+        self.step       = step
+        self.max_steps  = max_steps
+        self.simulating = simulating
+
+    def fraction(self) -> float:
+        """Fraction of the maximum number of steps simulated.
+
+        Returns:
+            float: Fraction from 0 to 1.
+        """
+        return self.step / self.max_steps if self.max_steps else 1.0
+
+    def __repr__(self):
+        """Debug purposes.
+
+        Returns:
+            str: Steps simulated of the maximum and cars still simulating.
+        """
+        return f"Step {self.step}/{self.max_steps}, {self.simulating} cars simulating"
+
+class TimeSlicer:
+    """Decides when a simulation loop yields, every number of steps or every number
+    of milliseconds, whichever comes first.
+
+    Attributes:
+        slice_steps: (int) Steps per slice, None for no limit.
+        slice_seconds: (float) Seconds per slice, None for no limit.
+    """
+
+    def __init__(self, slice_steps: int | None = None, slice_ms: float | None = None):
+        """Initialization.
+
+        Arguments:
+            slice_steps: (int) Steps per slice, None for no limit.
+            slice_ms: (float) Milliseconds per slice, None for no limit.
+        """
+        self.slice_steps   = slice_steps
+        self.slice_seconds = slice_ms / 1000 if slice_ms is not None else None
+        self.reset()
+
+    def reset(self):
+        """Start a new slice."""
+        self.steps    = 0
+        self.deadline = perf_counter() + self.slice_seconds if self.slice_seconds is not None else None
+
+    def due(self) -> bool:
+        """Count a simulated step and check if the slice is over.
+
+        Returns:
+            bool: True if the loop should yield.
+        """
+        self.steps += 1
+        if self.slice_steps is not None and self.steps >= self.slice_steps:
+            return True
+        return self.deadline is not None and perf_counter() >= self.deadline
@@ -0,0 +1,72 @@
+from .car                   import Car
+from .trajectory            import TemplateCache
+from ..utility.position     import Vector2D
+from ..utility.command_enum import Command
+
+def get_reach_box(car: Car, dimension: Vector2D, step: int = 0, 
+                  templates: TemplateCache | None = None) -> tuple[int, int, int, int]:
+    """Get the box bounding every position a car can reach from a step onwards.
+
+    The reach is the Manhattan distance of the remaining forward moves, clipped to
+    the world field. With templates, a car whose path never meets the field bounds
+    is bounded by the box of its path instead.
+
+    Arguments:
+        car: (Car) Car to get reach box of.
+        dimension: (Vector2D) Width and height of the world field.
+        step: (int) Step the remaining commands start from.
+        templates: (TemplateCache) Templates of the remaining commands, None to use
+        the Manhattan reach only.
+
+    Returns:
+        tuple[int, int, int, int]: Reach box in (min x, min y, max x, max y).
+    """
+    if templates is not None:
+        template = templates.get(car.commands[step:], car.direction)
+        if template.fits(car.position, dimension):
+            return template.get_reach_box(car.position)
+
+    reach = car.commands[step:].count(Command.F)
+    x, y  = car.position.x, car.position.y
+
+    return (max(x - reach, 0), max(y - reach, 0),
+            min(x + reach, dimension.x - 1), min(y + reach, dimension.y - 1))
+
+def find_isolated_cars(cars: list[Car], dimension: Vector2D, step: int = 0, 
+                       templates: TemplateCache | None = None) -> list[Car]:
+    """Find cars whose reach box does not overlap the reach box of any other car.
+
+    An isolated car can never share a position with, or swap positions with, another
+    car, so its commands can be run alone. Boxes are swept along the x-axis.
+
+    Time Complexity: O(n log n + k), n is number of cars, k is number of box pairs 
+    overlapping on the x-axis.
+
+    Arguments:
+        cars: (list[Car]) Cars to check, including cars without remaining commands.
+        dimension: (Vector2D) Width and height of the world field.
+        step: (int) Step the remaining commands start from.
+        templates: (TemplateCache) Templates of the remaining commands, None to use
+        the Manhattan reach only.
+
+    Returns:
+        list[Car]: List of isolated cars.
+    """
+    boxes = sorted(((get_reach_box(car, dimension, step, templates), car) for car in cars), key=lambda item: item[0][0])
+
+    overlapped = set()
+    active     = []
+    for box, car in boxes:
+        min_x, min_y, _, max_y = box
+
+        # Drop boxes ending before the current box on the x-axis.
+        active = [(other_box, other) for other_box, other in active if other_box[2] >= min_x]
+
+        for other_box, other in active:
+            if other_box[1] <= max_y and min_y <= other_box[3]:
+                overlapped.add(car)
+                overlapped.add(other)
+
+        active.append((box, car))
+
+    return [car for car in cars if car not in overlapped]
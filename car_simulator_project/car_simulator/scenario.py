@@ -0,0 +1,85 @@
+import random
+
+from .car                   import Car
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+class Scenario:
+    """Specification of a simulation, independent of any simulator state.
+
+    Attributes:
+        dimension: (Vector2D) Width and height of the world field.
+        cars: (list[tuple[str, Vector2D, Direction, str]]) List of car name, initial
+        position, initial direction and commands in string.
+    """
+
+    def __init__(self, dimension: Vector2D, cars: list[tuple[str, Vector2D, Direction, str]] | None = None):
+        """Initialization.
+
+        Arguments:
+            dimension: (Vector2D) Width and height of the world field.
+            cars: (list[tuple[str, Vector2D, Direction, str]]) List of car name, initial
+            position, initial direction and commands in string.
+        """
+        self.dimension = dimension
+        self.cars      = cars if cars is not None else []
+
+    def add_car(self, name: str, position: Vector2D, direction: Direction, commands: str):
+        """Add a car to the scenario.
+
+        Arguments:
+            name: (str) Name of car.
+            position: (Vector2D) Initial position of car.
+            direction: (Direction) Initial forward direction of car.
+            commands: (str) Car commands.
+        """
+        self.cars.append((name, position, direction, commands))
+
+    def create_cars(self) -> list[Car]:
+        """Create new cars of the scenario for simulation.
+
+        Returns:
+            list[Car]: List of cars at their initial state.
+        """
+        return [Car(name, position, direction, Command.string_to_commands(commands))
+                for name, position, direction, commands in self.cars]
+
+    def __repr__(self):
+        """Debug purposes.
+
+        Returns:
+            str: Dimension and cars of the scenario.
+        """
+        return f"Scenario({self.dimension}, {self.cars})"
+
+def generate_random_scenario(rng: random.Random, max_width: int = 10, max_height: int = 10, 
+                             max_cars: int = 10, max_commands: int = 100, min_width: int = 1, min_height: int = 1,
+                             min_cars: int = 1, min_commands: int = 0) -> Scenario:
+    """Generate a random valid scenario. Equal minimum and maximum give an exact shape.
+
+    Arguments:
+        rng: (random.Random) Random number generator.
+        max_width: (int) Maximum width of the field.
+        max_height: (int) Maximum height of the field.
+        max_cars: (int) Maximum number of cars.
+        max_commands: (int) Maximum length of car commands.
+        min_width: (int) Minimum width of the field.
+        min_height: (int) Minimum height of the field.
+        min_cars: (int) Minimum number of cars, if they fit the field.
+        min_commands: (int) Minimum length of car commands.
+
+    Returns:
+        Scenario: Random scenario with unique car names and positions within bounds.
+    """
+    width, height = rng.randint(min_width, max_width), rng.randint(min_height, max_height)
+    count         = rng.randint(min(min_cars, width * height), min(max_cars, width * height))
+    positions     = set()
+    while len(positions) < count:
+        positions.add((rng.randrange(width), rng.randrange(height)))
+
+    scenario = Scenario(Vector2D(width, height))
+    for index, (x, y) in enumerate(positions):
+        commands = "".join(rng.choices("FFFLR", k=rng.randint(min_commands, max_commands)))
+        scenario.add_car(f"Car {index}", Vector2D(x, y), rng.choice(list(Direction)), commands)
+
+    return scenario
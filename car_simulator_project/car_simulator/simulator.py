@@ -1,7 +1,29 @@
+from array       import array
+from collections import defaultdict
+from typing      import Iterator
+
 from .car                              import Car
 from .world                            import World
+from .collision_enum                   import CollisionMode
+from .stats                            import SimulationStats
+from .consts                           import CONST_INDEXSAMPLESTEPS, CONST_HISTORYMAXSEGMENTS, CONST_COMPONENTGROUPSPERWORKER, \
+                                              CONST_THREADMINCARS
+from .fast_forward                     import fast_forward
+from .reach                            import find_isolated_cars
+from .history                          import HistoryIndex
+from .collision_event                  import CollisionLog, CollisionEvent
+from .engine_enum                      import Engine
+from .occupancy_enum                   import OccupancyBackend
+from .planner                          import SimulationPlan, plan_simulation
+from .packed_fleet                     import PackedFleet, CONST_DIRECTIONS
+from .batch_simulator                  import BatchSimulator
+from .progress                         import SimulationProgress, TimeSlicer
+from .trajectory                       import TemplateCache
+from .components                       import find_components, split_groups, create_group_batch, get_group_results, \
+                                              simulate_group
+from .thread_engine                    import is_free_threaded, split_shards, plan_moves
 from ..car_simulator_controller.result import Result
-from ..utility.position                import Vector2D
+from ..utility.position                import Vector2D, Direction
 from ..utility.command_enum            import Command
 
 class CarSimulator:
@@ -9,44 +31,116 @@ class CarSimulator:
 
     Attributes:
         world: (World) A container for all the cars.
-        simulating_cars: (list[Car]) A list of currently simulating cars.
+        simulating_cars: (dict{Car->None}) Ordered set of currently simulating cars.
+        end_steps: (defaultdict{int->list}) Map from step to the cars running out of 
+        commands at that step.
+        collision_mode: (CollisionMode) Collision detection mode of the world.
+        stats: (SimulationStats) Counters of the last simulation.
+        use_fast_forward: (bool) True to run the commands of isolated cars at once 
+        instead of step by step.
+        step_observer: (Callable[[int], None]) Called with the step after every simulated
+        step, None to disable.
+        history: (HistoryIndex) History of car positions of the last simulation, None to disable.
+        collisions: (CollisionLog) Collision events of the last simulation.
+        templates: (TemplateCache) Trajectory templates shared by cars with the same
+        commands and direction.
+        engine_override: (Engine) Engine set manually, None to let the planner choose.
+        occupancy_override: (OccupancyBackend) Occupancy backend set manually, None to let
+        the planner choose.
+        run_metadata: (dict) Engine and occupancy backend of the last simulation, with
+        the reasons of the choices.
+        workers: (int) Number of worker processes of the components engine, 1 to run
+        the components in this process.
+        threads: (int) Number of threads of the thread pool engine.
+        run_step: (int) Next step of a kept stepwise run, None if no run is kept.
+        max_steps: (int) Longest command length of a kept stepwise run.
     """
     
-    def __init__(self, logger):
+    def __init__(self, logger, collision_mode: CollisionMode = CollisionMode.CELL, use_fast_forward: bool = True,
+                 workers: int = 1, threads: int = 1):
         """Initialization.
 
         Arguments:
             logger: Logger for debug information etc.
+            collision_mode: (CollisionMode) Collision detection mode of the world.
+            use_fast_forward: (bool) True to run the commands of isolated cars at once.
+            workers: (int) Number of worker processes of the components engine.
+            threads: (int) Number of threads of the thread pool engine.
         """
-        self.logger = logger
+        self.logger             = logger
+        self.collision_mode     = collision_mode
+        self.use_fast_forward   = use_fast_forward
+        self.workers            = workers
+        self.threads            = threads
+        self.step_observer      = None
+        self.history            = None
+        self.engine_override    = None
+        self.occupancy_override = None
+        self.run_metadata       = {}
         self.initialize()
 
     def initialize(self):
         """Initialize simulator. Can be used for re-initialization."""
-        self.world           = World()
-        self.simulating_cars = []
-
-    def add_car(self, car: Car) -> Result:
+        self.world           = World(self.collision_mode)
+        self.simulating_cars = {}
+        self.end_steps       = defaultdict(list)
+        self.stats           = SimulationStats()
+        self.collisions      = CollisionLog()
+        self.templates       = TemplateCache()
+        self.cars_status     = []
+        self.run_step        = None
+        self.max_steps       = 0
+
+    def add_car(self, car: Car, validate: bool = True) -> Result:
         """Add car to the simulator after validation.
         
         Arguments:
             car: (Car) Car to be added.
+            validate: (bool) False if name and position were validated against the
+            current world already.
 
         Return:
             Result: (Ok, Car) if validation passed and car added to world.
         """
-        result = self.validate_car_name(car.name)
-        if not result.ok():
-            return result
-        
-        result = self.validate_car_position(car.position)
-        if not result.ok():
-            return result
+        if validate:
+            result = self.validate_car_name(car.name)
+            if not result.ok():
+                return result
+            
+            result = self.validate_car_position(car.position)
+            if not result.ok():
+                return result
 
         self.world.add_car(car)
         self.logger.debug(f"Car added: {car.get_initial_status()}")
 
         return Result(True, object = car)
+
+    def add_cars(self, cars: list[Car], validate: bool = True) -> Result:
+        """Add a batch of cars to the simulator after validating the whole batch.
+
+        Names and positions of the batch are checked together with set operations
+        instead of one validation per car. Either every car is added, or none are
+        and all the problems found in the batch are reported.
+
+        Arguments:
+            cars: (list[Car]) Cars to be added.
+            validate: (bool) False if the batch was validated against the current world
+            already.
+
+        Returns:
+            Result: (Ok, list[Car]) if validation passed and all cars added to world,
+            otherwise the error contains every problem found, one per line.
+        """
+        errors = self.validate_cars(cars) if validate else []
+        if errors:
+            return Result(False, "\n".join(errors))
+
+        for car in cars:
+            self.world.add_car(car)
+        self.logger.debug(f"Cars added: {len(cars)}")
+
+        return Result(True, object = cars)
         
     def set_world_dimension(self, dimension: Vector2D) -> Result:
         """Set width and height of the world.
@@ -62,68 +156,500 @@ class CarSimulator:
             return result
         
         self.world.dimension = dimension
+        self.world.version  += 1
 
         return Result(True, object = dimension)
 
     def simulate(self):
-        """Run simulation for all the cars.
+        """Run simulation for all the cars to the end.
+
+        Time Complexity: O(p*n), p is length of longest command, n is number of cars.
+        """
+        for _ in self.simulate_iter():
+            pass
+
+    def simulate_iter(self, slice_steps: int | None = None, slice_ms: float | None = None) -> Iterator[SimulationProgress]:
+        """Run simulation for all the cars, yielding the progress between time slices.
+
+        The run state is kept by the returned generator, so a host can interleave runs,
+        show progress, pause by not advancing it, and cancel by closing it.
 
         The max number of steps simulated is always lesser or equals to the longest car command.
         Runs simulation until either max number of steps reached or no more cars available for simulation.
 
+        The planner chooses the engine from the scenario shape. Scenarios for the batch
+        engine are packed and simulated on arrays, and the results are written back to
+        the cars.
+        Cars that can never reach another car are fast-forwarded to their final state first,
+        unless history is recorded.
         For every simulation step, update the current simulating cars and then simulate the current step.
 
-        Time Complexity: O(p*n^2), p is length of longest command, n is number of cars.
+        Time Complexity: O(p*n), p is length of longest command, n is number of cars.
+
+        Arguments:
+            slice_steps: (int) Steps per slice, None for no limit.
+            slice_ms: (float) Milliseconds per slice, None for no limit.
+
+        Yields:
+            SimulationProgress: Progress after every slice.
         """
-        self.simulating_cars = self.world.cars
+        slicer = TimeSlicer(slice_steps, slice_ms)
+
+        self.simulating_cars = dict.fromkeys(self.world.cars)
+        self.stats.reset()
+        self.collisions = CollisionLog()
+        self.world.version += 1 # Cars move.
+        self.run_step       = None
+
+        plan = self.plan()
+        self.run_metadata = plan.to_dict()
+        self.logger.debug(f"Simulation plan: {plan.engine.name} engine, {plan.occupancy_backend.name} occupancy. {' '.join(plan.reasons)}")
+
+        if plan.engine == Engine.BATCH:
+            yield from self.simulate_batch(plan.occupancy_backend, slicer)
+            return
+
+        if plan.engine == Engine.COMPONENTS:
+            yield from self.simulate_components(plan.occupancy_backend, slicer)
+            return
+
         max_steps = max((len(car.commands) for car in self.simulating_cars), default=0)
 
+        # Bucket cars by the step they run out of commands.
+        self.end_steps = defaultdict(list)
+        for car in self.simulating_cars:
+            self.end_steps[len(car.commands)].append(car)
+
         self.logger.debug(f"Simulate World: ({self.world.dimension.x} x {self.world.dimension.y}), Total Cars: {len(self.world.cars)}")
 
-        for step in range(max_steps):
+        if self.history is not None:
+            self.history = HistoryIndex(self.history.max_segments, self.history.bucket_steps, self.history.bucket_cells)
+            self.history.start(self.world.cars)
+        elif plan.engine == Engine.FAST_FORWARD:
+            self.fast_forward_isolated_cars()
+
+        executor = self.create_thread_pool() if plan.engine == Engine.THREADS else None
+        try:
+            for step in range(max_steps):
+                self.update_simulation_cars(step)
+
+                if step % CONST_INDEXSAMPLESTEPS == 0:
+                    self.sample_index_size(step)
+
+                if not self.simulating_cars:
+                    break
+
+                if plan.engine == Engine.THREADS:
+                    self.simulate_step_threads(step, executor)
+                else:
+                    self.simulate_step(step)
+                self.stats.steps += 1
+
+                if self.step_observer:
+                    self.step_observer(step)
+
+                if slicer.due():
+                    yield SimulationProgress(step + 1, max_steps, len(self.simulating_cars))
+                    slicer.reset()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.sample_index_size(self.stats.steps)
+
+        if self.history is not None:
+            self.history.finalize(self.stats.steps)
+
+    # Forking #
+
+    def simulate_until(self, step: int):
+        """Run simulation stepwise to a step and keep the run state, so the run can be
+        forked and resumed.
+
+        Every car is stepped, without fast-forward or history, so the state of every car
+        at the step is known.
+
+        Arguments:
+            step: (int) Step to stop before.
+        """
+        self.simulating_cars = dict.fromkeys(self.world.cars)
+        self.stats.reset()
+        self.collisions = CollisionLog()
+        self.world.version += 1 # Cars move.
+        self.run_metadata   = {"engine": Engine.STEPWISE.name, "reasons": ["Kept stepwise run to be forked."]}
+
+        self.max_steps = max((len(car.commands) for car in self.simulating_cars), default=0)
+        self.end_steps = defaultdict(list)
+        for car in self.simulating_cars:
+            self.end_steps[len(car.commands)].append(car)
+
+        self.run_step = 0
+        self.resume(step)
+
+    def resume(self, step: int | None = None):
+        """Continue the kept run to a step, or to the end.
+
+        Time Complexity: O(s*n), s is number of steps simulated, n is number of cars.
+
+        Arguments:
+            step: (int) Step to stop before, None to run to the end.
+        """
+        end_step = self.max_steps if step is None else min(step, self.max_steps)
+        while self.run_step < end_step:
+            step = self.run_step
             self.update_simulation_cars(step)
 
+            if step % CONST_INDEXSAMPLESTEPS == 0:
+                self.sample_index_size(step)
+
             if not self.simulating_cars:
+                self.run_step = self.max_steps
                 break
 
             self.simulate_step(step)
+            self.stats.steps += 1
+            self.run_step    += 1
 
-    def update_simulation_cars(self, step: int):
-        """Update the next list of cars for simulation.
+    def fork(self) -> Result:
+        """Fork the kept run with structural sharing, to try variants from its step.
+
+        Both simulators share the cars and retired positions of the run so far, and
+        each only copies the cars and positions it changes afterwards. The fork gets
+        copies of the live cars, which change every step.
+
+        Time Complexity: O(l + e), l is number of live cars, e is number of collision
+        events so far.
+
+        Returns:
+            Result: (Ok, CarSimulator) of the fork if a run is kept.
+        """
+        if self.run_step is None:
+            return Result(False, "No kept run to fork, run simulate_until first.")
+
+        world, copies = self.world.fork()
+
+        simulator                 = CarSimulator(self.logger, self.collision_mode, use_fast_forward = False, workers = self.workers)
+        simulator.world           = world
+        simulator.simulating_cars = {copies[car]: None for car in self.simulating_cars}
+        simulator.templates       = self.templates
+        simulator.run_metadata    = dict(self.run_metadata)
+        simulator.run_step        = self.run_step
+        simulator.max_steps       = self.max_steps
+
+        # Cars running out of commands later, retired cars are skipped by the update.
+        for step, cars in self.end_steps.items():
+            simulator.end_steps[step] = [copies[car] for car in cars if car in copies]
+
+        simulator.stats.__dict__.update(self.stats.to_dict())
+        simulator.stats.index_sizes = list(self.stats.index_sizes)
+        simulator.collisions.events = list(self.collisions.events)
+
+        return Result(True, object = simulator)
+
+    def replace_commands(self, name: str, commands: tuple[Command, ...]) -> Result:
+        """Replace the commands of a live car of the kept run from its step on.
+
+        Arguments:
+            name: (str) Name of the car.
+            commands: (tuple[Command, ...]) Commands from the step of the run.
+
+        Returns:
+            Result: (Ok, Car) if the commands of a live car are replaced.
+        """
+        if self.run_step is None:
+            return Result(False, "No kept run to replace commands in, run simulate_until first.")
+
+        car = next((car for car in self.simulating_cars if car.name == name), None)
+        if car is None:
+            return Result(False, f"Car {name} is not simulated anymore.")
+
+        old_length = len(car.commands)
+        self.end_steps[old_length].remove(car)
+
+        car.commands       = (*car.commands[:self.run_step], *commands)
+        car.initial_status = None
+        self.end_steps[len(car.commands)].append(car)
+
+        # Cached status of the car shows the old commands.
+        index = next(index for index, other in enumerate(self.world.cars) if other is car)
+        if index < len(self.cars_status):
+            self.cars_status[index] = f"- {car.get_initial_status()}"
+
+        # The run lasts as long as the longest commands of all the cars.
+        if len(car.commands) >= self.max_steps:
+            self.max_steps = len(car.commands)
+        elif old_length == self.max_steps:
+            self.max_steps = max(len(other.commands) for other in self.world.cars)
+
+        self.world.version += 1
+        return Result(True, object = car)
+
+    def set_engine(self, engine: Engine | None = None, occupancy_backend: OccupancyBackend | None = None):
+        """Override the choices of the planner in the next simulations.
+
+        Arguments:
+            engine: (Engine) Simulation engine, None to let the planner choose.
+            occupancy_backend: (OccupancyBackend) Occupancy backend of the batch engine,
+            None to let the planner choose.
+        """
+        self.engine_override    = engine
+        self.occupancy_override = occupancy_backend
+
+    def plan(self) -> SimulationPlan:
+        """Choose the engine and occupancy backend of the next simulation, applying the
+        manual overrides.
 
-        For every car, if it is currently collided update its collision information;
-        else if there are still remaining commands add it to the next list of cars
-        for simulation.
+        Returns:
+            SimulationPlan: Chosen engine and occupancy backend.
+        """
+        record_history = self.history is not None
+        observe_steps  = self.step_observer is not None
+        plan = plan_simulation(self.world.cars, self.world.dimension, self.use_fast_forward, record_history, observe_steps,
+                               self.workers, self.threads)
+
+        engine = self.engine_override
+        if engine in (Engine.BATCH, Engine.COMPONENTS) and (record_history or observe_steps):
+            plan.reasons.append(f"Engine override {engine.name} ignored, history or step observer needs the car objects updated every step.")
+        elif engine == Engine.FAST_FORWARD and record_history:
+            plan.reasons.append(f"Engine override {engine.name} ignored, history needs every car stepped.")
+        elif engine is not None:
+            plan.reasons.append(f"Engine overridden to {engine.name}.")
+            plan.engine     = engine
+            plan.overridden = True
+
+        if plan.engine == Engine.THREADS and (self.threads <= 1 or not is_free_threaded()):
+            plan.reasons.append("Moves of every step are planned in this thread, threads need a free-threaded interpreter.")
+
+        if self.occupancy_override is not None:
+            plan.reasons.append(f"Occupancy backend overridden to {self.occupancy_override.name}.")
+            plan.occupancy_backend = self.occupancy_override
+            plan.overridden        = True
+
+        return plan
+
+    def simulate_batch(self, occupancy_backend: OccupancyBackend, slicer: TimeSlicer) -> Iterator[SimulationProgress]:
+        """Run simulation on the batch engine and write the results back to the cars.
+
+        Cars collided with the same cars at the same step share one collision event.
+        Counters of moves, rotations and wall bumps are not collected by the batch engine.
+
+        Arguments:
+            occupancy_backend: (OccupancyBackend) Occupancy backend of the batch engine.
+            slicer: (TimeSlicer) Time slices of the run.
+
+        Yields:
+            SimulationProgress: Progress after every slice.
+        """
+        cars  = self.world.cars
+        batch = BatchSimulator(self.collision_mode, occupancy_backend)
+        batch.add_fleet(self.world.dimension, self.pack_cars(cars))
+        yield from batch.simulate_iter(slicer = slicer)
+
+        self.apply_batch_results(cars, *get_group_results(batch))
+        self.finish_batch_results()
+
+    def simulate_components(self, occupancy_backend: OccupancyBackend, slicer: TimeSlicer) -> Iterator[SimulationProgress]:
+        """Run simulation of the interaction components on the batch engine and write
+        the results back to the cars.
+
+        Cars are grouped into components that may interact, and components are split into
+        groups of similar work. Every group is simulated apart for the steps of the whole
+        scenario, in worker processes when there are several workers, so the results
+        match a run of all the cars. In a worker process, progress is yielded after every
+        finished group. In this process, progress is of the running group.
+
+        Arguments:
+            occupancy_backend: (OccupancyBackend) Occupancy backend of the batch engine.
+            slicer: (TimeSlicer) Time slices of the run, in this process.
+
+        Yields:
+            SimulationProgress: Progress after every slice.
+        """
+        cars      = self.world.cars
+        dimension = self.world.dimension
+        max_steps = max((len(car.commands) for car in cars), default=0)
+
+        components = find_components(cars, dimension, self.templates)
+        groups     = split_groups(components, [len(car.commands) + 1 for car in cars],
+                                  max(self.workers, 1) * CONST_COMPONENTGROUPSPERWORKER)
+        fleets     = [self.pack_cars([cars[index] for index in group]) for group in groups]
+        self.logger.debug(f"Simulate {len(components)} components in {len(groups)} groups.")
+
+        if self.workers > 1 and len(groups) > 1:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+
+            with ProcessPoolExecutor(self.workers) as executor:
+                futures = {executor.submit(simulate_group, dimension, fleet, max_steps, self.collision_mode,
+                                           occupancy_backend): group for group, fleet in zip(groups, fleets)}
+                remaining = len(cars)
+                for finished, future in enumerate(as_completed(futures), start=1):
+                    group = futures[future]
+                    self.apply_batch_results([cars[index] for index in group], *future.result())
+                    remaining -= len(group)
+                    yield SimulationProgress(max_steps * finished // len(groups), max_steps, remaining)
+        else:
+            for group, fleet in zip(groups, fleets):
+                batch = create_group_batch(dimension, fleet, max_steps, self.collision_mode, occupancy_backend)
+                yield from batch.simulate_iter(slicer = slicer)
+                self.apply_batch_results([cars[index] for index in group], *get_group_results(batch))
+
+        self.finish_batch_results()
+
+    @staticmethod
+    def pack_cars(cars: list[Car]) -> PackedFleet:
+        """Pack cars at their current state for the batch engine.
+
+        Arguments:
+            cars: (list[Car]) Cars to pack.
+
+        Returns:
+            PackedFleet: Packed cars, in the same order.
+        """
+        fleet = PackedFleet()
+        for car in cars:
+            fleet.add_car(0, car.name, car.position.x, car.position.y, car.direction, Command.commands_to_string(car.commands))
+        return fleet
+
+    def apply_batch_results(self, cars: list[Car], xs: array, ys: array, headings: array,
+                            collided_steps: array, collided_cars: dict, steps: int):
+        """Write the results of a batch run back to the cars.
+
+        Cars collided with the same cars at the same step share one collision event.
+        Counters of moves, rotations and wall bumps are not collected by the batch engine.
+
+        Arguments:
+            cars: (list[Car]) Cars of the batch, in order of their index.
+            xs: (array[int]) Final x position of each car.
+            ys: (array[int]) Final y position of each car.
+            headings: (array[int]) Final heading index of each car.
+            collided_steps: (array[int]) Collision step of each car, -1 if not collided.
+            collided_cars: (dict{int->list}) Map from collided car to the cars it collided with.
+            steps: (int) Number of steps of the batch run.
+        """
+        self.stats.steps = max(self.stats.steps, steps)
+
+        events = {}
+        for index, car in enumerate(cars):
+            position = Vector2D(xs[index], ys[index])
+            if position != car.position:
+                self.world.set_car_position(car, position)
+            car.direction = CONST_DIRECTIONS[headings[index]]
+
+            step = collided_steps[index]
+            if step < 0:
+                continue
+
+            members = frozenset((index, *collided_cars[index]))
+            event   = events.get((step, members))
+            if event is None:
+                event = CollisionEvent(position, step, [cars[member] for member in members])
+                events[(step, members)] = event
+                self.collisions.events.append(event)
+
+            car.set_collision((event,), step)
+            self.world.retire_car(car)
+            self.stats.collisions += 1
+
+    def finish_batch_results(self):
+        """Finish writing back batch results once every car is written back."""
+        # Head-on swaps are the events with members in other cells.
+        for event in self.collisions.events:
+            event.crossing = any(member.position != event.position for member in event.members)
+
+        self.simulating_cars = {}
+
+    def enable_history(self, max_segments: int = CONST_HISTORYMAXSEGMENTS):
+        """Enable recording the history of car positions in the next simulations.
+
+        Arguments:
+            max_segments: (int) Maximum number of stored segments of history.
+        """
+        self.history = HistoryIndex(max_segments)
+
+    def fast_forward_isolated_cars(self):
+        """Run the commands of isolated cars at once and remove them from simulation.
+
+        Isolated cars can never collide, so their final position and direction are
+        computed in closed form and they are retired as static obstacles. Cars with the
+        same commands and direction share a trajectory template, a car whose path never
+        meets the field bounds is moved by translating the end of its template.
+        """
+        dimension = self.world.dimension
+        for car in find_isolated_cars(self.world.cars, dimension, templates = self.templates):
+            template = self.templates.get(car.commands, car.direction)
+            if template.fits(car.position, dimension):
+                position  = template.get_position(car.position, len(car.commands))
+                direction = template.get_direction(len(car.commands))
+            else:
+                position, direction = fast_forward(car.position, car.direction, car.commands, dimension)
+            self.logger.debug(f"\tCar {car.name}: fast-forwarded from {car.position} {car.direction.value} to {position} {direction.value}.")
+
+            self.world.set_car_position(car, position)
+            car.direction = direction
+
+            del self.simulating_cars[car]
+            self.world.retire_car(car)
+            self.stats.fast_forwarded += 1
+
+    def sample_index_size(self, step: int):
+        """Record the size of the world index at the current step.
 
         Arguments:
             step: (int) Current simulating step.
         """
-        next_cars = []
+        self.stats.index_sizes.append((step, *self.world.get_index_size()))
 
-        for car in self.simulating_cars:
-            if self.world.is_car_collided(car):
+    def update_simulation_cars(self, step: int):
+        """Update the next set of cars for simulation.
+
+        Only the positions entered in the previous step can hold new collisions, so
+        only cars in those positions are checked. Collided cars have their collision 
+        information updated and are removed from simulation, then cars that have no
+        remaining commands are retired by their end step bucket. Removed cars are moved
+        to the static obstacles of the world.
+
+        Time Complexity: O(d + e), d is number of cars in positions entered in the 
+        previous step, e is number of cars running out of commands at this step.
+
+        Arguments:
+            step: (int) Current simulating step.
+        """
+        for car in self.world.get_dirty_collided_cars():
+            if car in self.simulating_cars:
                 self.update_collision(car, step)
-            else:
-                if step < len(car.commands):
-                    # If car still has next simulation step, add to next list of cars.
-                    next_cars.append(car)
+                del self.simulating_cars[car]
+                self.world.retire_car(car)
 
-        self.simulating_cars = next_cars
+        for car in self.end_steps.pop(step, ()):
+            if car in self.simulating_cars:
+                del self.simulating_cars[car]
+                self.world.retire_car(car)
     
     def update_collision(self, car: Car, step: int):
         """Update the collision information of the current car and other collided cars.
 
+        Every collision event is applied to its members once, so a pile-up of k cars
+        is updated in O(k) instead of every car walking every other car.
+
         Arguments:
             car: (Car) Current car to update collision.
             step: (int) Current simulating step.
         """
         # Update current car collision information.
-        car.set_collision(self.world.get_collided_cars(car), step)
+        if not car.has_collided():
+            self.stats.collisions += 1
+        car.set_collision(self.collisions.get_events(car, self.world, step), step)
 
         # Update other cars that are not collided to be collided.
-        for other in car.collided_cars:
-            if not other.has_collided():
-                other.set_collision(self.world.get_collided_cars(other), step)
+        for event in car.collision_events:
+            if event.applied:
+                continue
+            event.applied = True
+
+            for other in event.members:
+                if not other.has_collided():
+                    other.set_collision(self.collisions.get_events(other, self.world, step), step)
+                    self.stats.collisions += 1
 
     def simulate_step(self, step: int):
         """Simulate the current step.
@@ -135,6 +661,10 @@ class CarSimulator:
         """
         self.logger.debug(f"Executing Step: {step}")
 
+        self.world.begin_step()
+        stats   = self.stats
+        history = self.history
+
         for car in self.simulating_cars:
             command = car.commands[step]
 
@@ -142,25 +672,95 @@ class CarSimulator:
             match command:
                 case Command.L:
                     car.rotate_left()
+                    stats.rotations += 1
                     self.logger.debug(f"\tCar {car.name}: {command.value} from {old_direction.value} to {car.direction.value}. [Success]")
                 case Command.R:
                     car.rotate_right()
+                    stats.rotations += 1
                     self.logger.debug(f"\tCar {car.name}: {command.value} from {old_direction.value} to {car.direction.value}. [Success]")
                 case Command.F:
                     new_position = car.get_new_forward_position()
                     if not self.world.out_of_bounds(new_position):
                         self.world.move_car(car, new_position)
+                        stats.moves += 1
+                        if history is not None:
+                            history.record_move(car, step, Direction.to_vector(car.direction))
                         self.logger.debug(f"\tCar {car.name}: {command.value} {car.direction.value} from {old_position} to {new_position}. [Success]")
                     else:
+                        stats.wall_bumps += 1
                         self.logger.debug(f"\tCar {car.name}: {command.value} {car.direction.value} from {old_position} to {new_position}. [Failed]")
     
-    def get_cars_status(self) -> list[str]:
-        """Return initial status of all cars.
-        
+    def create_thread_pool(self):
+        """Create the thread pool of the thread pool engine.
+
         Returns:
-            list[str]: List of string of initial status of all cars.
+            ThreadPoolExecutor: Thread pool, None if threads would not run in parallel.
         """
-        return [f"- {car.get_initial_status()}" for car in self.world.cars]
+        if self.threads <= 1 or not is_free_threaded():
+            return None
+
+        # Thread pool is only imported when threads run in parallel.
+        from concurrent.futures import ThreadPoolExecutor
+
+        return ThreadPoolExecutor(self.threads)
+
+    def simulate_step_threads(self, step: int, executor):
+        """Simulate the current step in two phases.
+
+        First, the intended moves of shards of the live cars are planned in parallel
+        without changing any car. Then the shards are merged in order, moving the cars
+        in the world, so the occupancy and the collisions detected by the next update
+        are the same as stepping every car in order.
+
+        Arguments:
+            step: (int) Current simulating step.
+            executor: (ThreadPoolExecutor) Thread pool planning the shards, None to plan
+            in this thread.
+        """
+        self.logger.debug(f"Executing Step: {step}")
+
+        self.world.begin_step()
+        cars      = list(self.simulating_cars)
+        dimension = self.world.dimension
+
+        if executor is None or len(cars) < CONST_THREADMINCARS:
+            shards = [plan_moves(cars, step, dimension)]
+        else:
+            shards = list(executor.map(plan_moves, split_shards(cars, self.threads), [step] * self.threads,
+                                       [dimension] * self.threads))
+
+        stats   = self.stats
+        history = self.history
+        for intents, rotations, moves, wall_bumps in shards:
+            for car, direction, position in intents:
+                if position is None:
+                    car.direction = direction
+                else:
+                    self.world.move_car(car, position)
+                    if history is not None:
+                        history.record_move(car, step, Direction.to_vector(direction))
+
+            stats.rotations  += rotations
+            stats.moves      += moves
+            stats.wall_bumps += wall_bumps
+
+    def get_cars_status(self, start: int = 0) -> list[str]:
+        """Return initial status of all cars. Status of cars added since the last call
+        are formatted and cached, cars are only ever appended to the world, and status
+        of cars with replaced commands are formatted again when replaced.
+
+        Time Complexity: O(k + m), k is number of cars added since the last call, m is
+        number of cars returned.
+
+        Arguments:
+            start: (int) Index of the first car to return.
+
+        Returns:
+            list[str]: List of string of initial status of all cars from the start.
+        """
+        cars = self.world.cars
+        self.cars_status.extend(f"- {cars[index].get_initial_status()}" for index in range(len(self.cars_status), len(cars)))
+        return self.cars_status[start:]
     
     def get_simulation_result(self) -> list[str]:
         """Return current status of all cars.
@@ -172,7 +772,8 @@ class CarSimulator:
 
     # Validation #
 
-    def validate_world_dimension(self, dimension: Vector2D) -> Result:
+    @staticmethod
+    def validate_world_dimension(dimension: Vector2D) -> Result:
         """Validates the world dimension before setting.
 
         Arguments:
@@ -218,4 +819,57 @@ class CarSimulator:
         if self.world.out_of_bounds(position):
             return Result(False, f"Position {position} is out of the field bounds.")
         
-        return Result(True, object = position)
\ No newline at end of file
+        return Result(True, object = position)
+
+    def validate_cars(self, cars: list[Car], dimension: Vector2D | None = None) -> list[str]:
+        """Validates a batch of cars against the world and against each other.
+
+        Time Complexity: O(n + m), n is number of cars in batch, m is number of cars in world.
+
+        Arguments:
+            cars: (list[Car]) Cars to be validated.
+            dimension: (Vector2D) Dimension the positions are checked against, None for
+            the world dimension.
+
+        Returns:
+            list[str]: Every problem found in the batch, empty if the batch is valid.
+        """
+        errors = []
+
+        names     = [car.name for car in cars]
+        positions = [car.position for car in cars]
+
+        # Duplicate names within the batch, then clashes with existing cars.
+        batch_names = set(names)
+        if len(batch_names) != len(names):
+            seen = set()
+            for name in names:
+                if name in seen:
+                    errors.append(f"Car with name {name} is duplicated in the batch.")
+                seen.add(name)
+
+        world_names = {car.name for car in self.world.cars}
+        for name in sorted(batch_names & world_names):
+            errors.append(f"Car with name {name} already exists.")
+
+        # Duplicate positions within the batch, then clashes with existing cars.
+        batch_positions = set(positions)
+        if len(batch_positions) != len(positions):
+            seen = set()
+            for position in positions:
+                if position in seen:
+                    errors.append(f"Position {position} is duplicated in the batch.")
+                seen.add(position)
+
+        for position in dict.fromkeys(positions):
+            if self.world.has_car_at_position(position):
+                errors.append(f"Another car is already in position {position}.")
+
+        # Bounds.
+        dimension     = dimension or self.world.dimension
+        width, height = dimension.x, dimension.y
+        for position in positions:
+            if not (0 <= position.x < width and 0 <= position.y < height):
+                errors.append(f"Position {position} is out of the field bounds.")
+
+        return errors
\ No newline at end of file
@@ -0,0 +1,35 @@
+class SimulationStats:
+    """Counters of the simulation hot path.
+
+    Attributes:
+        steps: (int) Number of simulated steps.
+        moves: (int) Number of successful forward moves.
+        rotations: (int) Number of left and right rotations.
+        wall_bumps: (int) Number of forward moves blocked by the field bounds.
+        collisions: (int) Number of cars that collided.
+        fast_forwarded: (int) Number of isolated cars run in closed form.
+        index_sizes: (list[tuple[int, int, int]]) Samples over time of (step, live positions,
+        static positions) of the world index.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.reset()
+
+    def reset(self):
+        """Reset all counters to zero."""
+        self.steps          = 0
+        self.moves          = 0
+        self.rotations      = 0
+        self.wall_bumps     = 0
+        self.collisions     = 0
+        self.fast_forwarded = 0
+        self.index_sizes    = []
+
+    def to_dict(self) -> dict:
+        """Convert counters to dictionary.
+
+        Returns:
+            dict: Counter name to value.
+        """
+        return dict(vars(self))
@@ -0,0 +1,60 @@
+import sys
+
+from .car                   import Car
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+def is_free_threaded() -> bool:
+    """Check the interpreter runs threads in parallel, without the global interpreter lock.
+
+    Returns:
+        bool: True on a free-threaded build with the GIL disabled.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+def split_shards(cars: list[Car], count: int) -> list[list[Car]]:
+    """Split cars into contiguous shards of similar size, keeping the order of the cars.
+
+    Arguments:
+        cars: (list[Car]) Cars to split.
+        count: (int) Max number of shards.
+
+    Returns:
+        list[list[Car]]: Non-empty shards in order.
+    """
+    size = max(-(-len(cars) // max(count, 1)), 1)
+    return [cars[start:start + size] for start in range(0, len(cars), size)]
+
+def plan_moves(cars: list[Car], step: int, dimension: Vector2D) -> tuple[list[tuple], int, int, int]:
+    """Compute the intended move of every car of a shard at a step, without changing
+    any car. Runs in a thread of the pool.
+
+    Arguments:
+        cars: (list[Car]) Cars of the shard.
+        step: (int) Current simulating step.
+        dimension: (Vector2D) Width and height of the world field.
+
+    Returns:
+        tuple[list[tuple], int, int, int]: List of (car, new direction, new position or
+        None if the car stays), then number of rotations, moves and wall bumps.
+    """
+    intents          = []
+    rotations, moves = 0, 0
+    width, height    = dimension.x, dimension.y
+    for car in cars:
+        match car.commands[step]:
+            case Command.L:
+                intents.append((car, Direction.rotate_left(car.direction), None))
+                rotations += 1
+            case Command.R:
+                intents.append((car, Direction.rotate_right(car.direction), None))
+                rotations += 1
+            case Command.F:
+                position = car.get_new_forward_position()
+                if 0 <= position.x < width and 0 <= position.y < height:
+                    intents.append((car, car.direction, position))
+                    moves += 1
+
+    wall_bumps = len(cars) - rotations - moves
+    return intents, rotations, moves, wall_bumps
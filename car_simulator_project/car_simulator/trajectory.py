@@ -0,0 +1,214 @@
+from array     import array
+from bisect    import bisect_right
+from itertools import groupby
+
+from .packed_fleet          import CONST_DIRECTIONS
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+CONST_DELTAS = [Direction.to_vector(direction) for direction in CONST_DIRECTIONS] # Forward move of each heading index.
+CONST_TURNS  = {Command.L: -1, Command.R: 1, Command.F: 0}                        # Quarter turns of each command.
+
+class TrajectoryTemplate:
+    """Path of a command sequence from a starting heading, relative to the start cell,
+    as if the field had no bounds.
+
+    The path is stored as runs of the same command, with the offset and heading at the
+    start of every run. A car follows the template translated to its start cell as long
+    as none of its moves is blocked by the field bounds, which is checked once per car
+    by fitting the bounding box of the template in the field.
+
+    Attributes:
+        starts: (array[int]) Step of the start of every run, and number of commands.
+        xs: (array[int]) x offset from the start cell at the start of every run.
+        ys: (array[int]) y offset from the start cell at the start of every run.
+        headings: (array[int]) Heading index at the start of every run, in order of Direction.
+        turns: (array[int]) Quarter turns per step of every run, -1 left, 1 right and
+        0 forward.
+        min_x: (int) Smallest x offset of the path.
+        min_y: (int) Smallest y offset of the path.
+        max_x: (int) Largest x offset of the path.
+        max_y: (int) Largest y offset of the path.
+    """
+
+    def __init__(self, commands: tuple[Command, ...], direction: Direction):
+        """Initialization, compiles the path of the commands.
+
+        Time Complexity: O(p), p is length of commands.
+
+        Arguments:
+            commands: (tuple[Command]) Car commands.
+            direction: (Direction) Starting forward direction.
+        """
+        self.starts   = array("q")
+        self.xs       = array("i")
+        self.ys       = array("i")
+        self.headings = array("b")
+        self.turns    = array("b")
+
+        heading, x, y, step = CONST_DIRECTIONS.index(direction), 0, 0, 0
+        for command, run in groupby(commands):
+            length = sum(1 for _ in run)
+            turn   = CONST_TURNS[command]
+            self.add_run(step, x, y, heading, turn)
+
+            if turn:
+                heading = (heading + turn * length) & 3
+            else:
+                x += CONST_DELTAS[heading].x * length
+                y += CONST_DELTAS[heading].y * length
+            step += length
+
+        # End of the path, so every step up to the number of commands has a run.
+        self.add_run(step, x, y, heading, 0)
+
+        # Forward runs are straight, so the path is bounded by the ends of the runs.
+        self.min_x, self.max_x = min(self.xs), max(self.xs)
+        self.min_y, self.max_y = min(self.ys), max(self.ys)
+
+    def add_run(self, step: int, x: int, y: int, heading: int, turn: int):
+        """Add a run of the path.
+
+        Arguments:
+            step: (int) Step of the start of the run.
+            x: (int) x offset at the start of the run.
+            y: (int) y offset at the start of the run.
+            heading: (int) Heading index at the start of the run.
+            turn: (int) Quarter turns per step of the run.
+        """
+        self.starts.append(step)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.headings.append(heading)
+        self.turns.append(turn)
+
+    def get_state(self, step: int) -> tuple[int, int, int]:
+        """Get the offset and heading after a number of steps.
+
+        Time Complexity: O(log r), r is number of runs.
+
+        Arguments:
+            step: (int) Number of steps run, up to the number of commands.
+
+        Returns:
+            tuple[int, int, int]: x offset, y offset and heading index.
+        """
+        run     = bisect_right(self.starts, step) - 1
+        steps   = step - self.starts[run]
+        heading = self.headings[run]
+        if self.turns[run]:
+            return self.xs[run], self.ys[run], (heading + self.turns[run] * steps) & 3
+
+        delta = CONST_DELTAS[heading]
+        return self.xs[run] + delta.x * steps, self.ys[run] + delta.y * steps, heading
+
+    def fits(self, position: Vector2D, dimension: Vector2D) -> bool:
+        """Check the path translated to a start cell never leaves the field.
+
+        Time Complexity: O(1).
+
+        Arguments:
+            position: (Vector2D) Start cell of car.
+            dimension: (Vector2D) Width and height of the world field.
+
+        Returns:
+            bool: True if no move of the path is blocked by the field bounds.
+        """
+        return (position.x + self.min_x >= 0 and position.x + self.max_x < dimension.x and
+                position.y + self.min_y >= 0 and position.y + self.max_y < dimension.y)
+
+    def get_position(self, position: Vector2D, step: int) -> Vector2D:
+        """Get the position after a number of steps, translated to a start cell.
+
+        Arguments:
+            position: (Vector2D) Start cell of car.
+            step: (int) Number of steps run.
+
+        Returns:
+            Vector2D: Position of car.
+        """
+        x, y, _ = self.get_state(step)
+        return Vector2D(position.x + x, position.y + y)
+
+    def get_direction(self, step: int) -> Direction:
+        """Get the forward direction after a number of steps.
+
+        Arguments:
+            step: (int) Number of steps run.
+
+        Returns:
+            Direction: Forward direction of car.
+        """
+        return CONST_DIRECTIONS[self.get_state(step)[2]]
+
+    def get_reach_box(self, position: Vector2D) -> tuple[int, int, int, int]:
+        """Get the box bounding the path translated to a start cell.
+
+        Arguments:
+            position: (Vector2D) Start cell of car.
+
+        Returns:
+            tuple[int, int, int, int]: Reach box in (min x, min y, max x, max y).
+        """
+        return (position.x + self.min_x, position.y + self.min_y,
+                position.x + self.max_x, position.y + self.max_y)
+
+    def nbytes(self) -> int:
+        """Get memory used by the arrays of the template.
+
+        Returns:
+            int: Number of bytes.
+        """
+        return sum(len(a) * a.itemsize for a in (self.starts, self.xs, self.ys, self.headings, self.turns))
+
+class TemplateCache:
+    """Templates shared by every car with the same commands and starting direction.
+
+    Attributes:
+        templates: (dict{tuple->TrajectoryTemplate}) Map from (commands, direction) to
+        the compiled template.
+        hits: (int) Number of lookups answered by an already compiled template.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.templates = {}
+        self.hits      = 0
+
+    def __len__(self) -> int:
+        """Number of compiled templates.
+
+        Returns:
+            int: Number of distinct (commands, direction) compiled.
+        """
+        return len(self.templates)
+
+    def get(self, commands: list[Command], direction: Direction) -> TrajectoryTemplate:
+        """Get the template of commands from a starting direction, compiled on first use.
+
+        Time Complexity: O(p) to hash the commands, p is length of commands. O(p) more
+        on the first use of the commands and direction.
+
+        Arguments:
+            commands: (list[Command]) Car commands.
+            direction: (Direction) Starting forward direction.
+
+        Returns:
+            TrajectoryTemplate: Template of the commands.
+        """
+        key      = (tuple(commands), direction)
+        template = self.templates.get(key)
+        if template is None:
+            template = TrajectoryTemplate(key[0], direction)
+            self.templates[key] = template
+        else:
+            self.hits += 1
+        return template
+
+    def nbytes(self) -> int:
+        """Get memory used by the arrays of all templates.
+
+        Returns:
+            int: Number of bytes.
+        """
+        return sum(template.nbytes() for template in self.templates.values())
@@ -1,29 +1,58 @@
 from collections import defaultdict
+from typing      import Self
 
 from .consts            import CONST_MINWIDTH, CONST_MINHEIGHT
 from .car               import Car
+from .collision_enum    import CollisionMode
+from .overlay           import CarList, StaticMap
 from ..utility.position import Vector2D
 
 class World:
     """World of the simulation. Containing all the cars.
 
     Attributes:
-        cars: (list[Car]) List of all cars in the world.
-        position_map: (defaultdict{Vector2D->set}) Map from position to a set of cars. 
-        Mainly used for car collision checking.
+        cars: (list[Car] | CarList) List of all cars in the world.
+        position_map: (dict{Vector2D->set}) Map from position to a set of live cars. 
+        Mainly used for car collision checking. Positions without cars are deleted.
+        static_map: (dict{Vector2D->set} | StaticMap) Map from position to a set of retired
+        cars, which no longer move because they have collided or have no remaining commands.
+        Retired cars are still obstacles for collision checking.
         dimension: (Vector2D) Width and height of the world field.
+        collision_mode: (CollisionMode) Collision detection mode.
+        edge_map: (dict{(Vector2D, Vector2D)->Car}) Map from directed edge (from, to) to
+        the car moving along it in the current step. Only used in edge crossing mode.
+        crossing_map: (defaultdict{Car->set}) Map from car to the cars it swapped cells 
+        with in the current step. Only used in edge crossing mode.
+        dirty_positions: (set{Vector2D}) Positions entered by a car in the current step.
+        Collisions can only happen in these positions.
+        version: (int) Version of the cars and field, increased when cars are added,
+        the field is resized or cars are simulated.
+        overlay: (bool) True if cars and retired cars are shared with forked worlds, and
+        copied before they are changed.
     """
 
-    def __init__(self):
-        """Initialization"""
-        self.cars         = []
-        self.position_map = defaultdict(set)
-        self.dimension    = Vector2D(CONST_MINWIDTH, CONST_MINHEIGHT)
+    def __init__(self, collision_mode: CollisionMode = CollisionMode.CELL):
+        """Initialization
+
+        Arguments:
+            collision_mode: (CollisionMode) Collision detection mode.
+        """
+        self.cars            = []
+        self.position_map    = {}
+        self.static_map      = {}
+        self.dimension       = Vector2D(CONST_MINWIDTH, CONST_MINHEIGHT)
+        self.collision_mode  = collision_mode
+        self.edge_map        = {}
+        self.crossing_map    = defaultdict(set)
+        self.dirty_positions = set()
+        self.version         = 0
+        self.overlay         = False
 
     def add_car(self, car: Car):
         """Add a car to the world."""
         self.cars.append(car)
         self.add_car_to_map(car)
+        self.version += 1
 
     def move_car(self, car: Car, new_position: Vector2D):
         """Move car in world.
@@ -32,9 +61,124 @@ class World:
             car: (Car) Car to be moved.
             new_position: (Vector2D) New position of the car.
         """
+        if self.collision_mode == CollisionMode.EDGE:
+            self.add_edge(car, car.position, new_position)
+
         self.remove_car_from_map(car)
         car.position = new_position
         self.add_car_to_map(car)
+        self.dirty_positions.add(new_position)
+
+        # Retired cars of a shared position are copied before a collision changes them.
+        if self.overlay and new_position in self.static_map:
+            self.static_map.own(new_position)
+
+    def retire_car(self, car: Car):
+        """Move a car that no longer moves from the live index to the static obstacles.
+
+        Arguments:
+            car: (Car) Car to be retired.
+        """
+        cars = self.position_map.get(car.position)
+        if cars is None or car not in cars:
+            return
+
+        self.remove_car_from_map(car)
+        self.static_map.setdefault(car.position, set()).add(car)
+
+    def fork(self) -> tuple[Self, dict]:
+        """Fork the world with structural sharing.
+
+        Cars and retired positions are frozen in a base shared by both worlds, each world
+        only stores the cars and positions it changes afterwards. The base still holds
+        the live cars of this world and the retired cars in positions entered in the last
+        step, whose collisions are pending. This world keeps changing them, so the fork
+        gets copies of them right away.
+
+        Time Complexity: O(l + d), l is number of live cars, d is number of retired cars
+        in positions entered in the last step.
+
+        Returns:
+            tuple[World, dict]: Forked world, and map from live car to its copy.
+        """
+        if not self.overlay or self.cars.is_modified() or self.static_map.is_modified():
+            self.cars       = CarList(self.cars)
+            self.static_map = StaticMap(self.static_map, self.cars)
+            self.overlay    = True
+
+        world            = World(self.collision_mode)
+        world.dimension  = self.dimension
+        world.version    = self.version
+        world.cars       = CarList(self.cars.base)
+        world.static_map = StaticMap(self.static_map.base, world.cars)
+        world.overlay    = True
+
+        copies = {}
+        for position, cars in self.position_map.items():
+            for car in cars:
+                copy        = car.copy()
+                copies[car] = copy
+                world.cars.replace(car, copy)
+            world.position_map[position] = {copies[car] for car in cars}
+
+        # Head-on swaps of the last step, cars retired since have had them detected.
+        world.dirty_positions = set(self.dirty_positions)
+        for car, others in self.crossing_map.items():
+            if car in copies:
+                world.crossing_map[copies[car]] = {copies[other] for other in others}
+
+        for position in self.dirty_positions:
+            if position in world.static_map:
+                world.static_map.own(position)
+
+        return world, copies
+
+    def get_index_size(self) -> tuple[int, int]:
+        """Get the number of positions in the live index and static obstacles.
+
+        Returns:
+            tuple[int, int]: Number of live positions and number of static positions.
+        """
+        return len(self.position_map), len(self.static_map)
+
+    def set_car_position(self, car: Car, position: Vector2D):
+        """Place car at a position in world, without recording it as a move of the 
+        current step.
+
+        Arguments:
+            car: (Car) Car to be placed.
+            position: (Vector2D) New position of the car.
+        """
+        self.remove_car_from_map(car)
+        car.position = position
+        self.add_car_to_map(car)
+
+    def begin_step(self):
+        """Clear the per step dirty positions and edge index before simulating a new step."""
+        self.dirty_positions.clear()
+        if self.edge_map or self.crossing_map:
+            self.edge_map.clear()
+            self.crossing_map.clear()
+
+    def add_edge(self, car: Car, old_position: Vector2D, new_position: Vector2D):
+        """Add the directed edge of a car move to the edge index of the current step.
+
+        If another car moved along the reverse edge in the same step, the two cars
+        swapped cells head-on and are recorded as crossed.
+
+        Time Complexity: O(1).
+
+        Arguments:
+            car: (Car) Car being moved.
+            old_position: (Vector2D) Position the car moves from.
+            new_position: (Vector2D) Position the car moves to.
+        """
+        self.edge_map[(old_position, new_position)] = car
+
+        other = self.edge_map.get((new_position, old_position))
+        if other is not None:
+            self.crossing_map[car].add(other)
+            self.crossing_map[other].add(car)
 
     # Checks #
 
@@ -58,7 +202,7 @@ class World:
         Returns:
             bool: True if any car in position of world, otherwise False.
         """
-        return position in self.position_map
+        return position in self.position_map or position in self.static_map
     
     def out_of_bounds(self, position: Vector2D) -> bool:
         """Check if position is out of world boundary.
@@ -81,8 +225,48 @@ class World:
         Returns:
             bool: True if car has collided with another car, otherwise False.
         """
-        return len(self.position_map[car.position]) >= 2
+        return self.count_cars_at_position(car.position) >= 2 or car in self.crossing_map
+
+    def count_cars_at_position(self, position: Vector2D) -> int:
+        """Count live and retired cars in position.
+
+        Arguments:
+            position: (Vector2D) Position to count.
+
+        Returns:
+            int: Number of cars in position.
+        """
+        return len(self.position_map.get(position, ())) + len(self.static_map.get(position, ()))
+
+    def get_cars_at_position(self, position: Vector2D) -> list[Car]:
+        """Get live and retired cars in position.
+
+        Arguments:
+            position: (Vector2D) Position to get cars of.
+
+        Returns:
+            list[Car]: List of cars in position.
+        """
+        return [*self.position_map.get(position, ()), *self.static_map.get(position, ())]
     
+    def get_dirty_collided_cars(self) -> list[Car]:
+        """Get all the cars collided in the positions entered in the current step.
+
+        Time Complexity: O(d), d is number of cars in dirty positions or crossed.
+
+        Returns:
+            list[Car]: List of cars in dirty positions with other cars, and cars 
+            that swapped cells head-on.
+        """
+        collided_cars = []
+        for position in self.dirty_positions:
+            if self.count_cars_at_position(position) >= 2:
+                collided_cars.extend(self.get_cars_at_position(position))
+
+        collided_cars.extend(self.crossing_map)
+
+        return collided_cars
+
     def get_collided_cars(self, car: Car) -> list[Car]:
         """Get all the cars collided with the current car.
         
@@ -92,8 +276,12 @@ class World:
         Returns:
             list[Car]: List of cars that are collided with the current car.
         """
-        collided_cars = list(self.position_map[car.position])
+        collided_cars = self.get_cars_at_position(car.position)
         collided_cars.remove(car)
+
+        # Cars swapped head-on with the current car.
+        if car in self.crossing_map:
+            collided_cars.extend(self.crossing_map[car].difference(collided_cars))
         
         return collided_cars
 
@@ -103,12 +291,16 @@ class World:
         Arguments:
             car: (Car) Current car to be added.
         """
-        self.position_map[car.position].add(car)
+        self.position_map.setdefault(car.position, set()).add(car)
 
     def remove_car_from_map(self, car: Car):
-        """Remove car from the car set of the position map.
+        """Remove car from the car set of the position map. The position is deleted
+        from the map when no car is left in it.
         
         Arguments:
             car: (Car) Current car to be removed.
         """
-        self.position_map[car.position].remove(car)
\ No newline at end of file
+        cars = self.position_map[car.position]
+        cars.remove(car)
+        if not cars:
+            del self.position_map[car.position]
\ No newline at end of file
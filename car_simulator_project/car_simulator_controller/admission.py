@@ -0,0 +1,451 @@
+import json
+import threading
+from bisect      import bisect_left
+from contextlib  import contextmanager
+from itertools   import accumulate
+from typing      import Iterator
+
+from .config                  import CONFIG_COSTSECONDSPERCAR, CONFIG_COSTSECONDSPERCARSTEP, CONFIG_COSTSECONDSPERSTEP, \
+                                     CONFIG_COSTSECONDSPERCELL, CONFIG_COSTBYTESPERCAR, CONFIG_COSTBYTESPERCARSTEP, \
+                                     CONFIG_COSTBYTESPERCELL, CONFIG_COSTBYTESPERHISTORYSTEP, CONFIG_ADMISSIONQUEUESLOTS
+from .result                  import Result
+from .admission_enum          import Admission
+from ..car_simulator.consts   import CONST_PLANGRIDMAXCELLS
+from ..car_simulator.scenario import Scenario
+
+class CostEstimate:
+    """Predicted cost of a simulation run.
+
+    Attributes:
+        seconds: (float) Predicted runtime in seconds.
+        bytes: (float) Predicted memory in bytes.
+        steps: (int) Steps of the run.
+        history: (bool) True if the run records history.
+    """
+
+    def __init__(self, seconds: float, bytes: float, steps: int, history: bool):
+        """Initialization.
+
+        Arguments:
+            seconds: (float) Predicted runtime in seconds.
+            bytes: (float) Predicted memory in bytes.
+            steps: (int) Steps of the run.
+            history: (bool) True if the run records history.
+        """
+        self.seconds = seconds
+        self.bytes   = bytes
+        self.steps   = steps
+        self.history = history
+
+    def to_dict(self) -> dict:
+        """Convert estimate to run metadata.
+
+        Returns:
+            dict: Seconds, bytes, steps and history.
+        """
+        return {"seconds": self.seconds, "bytes": self.bytes, "steps": self.steps, "history": self.history}
+
+    def __repr__(self):
+        """Debug purposes.
+
+        Returns:
+            str: Predicted runtime and memory.
+        """
+        return f"{self.seconds:.3g} seconds and {self.bytes / (1 << 20):.3g} MiB over {self.steps} steps"
+
+class CommandLengths:
+    """Command lengths of the cars of a scenario, sorted to count the car steps of the
+    first steps of the run in O(log n).
+
+    Attributes:
+        lengths: (list[int]) Sorted command lengths.
+        prefix: (list[int]) Sum of the lengths before every index.
+    """
+
+    def __init__(self, lengths: list[int]):
+        """Initialization.
+
+        Arguments:
+            lengths: (list[int]) Command length of every car.
+        """
+        self.lengths = sorted(lengths)
+        self.prefix  = list(accumulate(self.lengths, initial = 0))
+
+    def __len__(self) -> int:
+        """Number of cars."""
+        return len(self.lengths)
+
+    def get_max_steps(self) -> int:
+        """Length of the longest command, the steps of a full run."""
+        return self.lengths[-1] if self.lengths else 0
+
+    def get_car_steps(self, steps: int) -> int:
+        """Count the commands run by all the cars in the first steps.
+
+        Arguments:
+            steps: (int) Steps of the run.
+
+        Returns:
+            int: Number of car steps.
+        """
+        index = bisect_left(self.lengths, steps)
+        return self.prefix[index] + (len(self.lengths) - index) * steps
+
+class CostModel:
+    """Linear model of the runtime and memory of a simulation run, from the number of
+    cars, the commands run by the cars, the steps of the longest command and the field
+    cells up to the grid occupancy size. Coefficients are calibrated by the cost
+    benchmark of the benchmark suite.
+
+    Attributes:
+        seconds_per_car: (float) Seconds per car.
+        seconds_per_car_step: (float) Seconds per command of a car.
+        seconds_per_step: (float) Seconds per step of the run.
+        seconds_per_cell: (float) Seconds per cell of the field.
+        bytes_per_car: (float) Bytes per car.
+        bytes_per_car_step: (float) Bytes per command of a car.
+        bytes_per_cell: (float) Bytes per cell of the field.
+        bytes_per_history_step: (float) Bytes per command of a car recorded in history.
+    """
+
+    def __init__(self, seconds_per_car: float = CONFIG_COSTSECONDSPERCAR, seconds_per_car_step: float = CONFIG_COSTSECONDSPERCARSTEP,
+                 seconds_per_step: float = CONFIG_COSTSECONDSPERSTEP, seconds_per_cell: float = CONFIG_COSTSECONDSPERCELL,
+                 bytes_per_car: float = CONFIG_COSTBYTESPERCAR, bytes_per_car_step: float = CONFIG_COSTBYTESPERCARSTEP,
+                 bytes_per_cell: float = CONFIG_COSTBYTESPERCELL, bytes_per_history_step: float = CONFIG_COSTBYTESPERHISTORYSTEP):
+        """Initialization.
+
+        Arguments:
+            seconds_per_car: (float) Seconds per car.
+            seconds_per_car_step: (float) Seconds per command of a car.
+            seconds_per_step: (float) Seconds per step of the run.
+            seconds_per_cell: (float) Seconds per cell of the field.
+            bytes_per_car: (float) Bytes per car.
+            bytes_per_car_step: (float) Bytes per command of a car.
+            bytes_per_cell: (float) Bytes per cell of the field.
+            bytes_per_history_step: (float) Bytes per command of a car recorded in history.
+        """
+        self.seconds_per_car        = seconds_per_car
+        self.seconds_per_car_step   = seconds_per_car_step
+        self.seconds_per_step       = seconds_per_step
+        self.seconds_per_cell       = seconds_per_cell
+        self.bytes_per_car          = bytes_per_car
+        self.bytes_per_car_step     = bytes_per_car_step
+        self.bytes_per_cell         = bytes_per_cell
+        self.bytes_per_history_step = bytes_per_history_step
+
+    def estimate(self, lengths: CommandLengths, area: int, history: bool = False, steps: int | None = None) -> CostEstimate:
+        """Predict the cost of a run.
+
+        Time Complexity: O(log n), n is number of cars.
+
+        Arguments:
+            lengths: (CommandLengths) Command lengths of the cars.
+            area: (int) Number of cells of the field.
+            history: (bool) True if the run records history.
+            steps: (int) Steps the run is cut to, None for a full run.
+
+        Returns:
+            CostEstimate: Predicted runtime and memory.
+        """
+        steps     = lengths.get_max_steps() if steps is None else min(steps, lengths.get_max_steps())
+        car_steps = lengths.get_car_steps(steps)
+        cells     = min(area, CONST_PLANGRIDMAXCELLS)
+
+        seconds = (self.seconds_per_car * len(lengths) + self.seconds_per_car_step * car_steps +
+                   self.seconds_per_step * steps + self.seconds_per_cell * cells)
+        bytes   = self.bytes_per_car * len(lengths) + self.bytes_per_car_step * car_steps + self.bytes_per_cell * cells
+        if history:
+            bytes += self.bytes_per_history_step * car_steps
+
+        return CostEstimate(seconds, bytes, steps, history)
+
+    def fit_steps(self, lengths: CommandLengths, area: int, history: bool, max_seconds: float | None, max_bytes: float | None) -> int:
+        """Find the most steps of a run within the budgets.
+
+        Time Complexity: O(log(p) * log(n)), p is length of longest command, n is number of cars.
+
+        Arguments:
+            lengths: (CommandLengths) Command lengths of the cars.
+            area: (int) Number of cells of the field.
+            history: (bool) True if the run records history.
+            max_seconds: (float) Runtime budget, None for no limit.
+            max_bytes: (float) Memory budget, None for no limit.
+
+        Returns:
+            int: Most steps within the budgets, -1 if even a run of no step exceeds them.
+        """
+        low, high = -1, lengths.get_max_steps()
+        while low < high:
+            steps    = (low + high + 1) // 2
+            estimate = self.estimate(lengths, area, history, steps)
+            if is_within(estimate, max_seconds, max_bytes):
+                low = steps
+            else:
+                high = steps - 1
+        return low
+
+    def to_dict(self) -> dict:
+        """Convert model to its coefficients.
+
+        Returns:
+            dict: Map from coefficient name to value.
+        """
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, coefficients: dict) -> "CostModel":
+        """Create a model from coefficients, missing coefficients are defaults.
+
+        Arguments:
+            coefficients: (dict) Map from coefficient name to value.
+
+        Returns:
+            CostModel: Cost model.
+        """
+        return cls(**{name: value for name, value in coefficients.items() if name in vars(cls())})
+
+    @classmethod
+    def load(cls, path: str) -> "CostModel":
+        """Load a model from the JSON coefficients of a model, or from the JSON results
+        of the benchmark suite with a cost benchmark.
+
+        Arguments:
+            path: (str) JSON file.
+
+        Returns:
+            CostModel: Cost model.
+
+        Raises:
+            ValueError: If the file has no cost model.
+        """
+        with open(path) as file:
+            data = json.load(file)
+
+        if isinstance(data, list):
+            data = next((result["model"] for result in data if result.get("name") == "cost"), None)
+            if data is None:
+                raise ValueError(f"{path} has no cost benchmark result.")
+        return cls.from_dict(data)
+
+    @classmethod
+    def fit(cls, samples: list[tuple[CommandLengths, int, float, float]], bytes_per_history_step: float = CONFIG_COSTBYTESPERHISTORYSTEP) -> "CostModel":
+        """Calibrate a model by least squares on measured runs without history.
+
+        Arguments:
+            samples: (list[tuple[CommandLengths, int, float, float]]) Command lengths, field
+            area, measured seconds and measured bytes of every run.
+            bytes_per_history_step: (float) Measured bytes per command of a car recorded in history.
+
+        Returns:
+            CostModel: Calibrated cost model.
+        """
+        rows = []
+        for lengths, area, _, _ in samples:
+            steps = lengths.get_max_steps()
+            rows.append((len(lengths), lengths.get_car_steps(steps), steps, min(area, CONST_PLANGRIDMAXCELLS)))
+
+        seconds = solve_least_squares(rows, [sample[2] for sample in samples])
+        bytes   = solve_least_squares([(cars, car_steps, cells) for cars, car_steps, _, cells in rows], [sample[3] for sample in samples])
+        return cls(*seconds, *bytes, bytes_per_history_step)
+
+def is_within(estimate: CostEstimate, max_seconds: float | None, max_bytes: float | None) -> bool:
+    """Check an estimate is within the budgets.
+
+    Arguments:
+        estimate: (CostEstimate) Predicted cost of a run.
+        max_seconds: (float) Runtime budget, None for no limit.
+        max_bytes: (float) Memory budget, None for no limit.
+
+    Returns:
+        bool: True if no budget is exceeded.
+    """
+    return (max_seconds is None or estimate.seconds <= max_seconds) and (max_bytes is None or estimate.bytes <= max_bytes)
+
+def solve_least_squares(rows: list[tuple], targets: list[float]) -> list[float]:
+    """Solve the normal equations of a least squares fit of the relative errors by
+    Gaussian elimination, so small runs weigh as much as large runs. Coefficients are
+    clamped to zero, a cost never decreases with the size of a run.
+
+    Arguments:
+        rows: (list[tuple]) Terms of every sample.
+        targets: (list[float]) Measured value of every sample.
+
+    Returns:
+        list[float]: Coefficient of every term.
+    """
+    size    = len(rows[0])
+    rows    = [[value / (target or 1.0) for value in row] for row, target in zip(rows, targets)]
+    targets = [1.0 if target else 0.0 for target in targets]
+    scales  = [max(abs(row[term]) for row in rows) or 1.0 for term in range(size)]
+    rows    = [[value / scale for value, scale in zip(row, scales)] for row in rows]
+    matrix = [[sum(row[i] * row[j] for row in rows) + (1e-9 if i == j else 0.0) for j in range(size)] +
+              [sum(row[i] * target for row, target in zip(rows, targets))] for i in range(size)]
+
+    for column in range(size):
+        pivot = max(range(column, size), key = lambda row: abs(matrix[row][column]))
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        for row in range(size):
+            if row != column and matrix[column][column]:
+                factor = matrix[row][column] / matrix[column][column]
+                matrix[row] = [value - factor * pivot_value for value, pivot_value in zip(matrix[row], matrix[column])]
+
+    return [max(matrix[term][size] / matrix[term][term], 0.0) / scales[term] if matrix[term][term] else 0.0 for term in range(size)]
+
+class AdmissionDecision:
+    """Admission decision of a simulation run.
+
+    Attributes:
+        admission: (Admission) Decision.
+        estimate: (CostEstimate) Predicted cost of the run as admitted.
+        steps: (int) Steps the run is cut to if downgraded, otherwise None.
+    """
+
+    def __init__(self, admission: Admission, estimate: CostEstimate, steps: int | None = None):
+        """Initialization.
+
+        Arguments:
+            admission: (Admission) Decision.
+            estimate: (CostEstimate) Predicted cost of the run as admitted.
+            steps: (int) Steps the run is cut to if downgraded, otherwise None.
+        """
+        self.admission = admission
+        self.estimate  = estimate
+        self.steps     = steps
+
+    def to_dict(self) -> dict:
+        """Convert decision to run metadata.
+
+        Returns:
+            dict: Decision, estimate and steps.
+        """
+        return {"admission": self.admission.name, "estimate": self.estimate.to_dict(), "steps": self.steps}
+
+class AdmissionControl:
+    """Admission of simulation runs against runtime and memory budgets, from the cost
+    predicted before the run. Runs exceeding a budget are rejected, queued or downgraded
+    by the policy.
+
+    Queued runs hold a slot while they run, so controllers sharing the admission control
+    run a bounded number of them at the same time.
+
+    Attributes:
+        max_seconds: (float) Runtime budget, None for no limit.
+        max_bytes: (float) Memory budget, None for no limit.
+        policy: (Admission) Policy of runs exceeding a budget, REJECT, QUEUE or DOWNGRADE.
+        model: (CostModel) Cost model predicting the runs.
+        queue_slots: (int) Queued runs running at the same time.
+        slots: (threading.BoundedSemaphore) Slots of the queued runs.
+    """
+
+    def __init__(self, max_seconds: float | None = None, max_bytes: float | None = None, policy: Admission = Admission.REJECT,
+                 model: CostModel | None = None, slots: int = CONFIG_ADMISSIONQUEUESLOTS):
+        """Initialization.
+
+        Arguments:
+            max_seconds: (float) Runtime budget, None for no limit.
+            max_bytes: (float) Memory budget, None for no limit.
+            policy: (Admission) Policy of runs exceeding a budget, REJECT, QUEUE or DOWNGRADE.
+            model: (CostModel) Cost model predicting the runs, None for the default model.
+            slots: (int) Queued runs running at the same time.
+        """
+        self.max_seconds = max_seconds
+        self.max_bytes   = max_bytes
+        self.policy      = policy
+        self.model       = model if model is not None else CostModel()
+        self.queue_slots = slots
+        self.slots       = threading.BoundedSemaphore(slots)
+
+    def admit(self, lengths: list[int], area: int, history: bool = False) -> Result:
+        """Decide the admission of a run.
+
+        Time Complexity: O(n*log(n)), n is number of cars.
+
+        Arguments:
+            lengths: (list[int]) Command length of every car.
+            area: (int) Number of cells of the field.
+            history: (bool) True if the run records history.
+
+        Returns:
+            Result: (Ok, AdmissionDecision) if the run is admitted, queued or downgraded.
+        """
+        lengths  = CommandLengths(lengths)
+        estimate = self.model.estimate(lengths, area, history)
+        if is_within(estimate, self.max_seconds, self.max_bytes):
+            return Result(True, object = AdmissionDecision(Admission.ADMIT, estimate))
+
+        match self.policy:
+            case Admission.QUEUE:
+                return Result(True, object = AdmissionDecision(Admission.QUEUE, estimate))
+            case Admission.DOWNGRADE:
+                steps = self.model.fit_steps(lengths, area, False, self.max_seconds, self.max_bytes)
+                if steps >= 0:
+                    return Result(True, object = AdmissionDecision(Admission.DOWNGRADE, self.model.estimate(lengths, area, False, steps), steps))
+
+        return Result(False, f"Simulation is estimated to take {estimate}, exceeding the budget of {self.describe_budget()}.")
+
+    def admit_scenario(self, scenario: Scenario, history: bool = False) -> Result:
+        """Decide the admission of a scenario run.
+
+        Arguments:
+            scenario: (Scenario) Scenario to run.
+            history: (bool) True if the run records history.
+
+        Returns:
+            Result: (Ok, AdmissionDecision) if the run is admitted, queued or downgraded.
+        """
+        return self.admit([len(commands) for _, _, _, commands in scenario.cars], scenario.dimension.x * scenario.dimension.y, history)
+
+    @contextmanager
+    def hold(self, decision: AdmissionDecision) -> Iterator[None]:
+        """Hold a slot of the queued runs while a queued run runs, waiting for a free slot.
+
+        Arguments:
+            decision: (AdmissionDecision) Admission decision of the run.
+        """
+        if decision.admission != Admission.QUEUE:
+            yield
+            return
+
+        with self.slots:
+            yield
+
+    def describe_budget(self) -> str:
+        """Describe the budgets.
+
+        Returns:
+            str: Runtime and memory budgets.
+        """
+        budgets = []
+        if self.max_seconds is not None:
+            budgets.append(f"{self.max_seconds:g} seconds")
+        if self.max_bytes is not None:
+            budgets.append(f"{self.max_bytes / (1 << 20):.3g} MiB")
+        return " and ".join(budgets)
+
+def add_admission_arguments(parser):
+    """Add the command line options of admission control.
+
+    Arguments:
+        parser: (argparse.ArgumentParser) Parser to add the options to.
+    """
+    parser.add_argument("--max-seconds", type=float, help="Runtime budget of a simulation run, predicted before the run.")
+    parser.add_argument("--max-memory-mb", type=float, help="Memory budget of a simulation run in MiB, predicted before the run.")
+    parser.add_argument("--admission", choices=[policy.name.lower() for policy in (Admission.REJECT, Admission.QUEUE, Admission.DOWNGRADE)],
+                        default="reject", help="Policy of runs exceeding a budget.")
+    parser.add_argument("--cost-model", metavar="FILE", help="Cost model in JSON, or results of the benchmark suite.")
+
+def create_admission(arguments) -> AdmissionControl | None:
+    """Create the admission control of the command line options.
+
+    Arguments:
+        arguments: (argparse.Namespace) Parsed options of add_admission_arguments.
+
+    Returns:
+        AdmissionControl: Admission control, None if no budget is given.
+    """
+    if arguments.max_seconds is None and arguments.max_memory_mb is None:
+        return None
+
+    model     = CostModel.load(arguments.cost_model) if arguments.cost_model else None
+    max_bytes = None if arguments.max_memory_mb is None else arguments.max_memory_mb * (1 << 20)
+    return AdmissionControl(arguments.max_seconds, max_bytes, Admission[arguments.admission.upper()], model)
@@ -0,0 +1,10 @@
+from enum import Enum
+
+class Admission(Enum):
+    """Admission decisions of simulation runs, the last three are the policies of runs
+    exceeding the budgets."""
+
+    ADMIT: str     = "Admit"     # Run within the budgets.
+    REJECT: str    = "Reject"    # Run refused.
+    QUEUE: str     = "Queue"     # Run waits for a slot of the runs exceeding the budgets.
+    DOWNGRADE: str = "Downgrade" # Run cut to the steps within the budgets, without history.
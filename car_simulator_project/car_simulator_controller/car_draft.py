@@ -0,0 +1,58 @@
+from ..car_simulator.car    import Car
+from ..car_simulator.world  import World
+from ..utility.position     import Vector2D, Direction
+from ..utility.command_enum import Command
+
+class CarDraft:
+    """Car entered field by field. Every field is parsed and validated once, and the
+    car is created from the fields when committed.
+
+    Attributes:
+        world: (World) World the fields are validated against.
+        version: (int) Version of the world when the draft was started.
+        name: (str) Validated name of car, None until entered.
+        position: (Vector2D) Validated position of car, None until entered.
+        direction: (Direction) Forward direction of car, None until entered.
+        commands: (list[Command]) Parsed commands of car, None until entered.
+    """
+
+    def __init__(self, world: World):
+        """Initialization.
+
+        Arguments:
+            world: (World) World the fields are validated against.
+        """
+        self.world     = world
+        self.version   = world.version
+        self.name      = None
+        self.position  = None
+        self.direction = None
+        self.commands  = None
+
+    def is_complete(self) -> bool:
+        """Check all fields are entered.
+
+        Returns:
+            bool: True if name, position, direction and commands are entered.
+        """
+        return self.name is not None and self.position is not None and self.commands is not None
+
+    def is_current(self, world: World) -> bool:
+        """Check the world has not changed since the draft was started, so the
+        validated fields are still valid.
+
+        Arguments:
+            world: (World) Current world of the simulator.
+
+        Returns:
+            bool: True if the world is unchanged.
+        """
+        return world is self.world and world.version == self.version
+
+    def create_car(self) -> Car:
+        """Create the car of the draft.
+
+        Returns:
+            Car: Car with the entered fields.
+        """
+        return Car(self.name, self.position, self.direction, self.commands)
@@ -0,0 +1,600 @@
+import json
+import selectors
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+from .config                  import CONFIG_CLUSTERSHARDSIZE, CONFIG_CLUSTERHEARTBEATSECONDS, CONFIG_CLUSTERHEARTBEATTIMEOUT, \
+                                     CONFIG_CLUSTERRETRIES, CONFIG_CLUSTERPOLLSECONDS
+from .result                  import Result
+from .admission_enum          import Admission
+from .controller              import CarSimulatorController
+from ..car_simulator.scenario import Scenario
+
+# Messages are JSON objects, one per line, with a "type" of:
+#   hello     worker -> coordinator, worker is ready for a shard.
+#   heartbeat worker -> coordinator, worker is alive.
+#   shard     coordinator -> worker, scenarios of a shard to simulate.
+#   result    worker -> coordinator, results of the scenarios of a shard.
+#   error     worker -> coordinator, shard could not be simulated.
+#   stop      coordinator -> worker, no more shards.
+
+def send_message(connection: socket.socket, message: dict):
+    """Send a message as a line of JSON.
+
+    Arguments:
+        connection: (socket.socket) Connected socket.
+        message: (dict) Message with a type.
+    """
+    connection.sendall(json.dumps(message).encode() + b"\n")
+
+def scenario_to_message(scenario: Scenario) -> dict:
+    """Convert a scenario to the user inputs of the controller.
+
+    Arguments:
+        scenario: (Scenario) Scenario to convert.
+
+    Returns:
+        dict: Field dimension as "width height" and cars as [name, "x y Direction", commands].
+    """
+    return {
+        "dimension": f"{scenario.dimension.x} {scenario.dimension.y}",
+        "cars"     : [[name, f"{position.x} {position.y} {direction.name}", commands]
+                      for name, position, direction, commands in scenario.cars],
+    }
+
+class ClusterCoordinator:
+    """Coordinator handing shards of scenarios to workers over TCP, and aggregating
+    their results.
+
+    Workers connect to the coordinator, so they can run on any node. A shard whose
+    worker disconnects, stops sending heartbeats or fails is handed to another worker,
+    up to a number of retries.
+
+    With admission control, scenarios exceeding the budgets are rejected, cut to the
+    steps within the budgets, or queued in shards of their own handed to workers after
+    every other shard, a bounded number at a time.
+
+    Attributes:
+        messages: (list[dict]) Scenarios as user inputs of the controller.
+        shards: (list[list[int]]) Scenario indices of every shard.
+        pending: (deque[int]) Shards waiting for a worker.
+        queued: (deque[int]) Shards of queued scenarios waiting for a worker and a slot.
+        queued_shards: (set[int]) Shards of queued scenarios.
+        attempts: (list[int]) Number of failed attempts of every shard.
+        results: (list[Result]) Result of every scenario, None until simulated.
+        heartbeat_timeout: (float) Seconds without messages before a worker is lost.
+        max_retries: (int) Retries of a shard before its scenarios fail.
+        retries: (int) Number of shards handed again to a worker.
+        metrics: (SimulatorMetrics) Metrics the number of pending shards is recorded in, or None.
+        admission: (AdmissionControl) Admission control of the scenarios, or None.
+        decisions: (dict{int->AdmissionDecision}) Admission decision of every admitted scenario.
+    """
+
+    def __init__(self, scenarios: list[Scenario], shard_size: int = CONFIG_CLUSTERSHARDSIZE,
+                 heartbeat_timeout: float = CONFIG_CLUSTERHEARTBEATTIMEOUT, max_retries: int = CONFIG_CLUSTERRETRIES,
+                 metrics = None, admission = None):
+        """Initialization.
+
+        Arguments:
+            scenarios: (list[Scenario]) Scenarios to simulate.
+            shard_size: (int) Scenarios per shard.
+            heartbeat_timeout: (float) Seconds without messages before a worker is lost.
+            max_retries: (int) Retries of a shard before its scenarios fail.
+            metrics: (SimulatorMetrics) Metrics the number of pending shards is recorded in, or None.
+            admission: (AdmissionControl) Admission control of the scenarios, or None.
+        """
+        self.messages          = [scenario_to_message(scenario) for scenario in scenarios]
+        self.results           = [None] * len(scenarios)
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_retries       = max_retries
+        self.retries           = 0
+        self.metrics           = metrics
+        self.admission         = admission
+        self.decisions         = {}
+
+        admitted, queued = self.admit(scenarios)
+        self.shards        = [admitted[start:start + shard_size] for start in range(0, len(admitted), shard_size)]
+        self.pending       = deque(range(len(self.shards)))
+        self.queued        = deque(range(len(self.shards), len(self.shards) + len(queued)))
+        self.queued_shards = set(self.queued)
+        self.shards       += [[index] for index in queued]
+        self.attempts      = [0] * len(self.shards)
+
+        # Connections.
+        self.server    = None
+        self.selector  = None
+        self.buffers   = {} # Map from worker connection to received bytes of an incomplete line.
+        self.last_seen = {} # Map from worker connection to time of its last message.
+        self.assigned  = {} # Map from worker connection to its shard.
+        self.idle      = {} # Ordered set of worker connections waiting for a shard.
+        self.finished  = 0
+
+    def admit(self, scenarios: list[Scenario]) -> tuple[list[int], list[int]]:
+        """Decide the admission of the scenarios. Rejected scenarios fail, downgraded
+        scenarios have the commands of their cars cut.
+
+        Arguments:
+            scenarios: (list[Scenario]) Scenarios to simulate.
+
+        Returns:
+            tuple[list[int], list[int]]: Indices of the scenarios handed first, and of the
+            queued scenarios.
+        """
+        if self.admission is None:
+            return list(range(len(scenarios))), []
+
+        admitted, queued = [], []
+        for index, scenario in enumerate(scenarios):
+            result = self.admission.admit_scenario(scenario)
+            if not result.ok():
+                self.results[index] = result
+                continue
+
+            decision = self.decisions[index] = result.object
+            if decision.admission == Admission.QUEUE:
+                queued.append(index)
+                continue
+
+            if decision.admission == Admission.DOWNGRADE:
+                for car in self.messages[index]["cars"]:
+                    car[2] = car[2][:decision.steps]
+            admitted.append(index)
+
+        return admitted, queued
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """Start listening for workers.
+
+        Arguments:
+            host: (str) Host to listen on.
+            port: (int) Port to listen on, 0 for any free port.
+
+        Returns:
+            tuple[str, int]: Host and port listened on.
+        """
+        self.server   = socket.create_server((host, port))
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.server, selectors.EVENT_READ)
+        return self.server.getsockname()[:2]
+
+    def run(self, timeout: float | None = None) -> list[Result]:
+        """Hand shards to workers until every shard is finished, then stop the workers.
+
+        Arguments:
+            timeout: (float) Seconds to wait for all shards, None for no limit.
+
+        Returns:
+            list[Result]: For every scenario, (Ok, list[str]) of the status of its cars,
+            or the error of the scenario.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while self.finished < len(self.shards):
+                if deadline is not None and time.monotonic() > deadline:
+                    for shard in list(self.pending) + list(self.queued) + list(self.assigned.values()):
+                        self.fail_shard(shard, "Cluster run timed out.")
+                    break
+
+                for key, _ in self.selector.select(CONFIG_CLUSTERPOLLSECONDS):
+                    if key.fileobj is self.server:
+                        self.accept()
+                    else:
+                        self.receive(key.fileobj)
+
+                self.check_heartbeats()
+                self.dispatch()
+
+                if self.metrics is not None:
+                    self.metrics.queue_depth.set(len(self.pending) + len(self.queued))
+        finally:
+            self.close()
+
+        return self.results
+
+    def accept(self):
+        """Accept a worker connection."""
+        connection, _ = self.server.accept()
+        self.selector.register(connection, selectors.EVENT_READ)
+        self.buffers[connection]   = bytearray()
+        self.last_seen[connection] = time.monotonic()
+
+    def receive(self, connection: socket.socket):
+        """Receive and handle the messages of a worker.
+
+        Arguments:
+            connection: (socket.socket) Worker connection.
+        """
+        try:
+            data = connection.recv(65536)
+        except OSError:
+            data = b""
+        if not data:
+            self.lose_worker(connection, "Worker disconnected.")
+            return
+
+        self.last_seen[connection] = time.monotonic()
+        buffer = self.buffers[connection]
+        buffer += data
+        if b"\n" not in data:
+            return
+
+        *lines, rest = buffer.split(b"\n")
+        self.buffers[connection] = bytearray(rest)
+        for line in lines:
+            # A peer sending malformed messages is lost, so its shard is retried.
+            try:
+                self.handle_message(connection, json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                self.lose_worker(connection, "Malformed message.")
+                return
+
+    def handle_message(self, connection: socket.socket, message: dict):
+        """Handle a message of a worker.
+
+        Arguments:
+            connection: (socket.socket) Worker connection.
+            message: (dict) Message with a type.
+
+        Raises:
+            KeyError: If the message has no type or fields of its type, or the worker
+            has no shard to answer.
+        """
+        match message["type"]:
+            case "hello":
+                self.idle[connection] = None
+            case "result":
+                shard = self.assigned.pop(connection)
+                for index, result in zip(self.shards[shard], message["results"]):
+                    self.results[index] = Result(True, object = result["result"]) if result["ok"] else Result(False, result["error"])
+                self.finished += 1
+                self.idle[connection] = None
+            case "error":
+                self.retry_shard(self.assigned.pop(connection), message["error"])
+                self.idle[connection] = None
+
+    def dispatch(self):
+        """Hand pending shards to idle workers, then queued shards while slots are free."""
+        while self.idle:
+            if self.pending:
+                shard = self.pending.popleft()
+            elif self.queued and self.count_queued_assigned() < self.admission.queue_slots:
+                shard = self.queued.popleft()
+            else:
+                return
+
+            connection = next(iter(self.idle))
+            del self.idle[connection]
+            self.assigned[connection] = shard
+            try:
+                send_message(connection, {"type": "shard", "shard": shard,
+                                          "scenarios": [self.messages[index] for index in self.shards[shard]]})
+            except OSError:
+                self.lose_worker(connection, "Worker disconnected.")
+
+    def count_queued_assigned(self) -> int:
+        """Count the shards of queued scenarios handed to workers.
+
+        Returns:
+            int: Number of queued shards in progress.
+        """
+        return sum(1 for shard in self.assigned.values() if shard in self.queued_shards)
+
+    def check_heartbeats(self):
+        """Lose the workers of shards without messages for longer than the heartbeat timeout."""
+        now = time.monotonic()
+        for connection in list(self.assigned):
+            if now - self.last_seen[connection] > self.heartbeat_timeout:
+                self.lose_worker(connection, "Worker heartbeat timed out.")
+
+    def lose_worker(self, connection: socket.socket, reason: str):
+        """Close a worker connection and retry its shard.
+
+        Arguments:
+            connection: (socket.socket) Worker connection.
+            reason: (str) Reason the worker is lost.
+        """
+        self.selector.unregister(connection)
+        connection.close()
+        del self.buffers[connection], self.last_seen[connection]
+        self.idle.pop(connection, None)
+
+        shard = self.assigned.pop(connection, None)
+        if shard is not None:
+            self.retry_shard(shard, reason)
+
+    def retry_shard(self, shard: int, reason: str):
+        """Hand a shard again to a worker, or fail it after the max number of retries.
+
+        Arguments:
+            shard: (int) Shard index.
+            reason: (str) Reason of the failed attempt.
+        """
+        self.attempts[shard] += 1
+        if self.attempts[shard] > self.max_retries:
+            self.fail_shard(shard, f"Shard failed after {self.attempts[shard]} attempts. {reason}")
+            return
+
+        if shard in self.queued_shards:
+            self.queued.appendleft(shard)
+        else:
+            self.pending.appendleft(shard)
+        self.retries += 1
+
+    def fail_shard(self, shard: int, error: str):
+        """Fail all scenarios of a shard.
+
+        Arguments:
+            shard: (int) Shard index.
+            error: (str) Error of the scenarios.
+        """
+        for index in self.shards[shard]:
+            self.results[index] = Result(False, error)
+        self.finished += 1
+
+    def close(self):
+        """Stop the connected workers and stop listening."""
+        for connection in list(self.buffers):
+            try:
+                send_message(connection, {"type": "stop"})
+            except OSError:
+                pass
+            connection.close()
+
+        self.buffers.clear()
+        self.selector.close()
+        self.server.close()
+
+class ClusterWorker:
+    """Worker simulating shards of scenarios handed by a coordinator, with the
+    controller pipeline of user inputs.
+
+    Attributes:
+        host: (str) Host of the coordinator.
+        port: (int) Port of the coordinator.
+        heartbeat_seconds: (float) Seconds between heartbeats.
+        controller: (CarSimulatorController) Controller simulating the scenarios.
+        connection: (socket.socket) Connection to the coordinator, None until run.
+    """
+
+    def __init__(self, host: str, port: int, heartbeat_seconds: float = CONFIG_CLUSTERHEARTBEATSECONDS):
+        """Initialization.
+
+        Arguments:
+            host: (str) Host of the coordinator.
+            port: (int) Port of the coordinator.
+            heartbeat_seconds: (float) Seconds between heartbeats.
+        """
+        self.host              = host
+        self.port              = port
+        self.heartbeat_seconds = heartbeat_seconds
+        self.controller        = CarSimulatorController()
+        self.connection        = None
+        self.lock              = threading.Lock() # Sends of the heartbeat thread and the simulating thread.
+        self.stopped           = threading.Event()
+
+    def run(self) -> int:
+        """Simulate shards until the coordinator stops the worker or disconnects.
+
+        Heartbeats are sent from another thread, so they keep going during long shards.
+
+        Returns:
+            int: Number of shards simulated.
+        """
+        self.connection = socket.create_connection((self.host, self.port))
+        self.stopped.clear()
+        threading.Thread(target = self.send_heartbeats, daemon = True).start()
+
+        shards = 0
+        try:
+            self.send({"type": "hello"})
+            for line in self.connection.makefile("rb"):
+                message = json.loads(line)
+                if message["type"] == "stop":
+                    break
+
+                try:
+                    results = [self.simulate_scenario(scenario) for scenario in message["scenarios"]]
+                except Exception as error:
+                    self.send({"type": "error", "shard": message["shard"], "error": f"{type(error).__name__}: {error}"})
+                    continue
+
+                self.send({"type": "result", "shard": message["shard"], "results": results})
+                shards += 1
+        except OSError:
+            pass
+        finally:
+            self.stopped.set()
+            self.connection.close()
+
+        return shards
+
+    def send(self, message: dict):
+        """Send a message to the coordinator.
+
+        Arguments:
+            message: (dict) Message with a type.
+
+        Raises:
+            KeyError: If the message has no type or fields of its type, or the worker
+            has no shard to answer.
+        """
+        with self.lock:
+            send_message(self.connection, message)
+
+    def send_heartbeats(self):
+        """Send heartbeats until the worker stops. Runs in the heartbeat thread."""
+        while not self.stopped.wait(self.heartbeat_seconds):
+            try:
+                self.send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    def simulate_scenario(self, scenario: dict) -> dict:
+        """Simulate a scenario from the user inputs of the controller.
+
+        Arguments:
+            scenario: (dict) Field dimension and cars as user inputs.
+
+        Returns:
+            dict: "ok" and the "result" of the simulation, or the "error" of the inputs.
+        """
+        self.controller.reinitialize_simulator()
+
+        result = self.controller.set_field_dimension(scenario["dimension"])
+        if not result.ok():
+            return {"ok": False, "error": result.error}
+
+        for name, position_direction, commands in scenario["cars"]:
+            result = self.controller.add_car(name, position_direction, commands)
+            if not result.ok():
+                return {"ok": False, "error": f"Car {name}: {result.error}"}
+
+        self.controller.run_simulation()
+        return {"ok": True, "result": self.controller.get_simulation_result()}
+
+def run_worker(host: str, port: int, heartbeat_seconds: float = CONFIG_CLUSTERHEARTBEATSECONDS) -> int:
+    """Run a cluster worker. Entry point of a worker process.
+
+    Arguments:
+        host: (str) Host of the coordinator.
+        port: (int) Port of the coordinator.
+        heartbeat_seconds: (float) Seconds between heartbeats.
+
+    Returns:
+        int: Number of shards simulated.
+    """
+    return ClusterWorker(host, port, heartbeat_seconds).run()
+
+def run_local_cluster(scenarios: list[Scenario], workers: int = 2, timeout: float | None = None, **options) -> list[Result]:
+    """Simulate scenarios on a coordinator with worker processes on this machine.
+
+    Arguments:
+        scenarios: (list[Scenario]) Scenarios to simulate.
+        workers: (int) Number of worker processes.
+        timeout: (float) Seconds to wait for all shards, None for no limit.
+        options: Options of the coordinator.
+
+    Returns:
+        list[Result]: For every scenario, (Ok, list[str]) of the status of its cars,
+        or the error of the scenario.
+    """
+    return run_local_workers(ClusterCoordinator(scenarios, **options), workers, timeout)
+
+def run_local_workers(coordinator: ClusterCoordinator, workers: int = 2, timeout: float | None = None) -> list[Result]:
+    """Run a coordinator with worker processes on this machine.
+
+    Arguments:
+        coordinator: (ClusterCoordinator) Coordinator of the scenarios, not started.
+        workers: (int) Number of worker processes.
+        timeout: (float) Seconds to wait for all shards, None for no limit.
+
+    Returns:
+        list[Result]: For every scenario, (Ok, list[str]) of the status of its cars,
+        or the error of the scenario.
+    """
+    import multiprocessing
+
+    host, port = coordinator.start()
+    processes  = [multiprocessing.Process(target = run_worker, args = (host, port), daemon = True) for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        return coordinator.run(timeout)
+    finally:
+        for process in processes:
+            process.join(CONFIG_CLUSTERHEARTBEATTIMEOUT)
+
+def load_scenarios(paths: list[str]) -> list[Scenario]:
+    """Load scenario files, one scenario per file.
+
+    Arguments:
+        paths: (list[str]) Paths of the scenario files.
+
+    Returns:
+        list[Scenario]: Loaded scenarios.
+
+    Raises:
+        ValueError: If a scenario file is not valid.
+    """
+    from .scenario_loader             import load_scenario_file
+    from ..car_simulator.packed_fleet import CONST_DIRECTIONS
+    from ..utility.position           import Vector2D
+
+    scenarios = []
+    for path in paths:
+        result = load_scenario_file(path, workers = 1)
+        if not result.ok():
+            raise ValueError(f"{path}\n{result.error}")
+
+        dimension, fleet = result.object
+        scenarios.append(Scenario(dimension, [(fleet.get_name(car), Vector2D(fleet.xs[car], fleet.ys[car]),
+                                               CONST_DIRECTIONS[fleet.headings[car]], fleet.get_commands(car))
+                                              for car in range(len(fleet))]))
+    return scenarios
+
+def main(arguments: list[str] | None = None) -> int:
+    """Run a coordinator or a worker from the command line.
+
+    Arguments:
+        arguments: (list[str]) Command line arguments, defaults to sys.argv.
+
+    Returns:
+        int: Exit code, 1 if any scenario failed.
+    """
+    import argparse
+    from .admission import add_admission_arguments, create_admission
+
+    parser   = argparse.ArgumentParser(description="Distributed simulation of scenario files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="Hand scenario files to workers and print the results in JSON.")
+    coordinator.add_argument("paths", nargs="+", help="Scenario files, one scenario per file.")
+    coordinator.add_argument("--host", default="127.0.0.1", help="Host to listen on.")
+    coordinator.add_argument("--port", type=int, default=0, help="Port to listen on, defaults to any free port.")
+    coordinator.add_argument("--local-workers", type=int, default=0, help="Worker processes started on this machine.")
+    coordinator.add_argument("--shard-size", type=int, default=CONFIG_CLUSTERSHARDSIZE, help="Scenarios per shard.")
+    coordinator.add_argument("--timeout", type=float, help="Seconds to wait for all shards.")
+    coordinator.add_argument("--metrics-port", type=int, help="Serve metrics in Prometheus text format on this port.")
+    add_admission_arguments(coordinator)
+
+    worker = commands.add_parser("worker", help="Simulate shards handed by a coordinator.")
+    worker.add_argument("--host", default="127.0.0.1", help="Host of the coordinator.")
+    worker.add_argument("--port", type=int, required=True, help="Port of the coordinator.")
+
+    arguments = parser.parse_args(sys.argv[1:] if arguments is None else arguments)
+    if arguments.command == "worker":
+        run_worker(arguments.host, arguments.port)
+        return 0
+
+    scenarios = load_scenarios(arguments.paths)
+    metrics   = None
+    if arguments.metrics_port is not None:
+        from .metrics import SimulatorMetrics
+
+        metrics    = SimulatorMetrics()
+        host, port = metrics.registry.serve(arguments.host, arguments.metrics_port)
+        print(f"Metrics served at http://{host}:{port}/metrics", file=sys.stderr)
+
+    try:
+        cluster = ClusterCoordinator(scenarios, arguments.shard_size, metrics = metrics, admission = create_admission(arguments))
+        if arguments.local_workers:
+            results = run_local_workers(cluster, arguments.local_workers, arguments.timeout)
+        else:
+            host, port = cluster.start(arguments.host, arguments.port)
+            print(f"Coordinator listening on {host}:{port}.", file=sys.stderr)
+            results = cluster.run(arguments.timeout)
+    finally:
+        if metrics is not None:
+            metrics.registry.close()
+
+    print(json.dumps([{"path": path, "ok": result.ok(), "result": result.object, "error": result.error,
+                       "admission": cluster.decisions[index].to_dict() if index in cluster.decisions else None}
+                      for index, (path, result) in enumerate(zip(arguments.paths, results))], indent=2))
+    return 0 if all(result.ok() for result in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,21 @@
-CONFIG_LOGFILENAME = "car_simulation.log" # Car simulation log filename.
-CONFIG_LOGNAME     = "CAR_SIM"            # Car simulation log name.
\ No newline at end of file
+CONFIG_LOGFILENAME             = "car_simulation.log" # Car simulation log filename.
+CONFIG_LOGNAME                 = "CAR_SIM"            # Car simulation log name.
+CONFIG_LOADCHUNKBYTES          = 16 * 1024 * 1024     # Bytes per chunk parsed by a scenario file worker.
+CONFIG_LOADMAXERRORS           = 100                  # Errors reported when loading a scenario file.
+CONFIG_SLICEMS                 = 50                   # Milliseconds per time slice of an interactive simulation run.
+CONFIG_CLUSTERSHARDSIZE        = 16                   # Scenarios per shard handed to a cluster worker.
+CONFIG_CLUSTERHEARTBEATSECONDS = 1.0                  # Seconds between heartbeats of a cluster worker.
+CONFIG_CLUSTERHEARTBEATTIMEOUT = 10.0                 # Seconds without messages before a cluster worker is lost.
+CONFIG_CLUSTERRETRIES          = 3                    # Retries of a shard after its worker is lost or fails.
+CONFIG_CLUSTERPOLLSECONDS      = 0.1                  # Seconds between heartbeat checks of the coordinator.
+CONFIG_METRICSDUMPSECONDS      = 15.0                 # Seconds between JSON dumps of the metrics.
+CONFIG_METRICSLATENCYBUCKETS   = (0.001, 0.005, 0.025, 0.1, 0.5, 2.5, 10.0, 60.0) # Upper bounds in seconds of the latency buckets.
+CONFIG_COSTSECONDSPERCAR       = 1.8e-5               # Estimated seconds per car of a simulation run.
+CONFIG_COSTSECONDSPERCARSTEP   = 5.1e-7               # Estimated seconds per command of a car.
+CONFIG_COSTSECONDSPERSTEP      = 0.0                  # Estimated seconds per step of the longest command.
+CONFIG_COSTSECONDSPERCELL      = 4.8e-9               # Estimated seconds per cell of the field, up to the grid occupancy size.
+CONFIG_COSTBYTESPERCAR         = 1015.0               # Estimated bytes per car of a simulation run.
+CONFIG_COSTBYTESPERCARSTEP     = 2.7                  # Estimated bytes per command of a car.
+CONFIG_COSTBYTESPERCELL        = 0.0                  # Estimated bytes per cell of the field, up to the grid occupancy size.
+CONFIG_COSTBYTESPERHISTORYSTEP = 25.0                 # Estimated bytes per command of a car recorded in history.
+CONFIG_ADMISSIONQUEUESLOTS     = 1                    # Queued runs exceeding the budgets run at the same time.
@@ -1,11 +1,16 @@
-import logging
-from pathlib import Path
+from contextlib import contextmanager
+from typing     import Generator
 
-from .config                   import CONFIG_LOGFILENAME, CONFIG_LOGNAME
-from .result                   import Result
-from .input_parser             import InputParser
-from ..car_simulator.simulator import CarSimulator
-from ..utility.utility         import get_root_package
+from .config                        import CONFIG_LOGFILENAME, CONFIG_LOGNAME, CONFIG_SLICEMS
+from .result                        import Result
+from .input_parser                  import InputParser
+from .car_draft                     import CarDraft
+from .admission_enum                import Admission
+from ..car_simulator.simulator      import CarSimulator
+from ..car_simulator.collision_enum import CollisionMode
+from ..car_simulator.progress       import SimulationProgress
+from ..car_simulator.history        import HistoryIndex
+from ..utility.utility              import get_root_package, LazyLogger
 
 class CarSimulatorController:
     """Controller for the car simulator.
@@ -15,12 +20,26 @@ class CarSimulatorController:
 
     Attributes:
         simulator: (CarSimulator) The car simulator.
+        profiler: (SimulationProfiler) Profiler of the controller phases, None if disabled.
+        metrics: (SimulatorMetrics) Operational metrics of the controller, None if disabled.
+        draft: (CarDraft) Car being entered field by field, None if no car is entered.
+        admission: (AdmissionControl) Admission control of simulation runs, None if disabled.
+        decision: (AdmissionDecision) Admission decision of the next run, None until admitted.
     """
 
-    def __init__(self):
-        """Initialization"""
-        self.__setup_logging()
-        self.simulator = CarSimulator(self.logger)
+    def __init__(self, collision_mode: CollisionMode = CollisionMode.CELL):
+        """Initialization
+
+        Arguments:
+            collision_mode: (CollisionMode) Collision detection mode of the simulator.
+        """
+        self.logger    = LazyLogger(self.__setup_logging)
+        self.simulator = CarSimulator(self.logger, collision_mode)
+        self.profiler  = None
+        self.metrics   = None
+        self.draft     = None
+        self.admission = None
+        self.decision  = None
 
     def set_field_dimension(self, user_input: str) -> Result:
         """Set dimension of the car field.
@@ -56,6 +75,35 @@ class CarSimulatorController:
         car = result.object
         return self.simulator.add_car(car)
     
+    def load_scenario_file(self, path: str, workers: int | None = None) -> Result:
+        """Set field dimension and add all cars from a scenario file. Nothing is changed
+        if the file or any of its cars is not valid.
+
+        Arguments:
+            path: (str) Path of the scenario file.
+            workers: (int) Number of worker processes parsing the file, defaults to
+            number of CPUs.
+
+        Returns:
+            Result: (Ok, list[Car]) if the file is valid and all cars added to field.
+        """
+        # Parallel loading dependencies are only imported when a file is loaded.
+        from .scenario_loader import load_scenario_file
+
+        result = load_scenario_file(path, workers)
+        if not result.ok():
+            return result
+
+        # Cars are validated against the dimension of the file before the field is changed.
+        dimension, fleet = result.object
+        cars   = fleet.create_cars()
+        errors = self.simulator.validate_cars(cars, dimension)
+        if errors:
+            return Result(False, "\n".join(errors))
+
+        self.simulator.set_world_dimension(dimension)
+        return self.simulator.add_cars(cars, validate = False)
+
     def validate_car_name(self, user_input: str) -> Result:
         """Validates car name.
         
@@ -89,13 +137,102 @@ class CarSimulatorController:
         """
         return InputParser.parse_car_commands(user_input)
 
-    def get_car_list(self) -> list[str]:
+    # Car Draft #
+
+    def start_car_draft(self) -> CarDraft:
+        """Start entering a car field by field, replacing any unfinished car.
+
+        Returns:
+            CarDraft: Draft of the car.
+        """
+        self.draft = CarDraft(self.simulator.world)
+        return self.draft
+
+    def draft_car_name(self, user_input: str) -> Result:
+        """Validates car name and keeps it in the car draft.
+
+        Arguments:
+            user_input: (str) Name of car.
+
+        Returns:
+            Result: (Ok, Name) if car name is valid.
+        """
+        result = self.validate_car_name(user_input)
+        if result.ok():
+            self.get_car_draft().name = result.object
+        return result
+
+    def draft_car_position_direction(self, user_input: str) -> Result:
+        """Validates car position and direction and keeps them in the car draft.
+
+        Arguments:
+            user_input: (str) Position and direction. [x y Direction]
+
+        Returns:
+            Result: (Ok, (Position, Direction)) if car position and direction is valid.
+        """
+        result = self.validate_car_position_direction(user_input)
+        if result.ok():
+            draft                           = self.get_car_draft()
+            draft.position, draft.direction = result.object
+        return result
+
+    def draft_car_commands(self, user_input: str) -> Result:
+        """Validates car commands and keeps them in the car draft.
+
+        Arguments:
+            user_input: (str) Car commands.
+
+        Returns:
+            Result: (Ok, list[Command]) if car commands are valid.
+        """
+        result = self.validate_car_commands(user_input)
+        if result.ok():
+            self.get_car_draft().commands = result.object
+        return result
+
+    def commit_car_draft(self) -> Result:
+        """Add the car of the draft to the field without parsing its fields again.
+        Name and position are only validated again if the world changed since the
+        draft was started.
+
+        Returns:
+            Result: (Ok, Car) if car added to field.
+        """
+        draft = self.draft
+        if draft is None or not draft.is_complete():
+            return Result(False, "Car name, position and commands must be entered before adding the car.")
+
+        if not draft.is_current(self.simulator.world):
+            result = self.simulator.validate_car_name(draft.name)
+            if not result.ok():
+                return result
+
+            result = self.simulator.validate_car_position(draft.position)
+            if not result.ok():
+                return result
+
+        self.draft = None
+        return self.simulator.add_car(draft.create_car(), validate = False)
+
+    def get_car_draft(self) -> CarDraft:
+        """Get the car draft, started on first use.
+
+        Returns:
+            CarDraft: Draft of the car.
+        """
+        return self.draft if self.draft is not None else self.start_car_draft()
+
+    def get_car_list(self, start: int = 0) -> list[str]:
         """Return initial status of all cars in list of string.
 
+        Arguments:
+            start: (int) Index of the first car to return, to get only cars added since.
+
         Returns:
-            list[str]: List of string of initial status of all cars.
+            list[str]: List of string of initial status of all cars from the start.
         """
-        return self.simulator.get_cars_status()
+        return self.simulator.get_cars_status(start)
     
     def get_simulation_result(self) -> list[str]:
         """Return current status of all cars in list of string.
@@ -105,18 +242,356 @@ class CarSimulatorController:
         """
         return self.simulator.get_simulation_result()
 
-    def run_simulation(self):
-        """Runs the simulation for the car simulator."""
-        self.simulator.simulate()
+    def run_simulation(self) -> Result:
+        """Runs the simulation for the car simulator, if admitted.
+
+        Returns:
+            Result: (Ok, AdmissionDecision or None without admission control) if the simulation ran.
+        """
+        result = self.admit_simulation()
+        if not result.ok():
+            return result
+
+        decision = result.object
+        try:
+            if self.admission is None:
+                self.run_admitted_simulation()
+            else:
+                with self.apply_decision(decision):
+                    self.run_admitted_simulation()
+                self.simulator.run_metadata["admission"] = decision.to_dict()
+        finally:
+            self.decision = None
+
+        return result
+
+    def run_admitted_simulation(self):
+        """Runs the simulation for the car simulator, profiled if profiling is enabled."""
+        if self.profiler is None:
+            self.simulator.simulate()
+            return
+
+        # Instrument the simulation hot path for this run only, the world is 
+        # recreated when the simulator is reinitialized.
+        instrumented = len(self.profiler.instrumented)
+        self.profiler.instrument(self.simulator,       "simulate",               "simulate")
+        self.profiler.instrument(self.simulator,       "update_simulation_cars", "update_simulation_cars")
+        self.profiler.instrument(self.simulator,       "simulate_step",          "simulate_step", step = True)
+        self.profiler.instrument(self.simulator,       "simulate_step_threads",  "simulate_step", step = True)
+        self.profiler.instrument(self.simulator,       "simulate_batch",         "simulate_batch", generator = True)
+        self.profiler.instrument(self.simulator,       "simulate_components",    "simulate_components", generator = True)
+        self.profiler.instrument(self.simulator.world, "move_car",               "move_car")
+        try:
+            self.profiler.run(self.simulator.simulate)
+        finally:
+            self.profiler.restore(instrumented)
+
+    def iterate_simulation(self, slice_steps: int | None = None,
+                           slice_ms: float | None = CONFIG_SLICEMS) -> Generator[SimulationProgress, None, Result]:
+        """Runs the simulation in time slices, yielding the progress between slices.
+
+        Closing the generator cancels the run. Profiled runs are not sliced, so the
+        profile covers the whole run. A run rejected by admission control yields nothing.
+
+        Arguments:
+            slice_steps: (int) Steps per slice, None for no limit.
+            slice_ms: (float) Milliseconds per slice, None for no limit.
+
+        Yields:
+            SimulationProgress: Progress after every slice.
+
+        Returns:
+            Result: (Ok, AdmissionDecision or None without admission control) if the simulation ran.
+        """
+        if self.profiler is not None:
+            return self.run_simulation()
+
+        result = self.admit_simulation()
+        if not result.ok():
+            return result
+        if self.admission is None:
+            yield from self.simulator.simulate_iter(slice_steps, slice_ms)
+            return result
+
+        try:
+            with self.apply_decision(result.object):
+                yield from self.simulator.simulate_iter(slice_steps, slice_ms)
+            self.simulator.run_metadata["admission"] = result.object.to_dict()
+        finally:
+            self.decision = None
+
+        return result
+
+    async def run_simulation_async(self, slice_ms: float | None = CONFIG_SLICEMS, progress = None):
+        """Runs the simulation on an asyncio event loop, giving control back to the loop
+        between time slices. Cancelling the task cancels the run.
+
+        Arguments:
+            slice_ms: (float) Milliseconds per slice, None for no limit.
+            progress: (Callable[[SimulationProgress], None]) Called after every slice, or None.
+
+        Returns:
+            Result: (Ok, AdmissionDecision or None without admission control) if the simulation ran.
+        """
+        import asyncio
+
+        run = self.iterate_simulation(slice_ms = slice_ms)
+        try:
+            while True:
+                update = next(run)
+                if progress is not None:
+                    progress(update)
+                await asyncio.sleep(0)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            run.close()
+
+    # History #
+
+    def enable_history(self, max_segments: int | None = None):
+        """Enable recording the history of car positions during simulation.
+
+        Arguments:
+            max_segments: (int) Maximum number of stored segments of history, None for default.
+        """
+        if max_segments is None:
+            self.simulator.enable_history()
+        else:
+            self.simulator.enable_history(max_segments)
+
+    def query_history(self, min_x: int, min_y: int, max_x: int, max_y: int, start: int, end: int) -> Result:
+        """Find the cars that passed through a rectangle in a step range of the last simulation.
+
+        Arguments:
+            min_x: (int) Minimum x of the rectangle, inclusive.
+            min_y: (int) Minimum y of the rectangle, inclusive.
+            max_x: (int) Maximum x of the rectangle, inclusive.
+            max_y: (int) Maximum y of the rectangle, inclusive.
+            start: (int) Start step, inclusive. Step 0 is the initial state.
+            end: (int) End step, inclusive.
+
+        Returns:
+            Result: (Ok, list[str]) sorted car names if history is recorded and complete
+            from the start step.
+        """
+        history = self.simulator.history
+        if history is None:
+            return Result(False, "History is not enabled.")
+        
+        if start < history.complete_from:
+            return Result(False, f"History before step {history.complete_from} is evicted, query from step "
+                                 f"{history.complete_from} or keep more segments.")
+
+        return Result(True, object = sorted(history.query_region(min_x, min_y, max_x, max_y, start, end)))
+
+    # Collisions #
+
+    def export_collisions(self, path: str) -> Result:
+        """Export the collision events of the last simulation as a graph of cars and events.
+
+        Arguments:
+            path: (str) Output file, in CSV edge list if it ends with .csv, or in
+            JSON node-link if it ends with .json.
+
+        Returns:
+            Result: (Ok, path) if the collision events are exported.
+        """
+        if path.endswith(".csv"):
+            with open(path, "w", newline = "") as file:
+                self.simulator.collisions.write_csv(file)
+        elif path.endswith(".json"):
+            with open(path, "w") as file:
+                self.simulator.collisions.write_json(file)
+        else:
+            return Result(False, f"Collision export format of {path} is not valid. Valid formats are ['.csv', '.json'].")
+
+        return Result(True, object = path)
+
+    def export_results(self, directory: str) -> Result:
+        """Export the final state of all cars of the last simulation as memory-mappable
+        .npy columns and a file of car names, read back by load_results.
+
+        Arguments:
+            directory: (str) Output directory, created if missing.
+
+        Returns:
+            Result: (Ok, directory) if the results are exported.
+        """
+        # Columnar export is only imported when results are exported.
+        from ..car_simulator.columnar import write_columns
+
+        write_columns(list(self.simulator.world.cars), directory)
+        return Result(True, object = directory)
+
+    def load_results(self, directory: str) -> Result:
+        """Load results exported by export_results without parsing, columns are
+        memory-mapped from the files and car names are read on first use.
+
+        Arguments:
+            directory: (str) Directory of the exported results.
+
+        Returns:
+            Result: (Ok, ResultColumns) if the results are loaded.
+        """
+        from ..car_simulator.columnar import ResultColumns
+
+        try:
+            return Result(True, object = ResultColumns(directory))
+        except (OSError, ValueError) as error:
+            return Result(False, f"Results in {directory} are not valid: {error}")
+
+    # Profiling #
+
+    def enable_profiling(self, cprofile_output: str | None = None):
+        """Enable profiling of parsing, simulation and result formatting.
+
+        Arguments:
+            cprofile_output: (str) File to dump cProfile stats of the simulation runs to, or None.
+        """
+        if self.profiler is not None:
+            return
+
+        # Profiling dependencies are only imported when profiling is enabled.
+        from .profiler import SimulationProfiler
+
+        self.profiler = SimulationProfiler(cprofile_output)
+        self.profiler.start()
+
+        for method_name in ("set_field_dimension", "add_car", "commit_car_draft", "validate_car_name",
+                            "validate_car_position_direction", "validate_car_commands"):
+            self.profiler.instrument(self, method_name, "parsing")
+        for method_name in ("get_car_list", "get_simulation_result"):
+            self.profiler.instrument(self, method_name, "result_formatting")
+
+    def disable_profiling(self):
+        """Disable profiling and remove all instrumentation."""
+        if self.profiler is None:
+            return
+
+        self.profiler.stop()
+        self.profiler = None
+
+    def get_profile_report(self) -> dict | None:
+        """Return the profiling report of the simulation.
+
+        Runs on packed arrays are timed as a whole, so the step histogram and the move
+        counters only cover the engines stepping car objects.
+
+        Returns:
+            dict: Structured report of phases, step histogram, counters, memory, the engine
+            of the last run and the simulation plan, None if profiling is disabled.
+        """
+        if self.profiler is None:
+            return None
+
+        report           = self.profiler.report(self.simulator.stats.to_dict())
+        report["engine"] = self.simulator.run_metadata.get("engine")
+        report["plan"]   = self.simulator.run_metadata
+        return report
+
+    # Metrics #
+
+    def enable_metrics(self, registry = None):
+        """Enable operational metrics of simulation runs and parsing.
+
+        Arguments:
+            registry: (MetricsRegistry) Registry to record the metrics in, None for a new registry.
+
+        Returns:
+            MetricsRegistry: Registry of the metrics, to export them.
+        """
+        if self.metrics is None:
+            # Metrics dependencies are only imported when metrics are enabled.
+            from .metrics import SimulatorMetrics
+
+            self.metrics = SimulatorMetrics(registry)
+            self.metrics.instrument_simulator(self.simulator)
+            for method_name in ("set_field_dimension", "add_car", "commit_car_draft", "load_scenario_file", "validate_car_name",
+                                "validate_car_position_direction", "validate_car_commands"):
+                self.metrics.instrument_parsing(self, method_name)
+
+        return self.metrics.registry
+
+    # Admission #
+
+    def set_admission(self, admission = None):
+        """Set the admission control of simulation runs, shared by controllers of a service
+        so queued runs wait for the same slots.
+
+        Arguments:
+            admission: (AdmissionControl) Admission control, None to disable.
+        """
+        self.admission = admission
+        self.decision  = None
+
+    def admit_simulation(self) -> Result:
+        """Decide the admission of the next run from its predicted cost, before the run.
+        The decision is kept for the next run, which applies it.
+
+        Returns:
+            Result: (Ok, AdmissionDecision or None without admission control) if the run is
+            admitted, queued or downgraded.
+        """
+        if self.admission is None:
+            return Result(True)
+        if self.decision is not None:
+            return Result(True, object = self.decision)
+
+        world  = self.simulator.world
+        result = self.admission.admit([len(car.commands) for car in world.cars], world.dimension.x * world.dimension.y,
+                                      self.simulator.history is not None)
+        if not result.ok():
+            return result
+
+        self.decision = result.object
+        return result
+
+    @contextmanager
+    def apply_decision(self, decision):
+        """Apply an admission decision to one run. A queued run holds a slot, a downgraded
+        run is cut to the steps within the budgets and does not record history. Commands
+        of the cars and history recording are restored after the run.
+
+        Arguments:
+            decision: (AdmissionDecision) Admission decision of the run.
+        """
+        simulator = self.simulator
+        history   = simulator.history
+        commands  = {}
+        if decision.admission == Admission.DOWNGRADE:
+            simulator.history = None
+            for car in simulator.world.cars:
+                if len(car.commands) > decision.steps:
+                    commands[car] = car.commands
+                    car.commands  = car.commands[:decision.steps]
+
+        try:
+            with self.admission.hold(decision):
+                yield
+        finally:
+            for car, car_commands in commands.items():
+                car.commands = car_commands
+            if history is not None and simulator.history is None:
+                simulator.history = HistoryIndex(history.max_segments, history.bucket_steps, history.bucket_cells)
 
     def reinitialize_simulator(self):
         """Reinitialize the car simulator."""
         self.simulator.initialize()
+        self.decision = None
     
     def __setup_logging(self):
-        """Sets up logging."""
+        """Sets up logging. Called on first use of the logger, the log file is only
+        opened when the first record is emitted.
+
+        Returns:
+            logging.Logger: Logger of the car simulation.
+        """
+        import logging
+        from pathlib import Path
+
         log_filename = Path.cwd() / get_root_package() / CONFIG_LOGFILENAME
-        logging.basicConfig(filename = log_filename, 
+        logging.basicConfig(handlers = [logging.FileHandler(log_filename, delay = True)],
                             level    = logging.DEBUG,
                             format   = "%(levelname)s:%(filename)s:%(lineno)s - %(funcName)20s(): %(message)s")
-        self.logger = logging.getLogger(CONFIG_LOGNAME)
\ No newline at end of file
+        return logging.getLogger(CONFIG_LOGNAME)
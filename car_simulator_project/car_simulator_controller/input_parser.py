@@ -4,6 +4,8 @@ from ..car_simulator.simulator import CarSimulator
 from ..utility.position        import Vector2D, Direction
 from ..utility.command_enum    import Command
 
+CONST_COMMANDTABLE = str.maketrans("", "", "".join(command.name for command in Command)) # Deletes valid commands.
+
 class InputParser:
     """Parses user input into data structure of car simulator."""
 
@@ -57,6 +59,32 @@ class InputParser:
         """
         x, y, direction = user_input.split(" ")
 
+        result = InputParser.parse_position(x, y)
+        if not result.ok():
+            return result
+        
+        position = result.object
+        result   = simulator.validate_car_position(position)
+        if not result.ok():
+            return result
+        
+        result = InputParser.parse_direction(direction)
+        if not result.ok():
+            return result
+
+        return Result(True, object = (position, result.object))
+
+    @staticmethod
+    def parse_position(x: str, y: str) -> Result:
+        """Parse position, without checks against the world.
+
+        Arguments:
+            x: (str) X position.
+            y: (str) Y position.
+
+        Returns:
+            Result: (Ok, Position) if position is parsed.
+        """
         try:
             x = int(x)
         except ValueError:
@@ -66,20 +94,24 @@ class InputParser:
             y = int(y)
         except ValueError:
             return Result(False, f"Y position must be an integer.")
-        
-        position = Vector2D(x, y)
-        result   = simulator.validate_car_position(position)
-        if not result.ok():
-            return result
-        
-        # Direction
+
+        return Result(True, object = Vector2D(x, y))
+
+    @staticmethod
+    def parse_direction(direction: str) -> Result:
+        """Parse direction.
+
+        Arguments:
+            direction: (str) Direction. [N, E, S, W]
+
+        Returns:
+            Result: (Ok, Direction) if direction is validated and parsed.
+        """
         try:
-            direction_enum = Direction.string_to_direction(direction)
+            return Result(True, object = Direction.string_to_direction(direction))
         except KeyError:
             valid_directions = [d.name for d in Direction]
             return Result(False, f"Direction '{direction}' is not valid. Valid directions are {valid_directions}.")
-
-        return Result(True, object = (position, direction_enum))
     
     @staticmethod
     def parse_car_commands(user_input: str) -> Result:
@@ -89,19 +121,30 @@ class InputParser:
             user_input: (str) Car commands.
 
         Returns:
-            Result: (Ok, list[Command]) if commands are validated and parsed.
+            Result: (Ok, tuple[Command, ...]) if commands are validated and parsed.
+        """
+        result = InputParser.validate_car_commands(user_input)
+        if not result.ok():
+            return result
+
+        return Result(True, object = Command.string_to_commands(user_input))
+
+    @staticmethod
+    def validate_car_commands(user_input: str) -> Result:
+        """Validate car commands, without parsing them.
+
+        Arguments:
+            user_input: (str) Car commands.
+
+        Returns:
+            Result: (Ok, str) if every command is valid.
         """
-        # Commands
-        for command in user_input:
-            try:
-                Command[command]
-            except KeyError:
-                valid_commands = [c.name for c in Command]
-                return Result(False, f"Command '{command}' is not valid. Valid commands are {valid_commands}.")
-            
-        commands_list = Command.string_to_commands(user_input)
-
-        return Result(True, object = commands_list)
+        invalid = user_input.translate(CONST_COMMANDTABLE)
+        if invalid:
+            valid_commands = [c.name for c in Command]
+            return Result(False, f"Command '{invalid[0]}' is not valid. Valid commands are {valid_commands}.")
+
+        return Result(True, object = user_input)
     
     @staticmethod
     def parse_car(name: str, position_direction: str, commands: str, simulator: CarSimulator) -> Result:
@@ -0,0 +1,407 @@
+import json
+import os
+import threading
+import time
+from bisect    import bisect_left
+from functools import wraps
+
+from .config import CONFIG_METRICSLATENCYBUCKETS, CONFIG_METRICSDUMPSECONDS
+
+class Counter:
+    """Metric counting up, as a total since the process started.
+
+    Attributes:
+        name: (str) Metric name.
+        description: (str) Metric description.
+        value: (float) Total.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str):
+        """Initialization.
+
+        Arguments:
+            name: (str) Metric name.
+            description: (str) Metric description.
+        """
+        self.name        = name
+        self.description = description
+        self.value       = 0
+
+    def inc(self, amount: float = 1):
+        """Increase the total.
+
+        Arguments:
+            amount: (float) Amount to add, not negative.
+        """
+        self.value += amount
+
+    def samples(self) -> list[tuple[str, float]]:
+        """Get the samples of the metric.
+
+        Returns:
+            list[tuple[str, float]]: List of (sample name, value).
+        """
+        return [(self.name, self.value)]
+
+    def to_dict(self) -> float:
+        """Get the value of the metric for a JSON dump.
+
+        Returns:
+            float: Total.
+        """
+        return self.value
+
+class Gauge(Counter):
+    """Metric of a current value, going up and down.
+
+    Attributes:
+        name: (str) Metric name.
+        description: (str) Metric description.
+        value: (float) Current value.
+    """
+
+    type = "gauge"
+
+    def set(self, value: float):
+        """Set the current value.
+
+        Arguments:
+            value: (float) Current value.
+        """
+        self.value = value
+
+    def dec(self, amount: float = 1):
+        """Decrease the current value.
+
+        Arguments:
+            amount: (float) Amount to subtract.
+        """
+        self.value -= amount
+
+class Histogram:
+    """Metric of the distribution of observed values in buckets.
+
+    Attributes:
+        name: (str) Metric name.
+        description: (str) Metric description.
+        bounds: (tuple[float]) Upper bound of every bucket, ascending.
+        counts: (list[int]) Number of observations of every bucket, and above the last bound.
+        sum: (float) Sum of all observations.
+        count: (int) Number of observations.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, bounds: tuple[float, ...] = CONFIG_METRICSLATENCYBUCKETS):
+        """Initialization.
+
+        Arguments:
+            name: (str) Metric name.
+            description: (str) Metric description.
+            bounds: (tuple[float]) Upper bound of every bucket, ascending.
+        """
+        self.name        = name
+        self.description = description
+        self.bounds      = tuple(bounds)
+        self.counts      = [0] * (len(self.bounds) + 1)
+        self.sum         = 0.0
+        self.count       = 0
+
+    def observe(self, value: float):
+        """Record an observation.
+
+        Time Complexity: O(log b), b is number of buckets.
+
+        Arguments:
+            value: (float) Observed value.
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum   += value
+        self.count += 1
+
+    def samples(self) -> list[tuple[str, float]]:
+        """Get the samples of the metric, with cumulative buckets.
+
+        Returns:
+            list[tuple[str, float]]: List of (sample name, value).
+        """
+        samples, total = [], 0
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            total += count
+            samples.append((f'{self.name}_bucket{{le="{bound}"}}', total))
+        samples.append((f"{self.name}_sum", self.sum))
+        samples.append((f"{self.name}_count", self.count))
+        return samples
+
+    def to_dict(self) -> dict:
+        """Get the value of the metric for a JSON dump.
+
+        Returns:
+            dict: Count, sum and count of every bucket by upper bound.
+        """
+        return {"count"  : self.count,
+                "sum"    : self.sum,
+                "buckets": {str(bound): count for bound, count in zip((*self.bounds, "+Inf"), self.counts)}}
+
+class MetricsRegistry:
+    """Registry of metrics, exported in Prometheus text format over HTTP and in
+    periodic JSON dumps.
+
+    Recording a metric only updates numbers of the metric, exporters read them from
+    their own thread.
+
+    Attributes:
+        metrics: (dict{str->Counter|Gauge|Histogram}) Map from name to metric, in order
+        of registration.
+    """
+
+    def __init__(self):
+        """Initialization."""
+        self.metrics     = {}
+        self.server      = None
+        self.dump_thread = None
+        self.stopped     = threading.Event()
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Get a counter, registered on first use.
+
+        Arguments:
+            name: (str) Metric name.
+            description: (str) Metric description.
+
+        Returns:
+            Counter: Registered counter.
+        """
+        return self.register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        """Get a gauge, registered on first use.
+
+        Arguments:
+            name: (str) Metric name.
+            description: (str) Metric description.
+
+        Returns:
+            Gauge: Registered gauge.
+        """
+        return self.register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, bounds: tuple[float, ...] = CONFIG_METRICSLATENCYBUCKETS) -> Histogram:
+        """Get a histogram, registered on first use.
+
+        Arguments:
+            name: (str) Metric name.
+            description: (str) Metric description.
+            bounds: (tuple[float]) Upper bound of every bucket, ascending.
+
+        Returns:
+            Histogram: Registered histogram.
+        """
+        return self.register(Histogram(name, description, bounds))
+
+    def register(self, metric):
+        """Register a metric, or get the metric already registered with its name.
+
+        Arguments:
+            metric: (Counter | Gauge | Histogram) Metric to register.
+
+        Returns:
+            Counter | Gauge | Histogram: Registered metric.
+        """
+        return self.metrics.setdefault(metric.name, metric)
+
+    def to_prometheus(self) -> str:
+        """Export all metrics in Prometheus text format.
+
+        Returns:
+            str: Metrics in text exposition format.
+        """
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name} {value}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        """Export all metrics for a JSON dump.
+
+        Returns:
+            dict: Time of the dump and map from metric name to value.
+        """
+        return {"timestamp": time.time(), "metrics": {name: metric.to_dict() for name, metric in list(self.metrics.items())}}
+
+    def write_json(self, path: str):
+        """Write all metrics to a JSON file, replacing it at once so readers never see
+        a partial dump.
+
+        Arguments:
+            path: (str) Output file.
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temporary, path)
+
+    # Exporters #
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """Serve the metrics in Prometheus text format at /metrics from a daemon thread.
+
+        Arguments:
+            host: (str) Host to listen on.
+            port: (int) Port to listen on, 0 for any free port.
+
+        Returns:
+            tuple[str, int]: Host and port listened on.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """Handler of the metrics endpoint."""
+
+            def do_GET(self):
+                """Send the metrics, or not found for any other path."""
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                """Requests are not logged."""
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target = self.server.serve_forever, daemon = True).start()
+        return self.server.server_address[:2]
+
+    def start_dump(self, path: str, seconds: float = CONFIG_METRICSDUMPSECONDS):
+        """Write all metrics to a JSON file periodically from a daemon thread.
+
+        Arguments:
+            path: (str) Output file.
+            seconds: (float) Seconds between dumps.
+        """
+        self.stopped.clear()
+        self.dump_thread = threading.Thread(target = self.dump_periodically, args = (path, seconds), daemon = True)
+        self.dump_thread.start()
+
+    def dump_periodically(self, path: str, seconds: float):
+        """Write all metrics to a JSON file every period, and once more when stopped.
+        Runs in the dump thread.
+
+        Arguments:
+            path: (str) Output file.
+            seconds: (float) Seconds between dumps.
+        """
+        while not self.stopped.wait(seconds):
+            self.write_json(path)
+        self.write_json(path)
+
+    def close(self):
+        """Stop the HTTP endpoint and the periodic dump, with a last dump."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+        if self.dump_thread is not None:
+            self.stopped.set()
+            self.dump_thread.join()
+            self.dump_thread = None
+
+class SimulatorMetrics:
+    """Operational metrics of the car simulator, recorded once per simulation run and
+    per parsed input, never per step.
+
+    Attributes:
+        registry: (MetricsRegistry) Registry of the metrics.
+    """
+
+    def __init__(self, registry: MetricsRegistry | None = None):
+        """Initialization.
+
+        Arguments:
+            registry: (MetricsRegistry) Registry of the metrics, None for a new registry.
+        """
+        self.registry         = registry or MetricsRegistry()
+        self.scenarios        = self.registry.counter("car_simulator_scenarios_total", "Simulation runs finished.")
+        self.cars             = self.registry.counter("car_simulator_cars_simulated_total", "Cars of the finished simulation runs.")
+        self.steps            = self.registry.counter("car_simulator_steps_total", "Steps of the finished simulation runs.")
+        self.collisions       = self.registry.counter("car_simulator_collisions_total", "Cars collided in the finished simulation runs.")
+        self.parse_errors     = self.registry.counter("car_simulator_parse_errors_total", "Inputs rejected by parsing or validation.")
+        self.steps_per_second = self.registry.gauge("car_simulator_steps_per_second", "Steps per second of the last simulation run.")
+        self.cache_hit_ratio  = self.registry.gauge("car_simulator_template_cache_hit_ratio", "Hit ratio of the trajectory template cache.")
+        self.queue_depth      = self.registry.gauge("car_simulator_queue_depth", "Shards or runs waiting to be simulated.")
+        self.latency          = self.registry.histogram("car_simulator_simulate_seconds", "Latency of simulation runs in seconds.")
+
+    def record_run(self, simulator, seconds: float):
+        """Record a finished simulation run.
+
+        Arguments:
+            simulator: (CarSimulator) Simulator of the run.
+            seconds: (float) Time spent simulating, without time between slices.
+        """
+        stats = simulator.stats
+        self.scenarios.inc()
+        self.cars.inc(len(simulator.world.cars))
+        self.steps.inc(stats.steps)
+        self.collisions.inc(stats.collisions)
+        self.latency.observe(seconds)
+        if seconds > 0:
+            self.steps_per_second.set(stats.steps / seconds)
+
+        templates = simulator.templates
+        lookups   = templates.hits + len(templates)
+        if lookups:
+            self.cache_hit_ratio.set(templates.hits / lookups)
+
+    def instrument_simulator(self, simulator):
+        """Time every simulation run of a simulator, at instance level.
+
+        Arguments:
+            simulator: (CarSimulator) Simulator to instrument.
+        """
+        simulate_iter = simulator.simulate_iter
+
+        @wraps(simulate_iter)
+        def timed(*args, **kwargs):
+            run     = simulate_iter(*args, **kwargs)
+            seconds = 0.0
+            while True:
+                start    = time.perf_counter()
+                progress = next(run, None)
+                seconds += time.perf_counter() - start
+                if progress is None:
+                    break
+                yield progress
+            self.record_run(simulator, seconds)
+
+        simulator.simulate_iter = timed
+
+    def instrument_parsing(self, owner: object, method_name: str):
+        """Count the rejected results of a parsing method, at instance level.
+
+        Arguments:
+            owner: (object) Instance owning the method.
+            method_name: (str) Name of the method returning a Result.
+        """
+        method = getattr(owner, method_name)
+
+        @wraps(method)
+        def counted(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if not result.ok():
+                self.parse_errors.inc()
+            return result
+
+        setattr(owner, method_name, counted)
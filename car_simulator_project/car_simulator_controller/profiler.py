@@ -0,0 +1,159 @@
+import cProfile
+import time
+import tracemalloc
+from collections import defaultdict
+from functools   import wraps
+from pathlib     import Path
+
+class SimulationProfiler:
+    """Profiler of the car simulator phases.
+
+    Wraps methods of the controller, simulator and world at instance level, so 
+    nothing is measured and nothing is slowed down while profiling is disabled.
+
+    Attributes:
+        phase_calls: (defaultdict{str->int}) Map from phase name to number of calls.
+        phase_seconds: (defaultdict{str->float}) Map from phase name to wall time in seconds.
+        step_histogram: (defaultdict{int->int}) Map from step duration bucket, as the
+        upper bound in microseconds, to number of steps.
+        cprofile_output: (Path) File to dump cProfile stats of the simulation runs to, or None.
+    """
+
+    def __init__(self, cprofile_output: Path | None = None):
+        """Initialization.
+
+        Arguments:
+            cprofile_output: (Path) File to dump cProfile stats of the simulation runs to, or None.
+        """
+        self.phase_calls     = defaultdict(int)
+        self.phase_seconds   = defaultdict(float)
+        self.step_histogram  = defaultdict(int)
+        self.cprofile_output = cprofile_output
+        self.cprofile        = cProfile.Profile() if cprofile_output else None
+        self.instrumented    = []
+
+    def start(self):
+        """Start tracing memory allocations."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        """Stop tracing memory allocations and remove all instrumentation."""
+        self.restore()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def instrument(self, owner: object, method_name: str, phase: str, step: bool = False, generator: bool = False):
+        """Time every call of a method of the owner instance under a phase.
+
+        Arguments:
+            owner: (object) Instance owning the method.
+            method_name: (str) Name of the method to be timed.
+            phase: (str) Name of the phase the time is accounted to.
+            step: (bool) True to also record each call in the step duration histogram.
+            generator: (bool) True if the method returns a generator, the time spent
+            running the generator is accounted to the call.
+        """
+        method = getattr(owner, method_name)
+
+        def record(elapsed: float):
+            self.phase_calls[phase]   += 1
+            self.phase_seconds[phase] += elapsed
+            if step:
+                self.step_histogram[self.bucket(elapsed)] += 1
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(time.perf_counter() - start)
+
+        @wraps(method)
+        def timed_generator(*args, **kwargs):
+            run     = method(*args, **kwargs)
+            elapsed = 0.0
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(run)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield item
+            finally:
+                record(elapsed)
+
+        self.instrumented.append((owner, method_name, vars(owner).get(method_name)))
+        setattr(owner, method_name, timed_generator if generator else timed)
+
+    def restore(self, start: int = 0):
+        """Remove instrumented methods, restoring methods wrapped at instance level before.
+
+        Arguments:
+            start: (int) Number of earlier instrumented methods to keep.
+        """
+        for owner, method_name, previous in reversed(self.instrumented[start:]):
+            if previous is None:
+                delattr(owner, method_name)
+            else:
+                setattr(owner, method_name, previous)
+        del self.instrumented[start:]
+
+    def run(self, function, *args, **kwargs):
+        """Run a function under cProfile if enabled.
+
+        Arguments:
+            function: Function to be run.
+
+        Returns:
+            Return value of the function.
+        """
+        if self.cprofile is None:
+            return function(*args, **kwargs)
+        return self.cprofile.runcall(function, *args, **kwargs)
+
+    def report(self, counters: dict[str, int]) -> dict:
+        """Create the profiling report.
+
+        Arguments:
+            counters: (dict[str, int]) Hot path counters of the simulation.
+
+        Returns:
+            dict: Structured report of phases, step histogram, counters and memory.
+        """
+        memory = {"current_bytes": 0, "peak_bytes": 0, "allocated_blocks": 0}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot      = tracemalloc.take_snapshot()
+            memory = {"current_bytes"   : current,
+                      "peak_bytes"      : peak,
+                      "allocated_blocks": sum(stat.count for stat in snapshot.statistics("filename"))}
+
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(self.cprofile_output)
+
+        return {
+            "phases"        : {phase: {"calls": self.phase_calls[phase], "seconds": seconds}
+                               for phase, seconds in self.phase_seconds.items()},
+            "step_histogram": {f"<={bucket}us": count for bucket, count in sorted(self.step_histogram.items())},
+            "counters"      : counters,
+            "memory"        : memory,
+            "cprofile_output": str(self.cprofile_output) if self.cprofile_output else None,
+        }
+
+    @staticmethod
+    def bucket(seconds: float) -> int:
+        """Get the histogram bucket of a duration.
+
+        Arguments:
+            seconds: (float) Duration in seconds.
+
+        Returns:
+            int: Smallest power of two microseconds greater or equals to the duration.
+        """
+        microseconds = max(1, int(seconds * 1_000_000))
+        return 1 << (microseconds - 1).bit_length()
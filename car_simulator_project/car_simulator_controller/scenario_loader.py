@@ -0,0 +1,204 @@
+from array import array
+
+from .config                      import CONFIG_LOADCHUNKBYTES, CONFIG_LOADMAXERRORS
+from .result                      import Result
+from .input_parser                import InputParser
+from ..car_simulator.packed_fleet import PackedFleet
+from ..car_simulator.simulator    import CarSimulator
+from ..utility.position           import Vector2D
+
+def load_scenario_file(path: str, workers: int | None = None, chunk_bytes: int = CONFIG_LOADCHUNKBYTES) -> Result:
+    """Load a scenario file into a packed fleet, parsing chunks in parallel.
+
+    The first line is the field dimension as "width height", every following line
+    is a car as "name, x y Direction, commands". Blank lines are skipped.
+
+    The file is split into chunks at line boundaries. Chunks are parsed and validated
+    in worker processes, then merged with a check of unique names and positions
+    across the whole file.
+
+    Arguments:
+        path: (str) Path of the scenario file.
+        workers: (int) Number of worker processes, defaults to number of CPUs. 1 parses
+        in this process.
+        chunk_bytes: (int) Approximate number of bytes per chunk.
+
+    Returns:
+        Result: (Ok, (Dimension, PackedFleet)) if the whole file is valid, otherwise the
+        error contains the problems found with their line numbers, one per line.
+    """
+    with open(path, "rb") as file:
+        header = file.readline()
+        start  = file.tell()
+        file.seek(0, 2)
+        size   = file.tell()
+
+        # Move every chunk boundary to the start of the next line.
+        boundaries = [start]
+        for boundary in range(start + chunk_bytes, size, chunk_bytes):
+            file.seek(boundary - 1)
+            file.readline()
+            if boundaries[-1] < file.tell() < size:
+                boundaries.append(file.tell())
+        boundaries.append(size)
+
+    result = parse_dimension(header)
+    if not result.ok():
+        return Result(False, f"Line 1: {result.error}")
+    dimension = result.object
+
+    chunks = list(zip(boundaries, boundaries[1:]))
+    if workers == 1 or len(chunks) == 1:
+        parsed = [parse_chunk(path, start, end, dimension.x, dimension.y) for start, end in chunks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers) as executor:
+            parsed = list(executor.map(parse_chunk, [path] * len(chunks), *zip(*chunks),
+                                       [dimension.x] * len(chunks), [dimension.y] * len(chunks)))
+
+    return merge_chunks(dimension, parsed)
+
+def parse_dimension(line: bytes) -> Result:
+    """Parse the field dimension line.
+
+    Arguments:
+        line: (bytes) Dimension line. [width height]
+
+    Returns:
+        Result: (Ok, Dimension) if dimension is validated and parsed.
+    """
+    values = line.decode(errors = "replace").split()
+    if len(values) != 2:
+        return Result(False, "Field dimension must be given as width and height.")
+
+    result = InputParser.parse_field_dimension(" ".join(values))
+    if not result.ok():
+        return result
+
+    return CarSimulator.validate_world_dimension(result.object)
+
+def parse_chunk(path: str, start: int, end: int, width: int, height: int) -> tuple[PackedFleet, array, list, int]:
+    """Parse and validate the cars of a chunk of a scenario file. Runs in a worker process.
+
+    Arguments:
+        path: (str) Path of the scenario file.
+        start: (int) Offset of the first byte of the chunk.
+        end: (int) Offset after the last byte of the chunk.
+        width: (int) Width of the field.
+        height: (int) Height of the field.
+
+    Returns:
+        tuple[PackedFleet, array, list, int]: Cars of the chunk, line of each car and
+        list of (line, error) counted from the start of the chunk, and number of lines
+        of the chunk.
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    fleet  = PackedFleet()
+    lines  = array("q")
+    errors = []
+    for line, raw in enumerate(data.split(b"\n")):
+        raw = raw.strip()
+        if not raw:
+            continue
+
+        result = parse_car_line(raw, width, height)
+        if not result.ok():
+            errors.append((line, result.error))
+            continue
+
+        name, x, y, direction, commands = result.object
+        fleet.add_car(0, name, x, y, direction, commands)
+        lines.append(line)
+
+    return fleet, lines, errors, data.count(b"\n")
+
+def parse_car_line(raw: bytes, width: int, height: int) -> Result:
+    """Parse and validate a car line, without checks against other cars.
+
+    Arguments:
+        raw: (bytes) Car line. [name, x y Direction, commands]
+        width: (int) Width of the field.
+        height: (int) Height of the field.
+
+    Returns:
+        Result: (Ok, (name, x, y, Direction, commands)) if car is validated and parsed.
+    """
+    try:
+        line = raw.decode()
+    except UnicodeDecodeError:
+        return Result(False, "Line is not valid UTF-8.")
+
+    fields = line.rsplit(",", 2)
+    if len(fields) != 3 or len(fields[1].split()) != 3:
+        return Result(False, "Car must be given as name, x y Direction, commands.")
+
+    name            = fields[0].strip()
+    x, y, direction = fields[1].split()
+    commands        = fields[2].strip()
+
+    result = InputParser.parse_position(x, y)
+    if not result.ok():
+        return result
+
+    # Names and positions against other cars are checked when the chunks are merged.
+    position = result.object
+    if not (0 <= position.x < width and 0 <= position.y < height):
+        return Result(False, f"Position {position} is out of the field bounds.")
+
+    result = InputParser.parse_direction(direction)
+    if not result.ok():
+        return result
+
+    direction = result.object
+    result    = InputParser.validate_car_commands(commands)
+    if not result.ok():
+        return result
+
+    return Result(True, object = (name, position.x, position.y, direction, commands))
+
+def merge_chunks(dimension: Vector2D, parsed: list[tuple[PackedFleet, array, list, int]]) -> Result:
+    """Merge parsed chunks in file order, checking names and positions are unique.
+
+    Time Complexity: O(n), n is number of cars.
+
+    Arguments:
+        dimension: (Vector2D) Width and height of the field.
+        parsed: (list[tuple]) Parsed chunks in file order.
+
+    Returns:
+        Result: (Ok, (Dimension, PackedFleet)) if the whole file is valid, otherwise the
+        error contains the problems found with their line numbers, one per line.
+    """
+    fleet  = PackedFleet()
+    lines  = array("q")
+    errors = []
+
+    first_line = 2 # Line number of the first car line, after the dimension line.
+    for chunk_fleet, chunk_lines, chunk_errors, line_count in parsed:
+        errors.extend((first_line + line, error) for line, error in chunk_errors)
+        lines.extend(first_line + line for line in chunk_lines)
+        fleet.extend(chunk_fleet)
+        first_line += line_count
+
+    names, cells = set(), set()
+    buffer       = bytes(fleet.name_buffer)
+    for car in range(len(fleet)):
+        name = buffer[fleet.name_offsets[car]:fleet.name_offsets[car + 1]]
+        if name in names:
+            errors.append((lines[car], f"Car with name {name.decode()} already exists."))
+        names.add(name)
+
+        cell = fleet.ys[car] * dimension.x + fleet.xs[car]
+        if cell in cells:
+            errors.append((lines[car], f"Another car is already in position {Vector2D(fleet.xs[car], fleet.ys[car])}."))
+        cells.add(cell)
+
+    if errors:
+        errors.sort(key = lambda error: error[0])
+        return Result(False, "\n".join(f"Line {line}: {error}" for line, error in errors[:CONFIG_LOADMAXERRORS]))
+
+    return Result(True, object = (dimension, fleet))
@@ -1,22 +1,37 @@
+import sys
 from enum import Enum
 
 from .options_enum                         import UserOption1, UserOption2
 from ..car_simulator_controller.controller import CarSimulatorController
 from ..car_simulator_controller.result     import Result
+from ..car_simulator.progress              import SimulationProgress
+
+CONST_CARLISTPAGESIZE = 50 # Cars shown by the car list, the most recently added.
 
 class CarSimulatorInterface:
     """User interface of the car simulator.
         
         Attributes:
             controller: (CarSimulatorController) Controller of car simulator.
+            car_lines: (list[str]) Rendered lines of the car list, appended as cars are added.
+            output: (list[str]) Console output buffered until the next prompt.
     """
 
     def __init__(self):
         """Initialization."""
         self.controller = CarSimulatorController()
+        self.car_lines  = []
+        self.output     = []
 
     def display(self):
         """Display user interface in console."""
+        try:
+            self.display_session()
+        finally:
+            self.flush_output()
+
+    def display_session(self):
+        """Run the prompts of the user interface until the user exits."""
         while 1:
             self.display_welcome_message()
 
@@ -32,8 +47,8 @@ class CarSimulatorInterface:
                         self.display_car_list()
                         continue
                     case UserOption1.RUN_SIM:
-                        self.controller.run_simulation()
-                        self.display_simulation_result()
+                        if self.run_simulation():
+                            self.display_simulation_result()
                         break
             
             # Start over or Exit.
@@ -41,13 +56,58 @@ class CarSimulatorInterface:
             match option:
                 case UserOption2.START_OVER:
                     self.controller.reinitialize_simulator()
+                    self.car_lines.clear()
                     continue
                 case UserOption2.EXIT:
                     self.display_exit_message()
                     break
 
+    def run_simulation(self) -> bool:
+        """Run the simulation in time slices, showing progress on a terminal, if admitted.
+        Ctrl+C cancels the run.
+
+        Returns:
+            bool: True if the simulation finished, False if rejected or cancelled.
+        """
+        result = self.controller.admit_simulation()
+        if not result.ok():
+            self.display_error(result.error)
+            return False
+        if result.object is not None and result.object.steps is not None:
+            self.display_message(f"Simulation is downgraded to the first {result.object.steps} steps to fit the budget.\n")
+
+        self.flush_output()
+        run = self.controller.iterate_simulation()
+        try:
+            while True:
+                self.display_progress(next(run))
+        except StopIteration as stop:
+            result = stop.value
+        except KeyboardInterrupt:
+            self.display_progress(None)
+            self.display_message("Simulation cancelled.\n")
+            return False
+
+        self.display_progress(None)
+        if not result.ok():
+            self.display_error(result.error)
+            return False
+        return True
+
     # Prompt #
 
+    def read_input(self, message: str) -> str:
+        """Read a line from user after writing the buffered output and the prompt.
+
+        Arguments:
+            message: (str) Prompt message.
+
+        Returns:
+            str: Line from user.
+        """
+        self.flush_output()
+        return input(message)
+
     def prompt_field_dimension(self) -> str:
         """Prompt field dimension from user.
 
@@ -56,7 +116,7 @@ class CarSimulatorInterface:
         """
         message = "Please enter the width and height of the simulation field in x y format:\n"
         while 1:
-            while not (user_input := input(message).strip()):
+            while not (user_input := self.read_input(message).strip()):
                 pass
 
             result = self.validate_field_dimension(user_input)
@@ -82,10 +142,10 @@ class CarSimulatorInterface:
         """
         message = "Please enter the name of the car:\n"
         while 1:
-            while not (user_input := input(message).strip()):
+            while not (user_input := self.read_input(message).strip()):
                 pass
 
-            result = self.controller.validate_car_name(user_input)
+            result = self.controller.draft_car_name(user_input)
             if not result.ok():
                 self.display_error(result.error)
                 continue
@@ -103,7 +163,7 @@ class CarSimulatorInterface:
         """
         message = f"Please enter initial position of car {name} in x y Direction format:\n"
         while 1:
-            while not (user_input := input(message).strip()):
+            while not (user_input := self.read_input(message).strip()):
                 pass
             
             result = self.validate_car_position_direction(user_input)
@@ -111,7 +171,7 @@ class CarSimulatorInterface:
                 self.display_error(result.error)
                 continue
             
-            result = self.controller.validate_car_position_direction(user_input)
+            result = self.controller.draft_car_position_direction(user_input)
             if not result.ok():
                 self.display_error(result.error)
                 continue
@@ -129,10 +189,10 @@ class CarSimulatorInterface:
         """
         message = f"Please enter the commands for car {name}:\n"
         while 1:
-            while not (user_input := input(message).strip()):
+            while not (user_input := self.read_input(message).strip()):
                 pass
             
-            result = self.controller.validate_car_commands(user_input)
+            result = self.controller.draft_car_commands(user_input)
             if not result.ok():
                 self.display_error(result.error)
                 continue
@@ -140,14 +200,16 @@ class CarSimulatorInterface:
             return user_input
 
     def prompt_add_car(self):
-        """Prompt to add car."""
+        """Prompt to add car. Every field is parsed once by the prompts and kept in a
+        car draft of the controller."""
         while 1:
-            name               = self.prompt_car_name()
-            position_direction = self.prompt_car_position_direction(name) 
-            commands           = self.prompt_car_commands(name)
+            self.controller.start_car_draft()
+            name = self.prompt_car_name()
+            self.prompt_car_position_direction(name) 
+            self.prompt_car_commands(name)
 
             # Add car if all prompts succeeded.
-            result = self.controller.add_car(name, position_direction, commands)
+            result = self.controller.commit_car_draft()
             if not result.ok():
                 self.display_error(result.error)
                 continue
@@ -171,7 +233,7 @@ class CarSimulatorInterface:
         message += "\n"
 
         while 1:
-            while not (user_input := input(message).strip()):
+            while not (user_input := self.read_input(message).strip()):
                 pass
             
             result = self.validate_options(user_input, len(options))
@@ -241,13 +303,28 @@ class CarSimulatorInterface:
     
     # Display #
 
+    def write(self, text: str):
+        """Buffer text for the console, written at once before the next prompt.
+
+        Arguments:
+            text: (str) Text to be written.
+        """
+        self.output.append(text)
+
+    def flush_output(self):
+        """Write the buffered text to console."""
+        if self.output:
+            sys.stdout.write("".join(self.output))
+            sys.stdout.flush()
+            self.output.clear()
+
     def display_message(self, message: str):
         """Display message to console.
 
         Arguments:
             message: (str) Message to be displayed.
         """
-        print(message)
+        self.write(f"{message}\n")
 
     def display_error(self, error: str):
         """Display error message to console.
@@ -255,7 +332,23 @@ class CarSimulatorInterface:
         Arguments:
             message: (str) Error message to be displayed.
         """
-        print(error)
+        self.write(f"{error}\n")
+
+    def display_progress(self, progress: SimulationProgress | None):
+        """Display simulation progress on a terminal, the console output is unchanged
+        when not interactive.
+
+        Arguments:
+            progress: (SimulationProgress) Progress of the simulation, None to clear.
+        """
+        if not sys.stderr.isatty():
+            return
+
+        if progress is None:
+            sys.stderr.write("\r\033[K")
+        else:
+            sys.stderr.write(f"\rSimulating... {progress.fraction():.0%} ({progress})")
+        sys.stderr.flush()
 
     def display_welcome_message(self):
         """Display welcome message to console."""
@@ -265,24 +358,36 @@ class CarSimulatorInterface:
         """Display exit message to console."""
         self.display_message("Thank you for running the simulation. Goodbye!")
         
-    def display_car_list(self):
-        """Display list of car status to console."""
-        cars = self.controller.get_car_list()
-        if cars:
-            print("Your current list of cars are:")
-            for car in cars:
-                print(car)
+    def display_car_list(self, page_size: int | None = CONST_CARLISTPAGESIZE):
+        """Display list of car status to console. Only cars added since the last
+        display are rendered, long lists show the last page of cars.
+
+        Time Complexity: O(k + p), k is number of cars added since the last display,
+        p is page size.
+
+        Arguments:
+            page_size: (int | None) Number of cars shown, None to show every car.
+        """
+        self.car_lines.extend(self.controller.get_car_list(len(self.car_lines)))
+        if not self.car_lines:
+            self.write("No cars available.\n\n")
+            return
+
+        self.write("Your current list of cars are:\n")
+        hidden = len(self.car_lines) - page_size if page_size is not None else 0
+        if hidden > 0:
+            self.write(f"... {hidden} earlier cars not shown.\n")
+            self.write("\n".join(self.car_lines[hidden:]))
         else:
-            print("No cars available.")
-        print()
+            self.write("\n".join(self.car_lines))
+        self.write("\n\n")
     
     def display_simulation_result(self):
-        """Display list of car current simulated status to console."""
-        self.display_car_list()
+        """Display list of car current simulated status to console, with every car."""
+        self.display_car_list(page_size = None)
         
         simulation_results = self.controller.get_simulation_result()
         if simulation_results:
-            print("After simulation, the result is:")
-            for result in simulation_results:
-                print(result)
-            print()
\ No newline at end of file
+            self.write("After simulation, the result is:\n")
+            self.write("\n".join(simulation_results))
+            self.write("\n\n")
\ No newline at end of file
@@ -0,0 +1,24 @@
+import logging
+
+from ..car_simulator.simulator      import CarSimulator
+from ..car_simulator.scenario       import Scenario
+from ..car_simulator.engine_enum    import Engine
+from ..car_simulator.collision_enum import CollisionMode
+
+def create_simulator(scenario: Scenario, engine: Engine | None = None, collision_mode: CollisionMode = CollisionMode.CELL,
+                     history: bool = False, workers: int = 1, threads: int = 1) -> CarSimulator:
+    """Simulator of the cars of a scenario, with an optional engine override."""
+    simulator = CarSimulator(logging.getLogger(__name__), collision_mode, workers = workers, threads = threads)
+    simulator.set_engine(engine)
+    if history:
+        simulator.enable_history()
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+    return simulator
+
+def simulate_scenario(scenario: Scenario, engine: Engine | None = None, collision_mode: CollisionMode = CollisionMode.CELL,
+                      history: bool = False, workers: int = 1, threads: int = 1) -> CarSimulator:
+    """Simulate a scenario to the end, with an optional engine override."""
+    simulator = create_simulator(scenario, engine, collision_mode, history, workers, threads)
+    simulator.simulate()
+    return simulator
@@ -0,0 +1,104 @@
+from ..car_simulator_controller.admission      import AdmissionControl, CostModel, CommandLengths
+from ..car_simulator_controller.admission_enum import Admission
+from ..car_simulator_controller.cluster        import ClusterCoordinator
+from ..car_simulator_controller.controller     import CarSimulatorController
+from ..car_simulator.scenario                  import Scenario
+from ..utility.position                        import Vector2D, Direction
+
+def create_model() -> CostModel:
+    """Model where a second is a car step and a byte is a car."""
+    return CostModel(0.0, 1.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0)
+
+def create_controller(admission: AdmissionControl) -> CarSimulatorController:
+    """Controller of a car with a long command and a car with a short command."""
+    controller = CarSimulatorController()
+    controller.set_admission(admission)
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "0 0 N", "FFFFFFFF")
+    controller.add_car("B", "9 0 N", "FF")
+    return controller
+
+def test_cost_model():
+    """Car steps are counted by step, and a model is calibrated from measured runs."""
+    lengths = CommandLengths([8, 2, 0, 5])
+    assert(lengths.get_max_steps() == 8 and lengths.get_car_steps(3) == 8 and lengths.get_car_steps(8) == 15)
+
+    model   = CostModel(1e-5, 1e-6, 1e-4, 1e-8, 100.0, 4.0, 1.0)
+    samples = []
+    for lengths, area in ((CommandLengths([10] * 50), 100), (CommandLengths([200] * 10), 400),
+                          (CommandLengths(range(500)), 10_000), (CommandLengths([3] * 1000), 1_000_000), (CommandLengths([5000]), 25)):
+        estimate = model.estimate(lengths, area)
+        samples.append((lengths, area, estimate.seconds, estimate.bytes))
+
+    fitted = CostModel.fit(samples, 8.0)
+    for name, value in model.to_dict().items():
+        if name != "bytes_per_history_step":
+            assert(abs(getattr(fitted, name) - value) <= 1e-6 * value)
+    assert(fitted.bytes_per_history_step == 8.0)
+    assert(abs(fitted.estimate(CommandLengths([10]), 1, history = True).bytes - fitted.estimate(CommandLengths([10]), 1).bytes - 80.0) < 1e-9)
+
+def test_admission_reject():
+    """Runs exceeding a budget are rejected without running."""
+    controller = create_controller(AdmissionControl(max_seconds = 9, policy = Admission.REJECT, model = create_model()))
+    result     = controller.run_simulation()
+    assert(not result.ok() and "exceeding the budget of 9 seconds" in result.error)
+
+    run = controller.iterate_simulation()
+    try:
+        next(run)
+        assert(False)
+    except StopIteration as stop:
+        assert(not stop.value.ok() and stop.value.error == result.error)
+    assert(controller.get_simulation_result() == ["- A, (0,0) N", "- B, (9,0) N"])
+
+    controller.set_admission(AdmissionControl(max_seconds = 10, model = create_model()))
+    result = controller.run_simulation()
+    assert(result.ok() and result.object.admission == Admission.ADMIT)
+    assert(controller.simulator.run_metadata["admission"]["estimate"]["seconds"] == 10)
+
+def test_admission_downgrade():
+    """Downgraded runs are cut to the steps within the budgets, without history, and
+    the cars and history recording are restored after the run."""
+    controller = create_controller(AdmissionControl(max_seconds = 6, policy = Admission.DOWNGRADE, model = create_model()))
+    controller.enable_history()
+
+    result = controller.admit_simulation()
+    assert(result.ok() and result.object.admission == Admission.DOWNGRADE and result.object.steps == 4)
+
+    controller.run_simulation()
+    assert(controller.get_simulation_result() == ["- A, (0,4) N", "- B, (9,2) N"])
+    assert(controller.simulator.run_metadata["admission"]["steps"] == 4)
+    assert(controller.get_car_list() == ["- A, (0,0) N, FFFFFFFF", "- B, (9,0) N, FF"])
+    assert(len(controller.simulator.world.cars[0].commands) == 8)
+    assert(controller.query_history(0, 0, 9, 9, 0, 8).object == [])
+
+    controller = create_controller(AdmissionControl(max_bytes = 1, policy = Admission.DOWNGRADE, model = create_model()))
+    assert(not controller.admit_simulation().ok())
+
+def test_admission_queue():
+    """Queued runs hold a slot while they run."""
+    admission  = AdmissionControl(max_seconds = 1, policy = Admission.QUEUE, model = create_model())
+    controller = create_controller(admission)
+    slots      = []
+    controller.simulator.simulate_iter = lambda *args: iter(slots.append(admission.slots.acquire(blocking = False)) or [])
+
+    result = controller.run_simulation()
+    assert(result.ok() and result.object.admission == Admission.QUEUE)
+    assert(slots == [False] and admission.slots.acquire(blocking = False))
+
+def test_cluster_admission():
+    """The coordinator fails rejected scenarios, cuts downgraded scenarios and hands
+    queued scenarios last."""
+    small = Scenario(Vector2D(5, 5), [("A", Vector2D(0, 0), Direction.N, "FF")])
+    large = Scenario(Vector2D(5, 5), [("B", Vector2D(0, 0), Direction.N, "FFFFFFFF")])
+
+    coordinator = ClusterCoordinator([large, small, small], shard_size = 2,
+                                     admission = AdmissionControl(max_seconds = 4, policy = Admission.QUEUE, model = create_model()))
+    assert(coordinator.shards == [[1, 2], [0]] and list(coordinator.pending) == [0] and list(coordinator.queued) == [1])
+
+    coordinator = ClusterCoordinator([large, small], admission = AdmissionControl(max_seconds = 4, policy = Admission.DOWNGRADE,
+                                                                                 model = create_model()))
+    assert(coordinator.messages[0]["cars"] == [["B", "0 0 N", "FFFF"]] and coordinator.decisions[0].steps == 4)
+
+    coordinator = ClusterCoordinator([large, small], admission = AdmissionControl(max_seconds = 4, model = create_model()))
+    assert(not coordinator.results[0].ok() and coordinator.shards == [[1]])
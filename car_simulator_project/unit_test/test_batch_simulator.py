@@ -0,0 +1,34 @@
+import logging
+import random
+
+from ..car_simulator.batch_simulator import simulate_scenarios
+from ..car_simulator.simulator       import CarSimulator
+from ..car_simulator.scenario        import Scenario, generate_random_scenario
+from ..car_simulator.collision_enum  import CollisionMode
+from ..utility.position              import Vector2D, Direction
+
+def simulate_scenario(scenario: Scenario, collision_mode: CollisionMode) -> list[str]:
+    """Simulate a scenario on its own with the car simulator."""
+    simulator = CarSimulator(logging.getLogger(__name__), collision_mode)
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+    simulator.simulate()
+    return simulator.get_simulation_result()
+
+def test_batch_simulator():
+    """Batch results split per scenario."""
+    scenario_1 = Scenario(Vector2D(10, 10), [("A", Vector2D(1, 2), Direction.N, "FFRFFFFRRL"),
+                                             ("B", Vector2D(7, 8), Direction.W, "FFLFFFFFFF")])
+    scenario_2 = Scenario(Vector2D(10, 10), [("A", Vector2D(1, 2), Direction.N, "FFRFFFFRRL")])
+
+    assert(simulate_scenarios([scenario_1, scenario_2]) == [["- A, collides with B at (5,4) at step 7",
+                                                             "- B, collides with A at (5,4) at step 7"],
+                                                            ["- A, (5,4) S"]])
+
+def test_batch_simulator_matches_car_simulator():
+    """Batch results match simulating every scenario on its own."""
+    rng = random.Random(0)
+    for collision_mode in CollisionMode:
+        scenarios = [generate_random_scenario(rng, 6, 6, 12, 20) for _ in range(200)]
+        expected  = [simulate_scenario(scenario, collision_mode) for scenario in scenarios]
+        assert(simulate_scenarios(scenarios, collision_mode) == expected)
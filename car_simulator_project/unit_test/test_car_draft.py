@@ -0,0 +1,46 @@
+from ..car_simulator_controller.controller import CarSimulatorController
+
+def create_controller() -> CarSimulatorController:
+    """Controller of a 10 x 10 field."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("10 10")
+    return controller
+
+def test_car_draft_commit():
+    """Car fields are parsed by the prompts and committed without parsing again."""
+    controller = create_controller()
+    controller.start_car_draft()
+    assert(controller.draft_car_name("A").ok())
+    assert(controller.draft_car_position_direction("1 2 N").ok())
+    assert(not controller.draft_car_commands("FX").ok())
+    assert(controller.draft_car_commands("FFRFFFFRRL").ok())
+
+    # Validated fields are not checked again when the world is unchanged.
+    controller.simulator.validate_car_name = None
+    result = controller.commit_car_draft()
+    assert(result.ok() and controller.draft is None)
+    assert(controller.get_car_list() == ["- A, (1,2) N, FFRFFFFRRL"])
+
+def test_car_draft_world_changed():
+    """Name and position are validated again if the world changed since the draft started."""
+    controller = create_controller()
+    controller.start_car_draft()
+    controller.draft_car_name("A")
+    controller.draft_car_position_direction("1 2 N")
+    controller.draft_car_commands("F")
+
+    controller.add_car("B", "1 2 E", "F")
+    result = controller.commit_car_draft()
+    assert(not result.ok() and result.error == "Another car is already in position (1,2).")
+
+    controller.draft_car_position_direction("3 3 S")
+    result = controller.commit_car_draft()
+    assert(result.ok() and result.object.position.x == 3)
+
+def test_car_draft_incomplete():
+    """A draft without all fields is not committed."""
+    controller = create_controller()
+    controller.start_car_draft()
+    controller.draft_car_name("A")
+    assert(not controller.commit_car_draft().ok())
+    assert(controller.get_car_list() == [])
@@ -0,0 +1,107 @@
+import json
+import socket
+import threading
+
+from ..car_simulator_controller.cluster    import ClusterCoordinator, ClusterWorker, run_local_cluster, send_message
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator.scenario              import Scenario
+from ..utility.position                    import Vector2D, Direction
+
+def create_scenarios() -> list[Scenario]:
+    """Scenarios with a collision, a car moving alone and an invalid car."""
+    return [
+        Scenario(Vector2D(10, 10), [("A", Vector2D(1, 2), Direction.N, "FFRFFFFRRL"),
+                                    ("B", Vector2D(7, 8), Direction.W, "FFLFFFFFFF")]),
+        Scenario(Vector2D(5, 5),   [("C", Vector2D(0, 0), Direction.E, "FFFFFFFF")]),
+        Scenario(Vector2D(5, 5),   [("D", Vector2D(9, 9), Direction.E, "F")]),
+    ]
+
+def run_coordinator(coordinator: ClusterCoordinator, results: list):
+    """Run a coordinator in a thread."""
+    results.extend(coordinator.run(timeout = 30))
+
+def connect_faulty_worker(address: tuple[str, int]) -> socket.socket:
+    """Connect a worker that takes a shard and never answers."""
+    connection = socket.create_connection(address)
+    send_message(connection, {"type": "hello"})
+    message = json.loads(connection.makefile("rb").readline())
+    assert(message["type"] == "shard")
+    return connection
+
+def test_local_cluster():
+    """Shards are simulated by worker processes with the controller pipeline."""
+    results = run_local_cluster(create_scenarios(), workers = 2, timeout = 60, shard_size = 1)
+
+    controller = CarSimulatorController()
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "1 2 N", "FFRFFFFRRL")
+    controller.add_car("B", "7 8 W", "FFLFFFFFFF")
+    controller.run_simulation()
+
+    assert(results[0].ok() and results[0].object == controller.get_simulation_result())
+    assert(results[1].ok() and results[1].object == ["- C, (4,0) E"])
+    assert(not results[2].ok() and results[2].error.startswith("Car D:"))
+
+def test_cluster_retry_disconnected():
+    """A shard of a disconnected worker is handed to another worker."""
+    coordinator = ClusterCoordinator(create_scenarios()[:2], shard_size = 2)
+    address     = coordinator.start()
+    results     = []
+    thread      = threading.Thread(target = run_coordinator, args = (coordinator, results))
+    thread.start()
+
+    connect_faulty_worker(address).close()
+    assert(ClusterWorker(*address).run() == 1)
+    thread.join()
+
+    assert(coordinator.retries == 1)
+    assert(results[1].ok() and results[1].object == ["- C, (4,0) E"])
+
+def test_cluster_retry_heartbeat():
+    """A shard of a worker without heartbeats is handed to another worker."""
+    coordinator = ClusterCoordinator(create_scenarios()[1:2], heartbeat_timeout = 0.3)
+    address     = coordinator.start()
+    results     = []
+    thread      = threading.Thread(target = run_coordinator, args = (coordinator, results))
+    thread.start()
+
+    silent = connect_faulty_worker(address)
+    assert(ClusterWorker(*address, heartbeat_seconds = 0.05).run() == 1)
+    thread.join()
+    silent.close()
+
+    assert(coordinator.retries == 1)
+    assert(results[0].ok() and results[0].object == ["- C, (4,0) E"])
+
+def test_cluster_max_retries():
+    """Scenarios of a shard fail after the max number of retries."""
+    coordinator = ClusterCoordinator(create_scenarios()[1:2], max_retries = 0)
+    address     = coordinator.start()
+    results     = []
+    thread      = threading.Thread(target = run_coordinator, args = (coordinator, results))
+    thread.start()
+
+    connect_faulty_worker(address).close()
+    thread.join()
+
+    assert(not results[0].ok() and results[0].error == "Shard failed after 1 attempts. Worker disconnected.")
+
+def test_cluster_retry_malformed():
+    """A shard of a worker sending malformed messages is handed to another worker."""
+    coordinator = ClusterCoordinator(create_scenarios()[1:2])
+    address     = coordinator.start()
+    results     = []
+    thread      = threading.Thread(target = run_coordinator, args = (coordinator, results))
+    thread.start()
+
+    stranger = socket.create_connection(address)
+    stranger.sendall(b"hello there\n")
+    faulty   = connect_faulty_worker(address)
+    faulty.sendall(b'{"ok": true}\n')
+    assert(ClusterWorker(*address).run() == 1)
+    thread.join()
+    stranger.close()
+    faulty.close()
+
+    assert(coordinator.retries == 1)
+    assert(results[0].ok() and results[0].object == ["- C, (4,0) E"])
@@ -0,0 +1,61 @@
+import csv
+import json
+
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator.collision_enum        import CollisionMode
+
+def run_pile_up(collision_mode: CollisionMode = CollisionMode.CELL) -> CarSimulatorController:
+    """Four cars entering the same cell at step 1, and a later car hitting the pile-up."""
+    controller = CarSimulatorController(collision_mode)
+    controller.set_field_dimension("5 5")
+    controller.add_car("A", "2 1 N", "FF")
+    controller.add_car("B", "2 3 S", "FF")
+    controller.add_car("C", "1 2 E", "FF")
+    controller.add_car("D", "3 2 W", "FF")
+    controller.add_car("E", "2 4 S", "FFF")
+    controller.run_simulation()
+    return controller
+
+def test_collision_event_shared():
+    """Cars of a pile-up share one event, later cars get their own event."""
+    controller = run_pile_up()
+    events     = controller.simulator.collisions.events
+    cars       = {car.name: car for car in controller.simulator.world.cars}
+
+    assert(len(events) == 2)
+    assert(all(cars[name].collision_events == (events[0],) for name in "ABCD"))
+    assert(cars["E"].collision_events == (events[1],))
+    assert(controller.get_simulation_result() == ["- A, collides with B,C,D at (2,2) at step 1",
+                                                  "- B, collides with A,C,D at (2,2) at step 1",
+                                                  "- C, collides with A,B,D at (2,2) at step 1",
+                                                  "- D, collides with A,B,C at (2,2) at step 1",
+                                                  "- E, collides with A,B,C,D at (2,2) at step 2"])
+
+def test_collision_event_crossing():
+    """Head-on swaps are crossing events in edge mode."""
+    controller = CarSimulatorController(CollisionMode.EDGE)
+    controller.set_field_dimension("5 1")
+    controller.add_car("A", "1 0 E", "F")
+    controller.add_car("B", "2 0 W", "FF")
+    controller.run_simulation()
+
+    events = controller.simulator.collisions.events
+    assert(len(events) == 1 and events[0].crossing and events[0].get_sorted_names() == ["A", "B"])
+
+def test_export_collisions(tmp_path):
+    """Events exported as CSV edge list and JSON node-link graph."""
+    controller = run_pile_up()
+
+    assert(controller.export_collisions(str(tmp_path / "collisions.csv")).ok())
+    with open(tmp_path / "collisions.csv", newline = "") as file:
+        rows = list(csv.DictReader(file))
+    assert(len(rows) == 9)
+    assert(rows[0] == {"event": "0", "step": "1", "x": "2", "y": "2", "crossing": "0", "car": "A"})
+
+    assert(controller.export_collisions(str(tmp_path / "collisions.json")).ok())
+    with open(tmp_path / "collisions.json") as file:
+        graph = json.load(file)
+    assert(len(graph["nodes"]) == 7 and len(graph["links"]) == 9)
+    assert({"source": "car:E", "target": "event:1"} in graph["links"])
+
+    assert(not controller.export_collisions(str(tmp_path / "collisions.txt")).ok())
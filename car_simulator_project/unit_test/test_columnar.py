@@ -0,0 +1,52 @@
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator.columnar              import CONST_NPYMAGIC, CONST_NPYALIGN
+
+def test_export_results(tmp_path):
+    """Final state of a pile-up exported as columns and loaded back memory-mapped."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("5 5")
+    controller.add_car("A", "2 1 N", "FF")
+    controller.add_car("B", "2 3 S", "FF")
+    controller.add_car("C", "2 4 S", "FFF")
+    controller.add_car("D", "0 0 N", "FFR")
+    controller.add_car("E", "4 0 N", "F")
+    controller.add_car("F", "4 2 S", "F")
+    controller.run_simulation()
+
+    assert(controller.export_results(str(tmp_path)).ok())
+    results = controller.load_results(str(tmp_path)).object
+    assert(len(results) == 6)
+    assert(results.names == ["A", "B", "C", "D", "E", "F"])
+    assert(list(results.x) == [2, 2, 2, 0, 4, 4])
+    assert(list(results.y) == [2, 2, 2, 2, 1, 1])
+    assert(list(results.heading) == [0, 2, 2, 1, 0, 2])
+    assert(list(results.collided) == [1, 1, 1, 0, 1, 1])
+    assert(list(results.collision_step) == [1, 1, 2, -1, 1, 1])
+    assert(list(results.collision_group) == [0, 0, 0, -1, 1, 1])
+
+    # Column data is aligned after a .npy header.
+    data = (tmp_path / "x.npy").read_bytes()
+    assert(data.startswith(CONST_NPYMAGIC) and (len(data) - 6 * 8) % CONST_NPYALIGN == 0)
+
+    (tmp_path / "y.npy").write_bytes(b"x,y")
+    assert(not controller.load_results(str(tmp_path)).ok())
+
+def test_export_results_large_field(tmp_path):
+    """Positions past 32 bits are exported."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("3000000000 1")
+    controller.add_car("A", "2500000000 0 E", "FF")
+
+    controller.run_simulation()
+    assert(controller.export_results(str(tmp_path)).ok())
+    assert(list(controller.load_results(str(tmp_path)).object.x) == [2_500_000_002])
+
+def test_export_results_empty(tmp_path):
+    """An empty field exports empty columns."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("5 5")
+    controller.run_simulation()
+
+    assert(controller.export_results(str(tmp_path)).ok())
+    results = controller.load_results(str(tmp_path)).object
+    assert(len(results) == 0 and results.names == [] and list(results.collision_group) == [])
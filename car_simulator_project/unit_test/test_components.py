@@ -0,0 +1,58 @@
+import random
+
+from .simulation                 import simulate_scenario
+from ..car_simulator.components  import find_components, split_groups
+from ..car_simulator.car         import Car
+from ..car_simulator.scenario    import Scenario, generate_random_scenario
+from ..car_simulator.engine_enum import Engine
+from ..utility.position          import Vector2D, Direction
+from ..utility.command_enum      import Command
+
+def create_scenario(seed: int, cars: int, width: int, commands: int) -> Scenario:
+    """Random scenario dense enough for cars to collide."""
+    return generate_random_scenario(random.Random(seed), width, width, cars, commands, min_width = width, min_height = width,
+                                    min_cars = cars)
+
+def test_find_components():
+    """Cars are joined when their reach boxes overlap, directly or through other cars."""
+    dimension = Vector2D(20, 20)
+    car_a     = Car("A", Vector2D(0, 0), Direction.N, Command.string_to_commands("FF"))
+    car_b     = Car("B", Vector2D(0, 4), Direction.N, Command.string_to_commands("FF"))
+    car_c     = Car("C", Vector2D(0, 8), Direction.N, Command.string_to_commands("FF"))
+    car_d     = Car("D", Vector2D(15, 15), Direction.N, Command.string_to_commands("FF"))
+    car_e     = Car("E", Vector2D(10, 0), Direction.N, Command.string_to_commands(""))
+    assert(find_components([car_a, car_b, car_c, car_d, car_e], dimension) == [[0, 1, 2], [3], [4]])
+
+    groups = split_groups([[0, 1, 2], [3], [4]], [3, 3, 3, 3, 1], 2)
+    assert(groups == [[0, 1, 2], [3, 4]])
+
+def test_components_engine():
+    """Components simulated apart match a run of all the cars, including collisions
+    of components that run out of commands before the longest command."""
+    for seed in range(5):
+        scenario  = create_scenario(seed, 120, 40, 6)
+        positions = {position for _, position, _, _ in scenario.cars}
+        scenario.add_car("Long", next(Vector2D(x, 39) for x in range(40) if Vector2D(x, 39) not in positions), Direction.S, "L" * 40)
+
+        expected   = simulate_scenario(scenario, Engine.STEPWISE)
+        components = simulate_scenario(scenario, Engine.COMPONENTS)
+        assert(components.get_simulation_result() == expected.get_simulation_result())
+        assert(components.stats.steps == expected.stats.steps)
+        assert(components.stats.collisions == expected.stats.collisions)
+
+def test_components_last_step():
+    """A collision on the last command of a component is detected when another
+    component has longer commands."""
+    scenario = Scenario(Vector2D(30, 30), [("A", Vector2D(0, 0), Direction.N, "F"), ("B", Vector2D(0, 2), Direction.S, "F"),
+                                           ("C", Vector2D(29, 29), Direction.S, "LL")])
+    results  = simulate_scenario(scenario, Engine.COMPONENTS).get_simulation_result()
+    assert(results == simulate_scenario(scenario, Engine.STEPWISE).get_simulation_result())
+    assert(results[0] == "- A, collides with B at (0,1) at step 1")
+
+def test_components_workers():
+    """Components simulated by worker processes match a run of all the cars."""
+    scenario  = create_scenario(7, 200, 60, 6)
+    expected  = simulate_scenario(scenario, Engine.STEPWISE)
+    simulator = simulate_scenario(scenario, Engine.COMPONENTS, workers = 2)
+    assert(simulator.get_simulation_result() == expected.get_simulation_result())
+    assert(simulator.run_metadata["engine"] == "COMPONENTS")
@@ -0,0 +1,23 @@
+from ..car_simulator                import differential
+from ..car_simulator.differential   import run_differential, run_batch
+from ..car_simulator.collision_enum import CollisionMode
+
+def test_differential_engines_match():
+    """Alternate engines match the reference engine."""
+    for engine in differential.ENGINES:
+        assert(run_differential(engine, 500) is None)
+
+def test_differential_shrinks_divergence(monkeypatch):
+    """Divergence is reported at its first step and shrunk to a minimal case."""
+    def run_broken(scenario, collision_mode, trace):
+        """Batch engine always detecting head-on swaps."""
+        return run_batch(scenario, CollisionMode.EDGE, trace)
+
+    monkeypatch.setitem(differential.ENGINES, "broken", (run_broken, True))
+
+    divergence = run_differential("broken", 500)
+    assert(divergence is not None)
+    assert(divergence.collision_mode == CollisionMode.CELL)
+    assert(divergence.step is not None)
+    assert(len(divergence.scenario.cars) == 2)
+    assert(divergence.expected != divergence.actual)
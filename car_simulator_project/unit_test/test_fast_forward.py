@@ -0,0 +1,38 @@
+from ..car_simulator.fast_forward import fast_forward, compile_segments
+from ..car_simulator.reach        import find_isolated_cars
+from ..car_simulator.car          import Car
+from ..utility.position           import Vector2D, Direction
+from ..utility.command_enum       import Command
+
+def test_compile_segments():
+    """Commands compile into rotation and forward run segments."""
+    commands = Command.string_to_commands("FFRFFFLLLFRRRR")
+    assert(compile_segments(commands) == [(0, 2), (1, 3), (1, 1)])
+
+    commands = Command.string_to_commands("LRL")
+    assert(compile_segments(commands) == [(3, 0)])
+
+def test_fast_forward():
+    """Fast-forward clamps forward runs at the field bounds."""
+    dimension = Vector2D(10, 10)
+
+    commands = Command.string_to_commands("FFRFFFFRRL")
+    assert(fast_forward(Vector2D(1, 2), Direction.N, commands, dimension) == (Vector2D(5, 4), Direction.S))
+
+    # Moving beyond edge.
+    commands = Command.string_to_commands("FFFFFFFFFFFFRFFFFFFFFFFF")
+    assert(fast_forward(Vector2D(0, 0), Direction.N, commands, dimension) == (Vector2D(9, 9), Direction.E))
+
+    commands = Command.string_to_commands("LFFFLFFF")
+    assert(fast_forward(Vector2D(1, 1), Direction.N, commands, dimension) == (Vector2D(0, 0), Direction.S))
+
+def test_find_isolated_cars():
+    """Cars with overlapping reach boxes are not isolated."""
+    dimension = Vector2D(20, 20)
+
+    car_a = Car("A", Vector2D(0, 0),   Direction.N, Command.string_to_commands("FF"))
+    car_b = Car("B", Vector2D(4, 0),   Direction.N, Command.string_to_commands("FF"))  # Overlaps A at x = 2.
+    car_c = Car("C", Vector2D(10, 10), Direction.N, Command.string_to_commands("FF"))
+    car_d = Car("D", Vector2D(19, 19), Direction.N, [])
+
+    assert(find_isolated_cars([car_a, car_b, car_c, car_d], dimension) == [car_c, car_d])
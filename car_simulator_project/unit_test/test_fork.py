@@ -0,0 +1,81 @@
+import logging
+import random
+
+from .simulation                    import create_simulator, simulate_scenario
+from ..car_simulator.simulator      import CarSimulator
+from ..car_simulator.engine_enum    import Engine
+from ..car_simulator.collision_enum import CollisionMode
+from ..car_simulator.scenario       import Scenario, generate_random_scenario
+from ..utility.position             import Vector2D, Direction
+from ..utility.command_enum         import Command
+
+def test_fork_variants():
+    """Forks with replaced commands match runs from the start, and do not change the
+    run they were forked from."""
+    for seed in range(300):
+        rng            = random.Random(seed)
+        scenario       = generate_random_scenario(rng, 8, 8, 12, 12, min_width = 2, min_height = 2)
+        collision_mode = rng.choice(list(CollisionMode))
+        step           = rng.randint(0, 12)
+
+        parent = create_simulator(scenario, Engine.STEPWISE, collision_mode)
+        parent.simulate_until(step)
+
+        variants = []
+        for _ in range(3):
+            fork = parent.fork().object
+            if rng.random() < 0.5:
+                fork = fork.fork().object
+
+            variant = Scenario(scenario.dimension, list(scenario.cars))
+            if fork.simulating_cars:
+                name     = rng.choice([car.name for car in fork.simulating_cars])
+                commands = "".join(rng.choices("FFLR", k=rng.randint(0, 10)))
+                assert(fork.replace_commands(name, Command.string_to_commands(commands)).ok())
+                variant.cars = [(car_name, position, direction, car_commands[:step] + commands if car_name == name else car_commands)
+                                for car_name, position, direction, car_commands in scenario.cars]
+            variants.append((fork, variant))
+
+        if seed % 2:
+            for fork, _ in variants:
+                fork.resume()
+        parent.resume()
+
+        assert(parent.get_simulation_result() == simulate_scenario(scenario, Engine.STEPWISE, collision_mode).get_simulation_result())
+        for fork, variant in variants:
+            fork.resume()
+            assert(fork.get_simulation_result() == simulate_scenario(variant, Engine.STEPWISE, collision_mode).get_simulation_result())
+
+def test_fork_sharing():
+    """A fork stores only the cars and positions it changes."""
+    scenario = Scenario(Vector2D(20, 20), [(f"P{x}", Vector2D(x, 0), Direction.N, "") for x in range(20)])
+    scenario.add_car("A", Vector2D(0, 5), Direction.S, "FFFFFF")
+    scenario.add_car("B", Vector2D(19, 5), Direction.N, "FFFFFF")
+
+    parent = create_simulator(scenario, Engine.STEPWISE)
+    parent.simulate_until(2)
+    fork = parent.fork().object
+    assert(len(fork.world.cars.replaced) == 2 and not fork.world.static_map.local)
+
+    fork.resume()
+    assert(len(fork.world.cars.replaced) == 3 and len(fork.world.static_map.local) == 1)
+    assert(fork.get_simulation_result()[0] == "- P0, collides with A at (0,0) at step 5")
+
+    # Cars of the run forked from are unchanged.
+    assert(parent.world.cars[0].collision_events == ())
+    assert(not parent.replace_commands("P1", []).ok())
+    assert(not CarSimulator(logging.getLogger(__name__)).fork().ok())
+
+def test_replace_commands_status():
+    """Cached status of a car shows its replaced commands."""
+    scenario = Scenario(Vector2D(10, 10))
+    scenario.add_car("A", Vector2D(0, 0), Direction.N, "FFFF")
+    scenario.add_car("B", Vector2D(5, 0), Direction.N, "FF")
+
+    simulator = create_simulator(scenario, Engine.STEPWISE)
+    assert(simulator.get_cars_status() == ["- A, (0,0) N, FFFF", "- B, (5,0) N, FF"])
+
+    simulator.simulate_until(1)
+    assert(simulator.replace_commands("A", Command.string_to_commands("RF")).ok())
+    assert(simulator.get_cars_status() == ["- A, (0,0) N, FRF", "- B, (5,0) N, FF"])
+    assert(isinstance(simulator.world.cars[0].commands, tuple))
@@ -0,0 +1,77 @@
+import logging
+import random
+
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator.simulator             import CarSimulator
+from ..car_simulator.scenario              import Scenario, generate_random_scenario
+from ..car_simulator.history               import HistoryIndex
+from ..utility.position                    import Vector2D, Direction
+
+def simulate_with_history(scenario, history: HistoryIndex) -> tuple[HistoryIndex, list[dict]]:
+    """Simulate a scenario with history, returning positions of every car at every time."""
+    simulator = CarSimulator(logging.getLogger(__name__))
+    simulator.set_world_dimension(scenario.dimension)
+    simulator.add_cars(scenario.create_cars())
+    simulator.history = history
+
+    cars      = simulator.world.cars
+    positions = [{car.name: (car.position.x, car.position.y) for car in cars}]
+    simulator.step_observer = lambda step: positions.append({car.name: (car.position.x, car.position.y) for car in cars})
+    simulator.simulate()
+
+    return simulator.history, positions
+
+def test_history_queries():
+    """Region queries match brute force over every time."""
+    rng = random.Random(0)
+    for _ in range(50):
+        scenario = generate_random_scenario(rng, 40, 40, 10, 80)
+        history, positions = simulate_with_history(scenario, HistoryIndex(bucket_steps = 8, bucket_cells = 4))
+
+        for _ in range(20):
+            min_x, max_x = sorted(rng.randrange(40) for _ in range(2))
+            min_y, max_y = sorted(rng.randrange(40) for _ in range(2))
+            start, end   = sorted(rng.randrange(len(positions)) for _ in range(2))
+
+            expected = {name for time in range(start, end + 1) for name, (x, y) in positions[time].items()
+                        if min_x <= x <= max_x and min_y <= y <= max_y}
+            assert(history.query_region(min_x, min_y, max_x, max_y, start, end) == expected)
+
+def test_history_bounded():
+    """Oldest segments are evicted beyond the maximum number of segments."""
+    rng = random.Random(1)
+    scenario = generate_random_scenario(rng, 40, 40, 10, 200)
+    history, positions = simulate_with_history(scenario, HistoryIndex(max_segments = 20))
+
+    assert(len(history.segments) <= 20)
+    assert(history.complete_from > 0)
+
+    # Queries on complete history are still exact.
+    time = len(positions) - 1
+    for name, (x, y) in positions[time].items():
+        assert(name in history.query_region(x, y, x, y, time, time))
+
+def test_history_static_time_index():
+    """A parked car is one stationary entry, keyed by the time bucket it parks in and
+    skipped by queries after it leaves."""
+    scenario = Scenario(Vector2D(10, 10), [("A", Vector2D(0, 0), Direction.N, ""),
+                                           ("B", Vector2D(5, 0), Direction.N, "L" * 20 + "FF")])
+    history, _ = simulate_with_history(scenario, HistoryIndex(bucket_steps = 4, bucket_cells = 4))
+
+    parked = history.static_buckets[(0, 0)]
+    assert(list(parked) == [0] and len(parked[0]) == 1 and parked[0][0][0] == 22)
+    assert(history.query_region(5, 0, 5, 0, 20, 22) == {"B"})
+    assert(history.query_region(5, 0, 5, 0, 21, 22) == set())
+
+def test_query_history_evicted():
+    """Queries from a step of evicted history are refused."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "0 0 N", "FRFLFRFLFRFLFRFL")
+    controller.enable_history(max_segments = 4)
+    controller.run_simulation()
+
+    complete_from = controller.simulator.history.complete_from
+    result        = controller.query_history(0, 0, 9, 9, 0, 16)
+    assert(complete_from > 0 and not result.ok() and f"before step {complete_from}" in result.error)
+    assert(controller.query_history(0, 0, 9, 9, complete_from, 16).object == ["A"])
@@ -0,0 +1,65 @@
+import json
+import urllib.request
+
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator_controller.metrics    import MetricsRegistry
+
+def run_controller(registry: MetricsRegistry) -> CarSimulatorController:
+    """Run a scenario with a collision and a rejected car, with metrics enabled."""
+    controller = CarSimulatorController()
+    controller.enable_metrics(registry)
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "1 2 N", "FFRFFFFRRL")
+    controller.add_car("B", "7 8 W", "FFLFFFFFFF")
+    controller.add_car("C", "20 20 N", "F")
+    controller.run_simulation()
+    return controller
+
+def test_metrics_run():
+    """Runs and rejected inputs are recorded once per run and per input."""
+    registry   = MetricsRegistry()
+    controller = run_controller(registry)
+    metrics    = controller.metrics
+
+    assert(metrics.scenarios.value == 1 and metrics.cars.value == 2)
+    assert(metrics.steps.value == controller.simulator.stats.steps)
+    assert(metrics.collisions.value == 2)
+    assert(metrics.parse_errors.value == 1)
+    assert(metrics.latency.count == 1 and metrics.steps_per_second.value > 0)
+
+    # Metrics of another controller are recorded in the same registry.
+    run_controller(registry)
+    assert(metrics.scenarios.value == 2 and metrics.latency.count == 2)
+
+def test_metrics_prometheus():
+    """Metrics are served in Prometheus text format with cumulative buckets."""
+    registry = MetricsRegistry()
+    run_controller(registry)
+    registry.histogram("latency_seconds", "Latency.", (0.1, 1.0)).observe(0.5)
+
+    host, port = registry.serve()
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            assert(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+            text = response.read().decode()
+    finally:
+        registry.close()
+
+    lines = text.splitlines()
+    assert("# TYPE car_simulator_scenarios_total counter" in lines)
+    assert("car_simulator_scenarios_total 1" in lines)
+    assert("car_simulator_parse_errors_total 1" in lines)
+    assert(('latency_seconds_bucket{le="0.1"} 0', 'latency_seconds_bucket{le="1.0"} 1', 'latency_seconds_bucket{le="+Inf"} 1')
+           == tuple(line for line in lines if line.startswith("latency_seconds_bucket")))
+
+def test_metrics_dump(tmp_path):
+    """Metrics are dumped as JSON once more when the dump is stopped."""
+    output   = tmp_path / "metrics.json"
+    registry = MetricsRegistry()
+    registry.start_dump(str(output), seconds = 60)
+    run_controller(registry)
+    registry.close()
+
+    metrics = json.loads(output.read_text())["metrics"]
+    assert(metrics["car_simulator_scenarios_total"] == 1)
+    assert(metrics["car_simulator_simulate_seconds"]["count"] == 1)
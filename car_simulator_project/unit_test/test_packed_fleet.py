@@ -0,0 +1,73 @@
+from ..car_simulator.packed_fleet    import PackedFleet
+from ..car_simulator.batch_simulator import BatchSimulator
+from ..car_simulator.scenario        import Scenario
+from ..utility.position              import Vector2D, Direction
+
+def test_packed_fleet():
+    """Names and commands read back from the shared buffers."""
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 1, 2, Direction.N, "FFRFFFFRRL")
+    fleet.add_car(0, "Bé", 7, 8, Direction.W, "")
+
+    assert(len(fleet) == 2)
+    assert(fleet.get_name(0) == "A" and fleet.get_name(1) == "Bé")
+    assert(fleet.get_commands(0) == "FFRFFFFRRL" and fleet.get_commands(1) == "")
+    assert(fleet.get_command_length(0) == 10 and fleet.get_command_length(1) == 0)
+    assert(fleet.nbytes() > 0)
+
+def test_batch_simulator_packed_fleet():
+    """Packed fleet simulated as one scenario."""
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 1, 2, Direction.N, "FFRFFFFRRL")
+    fleet.add_car(0, "B", 7, 8, Direction.W, "FFLFFFFFFF")
+    fleet.add_car(0, "C", 0, 0, Direction.E, "FF")
+
+    simulator = BatchSimulator()
+    simulator.add_fleet(Vector2D(10, 10), fleet)
+    simulator.simulate()
+
+    assert(simulator.fleet is fleet)
+    assert(simulator.get_simulation_results() == [["- A, collides with B at (5,4) at step 7",
+                                                   "- B, collides with A at (5,4) at step 7",
+                                                   "- C, (2,0) E"]])
+
+def test_packed_fleet_shared_commands():
+    """Identical commands share one range of the buffer, also across extended fleets,
+    and the index of distinct commands is counted."""
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 0, 0, Direction.N, "FFLR")
+    fleet.add_car(0, "B", 1, 0, Direction.N, "FFLR")
+    other = PackedFleet()
+    other.add_car(0, "C", 2, 0, Direction.N, "RRF")
+    other.add_car(0, "D", 3, 0, Direction.N, "FFLR")
+    fleet.extend(other)
+
+    assert(bytes(fleet.command_buffer) == b"FFLRRRF")
+    assert([fleet.get_commands(car) for car in range(4)] == ["FFLR", "FFLR", "RRF", "FFLR"])
+    assert(fleet.nbytes() > len(fleet.command_buffer) + 4 * (8 + 8 + 8 + 1 + 8 + 8 + 4))
+
+def test_batch_simulator_packed_fleet_large_field():
+    """Positions beyond 32 bits are stored and simulated."""
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 2_500_000_000, 0, Direction.E, "FFF")
+    fleet.add_car(0, "B", 2_500_000_004, 0, Direction.W, "FFF")
+
+    simulator = BatchSimulator()
+    simulator.add_fleet(Vector2D(3_000_000_000, 1), fleet)
+    simulator.simulate()
+
+    assert(simulator.get_simulation_results() == [["- A, collides with B at (2500000002,0) at step 2",
+                                                   "- B, collides with A at (2500000002,0) at step 2"]])
+
+def test_batch_simulator_packed_fleet_after_empty_scenario():
+    """A fleet added after a scenario without cars runs on its own field."""
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 1, 1, Direction.N, "FFFFFF")
+    fleet.add_car(0, "B", 1, 4, Direction.S, "FFFFFF")
+
+    simulator = BatchSimulator()
+    simulator.add_scenario(Scenario(Vector2D(3, 3), []))
+    assert(simulator.add_fleet(Vector2D(10, 10), fleet) == 1)
+    simulator.simulate()
+
+    assert(list(simulator.fleet.scenario_ids) == [1, 1] and list(simulator.fleet.ys) == [7, 0])
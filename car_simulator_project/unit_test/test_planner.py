@@ -0,0 +1,68 @@
+import logging
+import random
+
+from .simulation                    import simulate_scenario
+from ..car_simulator.simulator      import CarSimulator
+from ..car_simulator.scenario       import Scenario, generate_random_scenario
+from ..car_simulator.engine_enum    import Engine
+from ..car_simulator.occupancy_enum import OccupancyBackend
+from ..car_simulator.collision_enum import CollisionMode
+from ..car_simulator.planner        import plan_simulation
+from ..utility.position             import Vector2D, Direction
+
+def create_scenario(cars: int, width: int, height: int, commands: int) -> Scenario:
+    """Random scenario of a shape."""
+    return generate_random_scenario(random.Random(0), width, height, cars, commands, min_width = width, min_height = height,
+                                    min_cars = cars, min_commands = commands)
+
+def test_planner_choices():
+    """Engine and occupancy backend chosen by scenario shape."""
+    small  = simulate_scenario(create_scenario(5, 10, 10, 20)).run_metadata
+    dense  = simulate_scenario(create_scenario(400, 40, 40, 100)).run_metadata
+    sparse = simulate_scenario(create_scenario(2000, 20_000, 20_000, 200)).run_metadata
+    solo   = simulate_scenario(create_scenario(50, 1_000_000, 1_000_000, 500)).run_metadata
+
+    assert((small["engine"], small["overridden"]) == ("FAST_FORWARD", False))
+    assert((dense["engine"], dense["occupancy_backend"]) == ("BATCH", "GRID"))
+    assert((sparse["engine"], sparse["occupancy_backend"]) == ("BATCH", "HASH"))
+    assert(solo["engine"] == "FAST_FORWARD")
+    assert(all(metadata["reasons"] for metadata in (small, dense, sparse, solo)))
+
+def test_planner_large_field():
+    """Fields with coordinates past 32 bits are packed, fields with more cells than the
+    packed cell ids fit are not."""
+    cars = Scenario(Vector2D(3_000_000_000, 1), [(f"C{index}", Vector2D(2_500_000_000 + index, 0), Direction.E, "F" * 600)
+                                                 for index in range(20)]).create_cars()
+
+    plan = plan_simulation(cars, Vector2D(3_000_000_000, 1), False, False, False)
+    assert(plan.engine == Engine.BATCH)
+
+    plan = plan_simulation(cars, Vector2D(5_000_000_000, 5_000_000_000), False, False, False)
+    assert(plan.engine == Engine.STEPWISE and "too large for the cell ids" in plan.reasons[0])
+
+    plan = plan_simulation(cars, Vector2D(5_000_000_000, 5_000_000_000), False, False, False, workers = 4)
+    assert(plan.engine == Engine.STEPWISE and plan.occupancy_backend == OccupancyBackend.HASH)
+
+def test_planner_override():
+    """Manual override, ignored when history needs the stepwise engine."""
+    simulator = CarSimulator(logging.getLogger(__name__))
+    simulator.set_engine(Engine.BATCH, OccupancyBackend.HASH)
+    simulator.set_world_dimension(Vector2D(10, 10))
+    simulator.simulate()
+    assert((simulator.run_metadata["engine"], simulator.run_metadata["occupancy_backend"]) == ("BATCH", "HASH"))
+    assert(simulator.run_metadata["overridden"])
+
+    simulator.enable_history()
+    simulator.simulate()
+    assert(simulator.run_metadata["engine"] == "STEPWISE")
+
+def test_planner_batch_write_back():
+    """Batch results written back to the cars match the stepwise engine."""
+    for collision_mode in CollisionMode:
+        scenario = create_scenario(300, 30, 30, 40)
+        batch    = simulate_scenario(scenario, Engine.BATCH, collision_mode)
+        stepwise = simulate_scenario(scenario, Engine.STEPWISE, collision_mode)
+
+        assert(batch.get_simulation_result() == stepwise.get_simulation_result())
+        assert(batch.stats.steps == stepwise.stats.steps)
+        assert(batch.stats.collisions == stepwise.stats.collisions)
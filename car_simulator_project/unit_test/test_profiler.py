@@ -0,0 +1,45 @@
+from ..car_simulator_controller.controller import CarSimulatorController
+
+def test_profile_report(tmp_path):
+    """Profiling reports phases, step histogram, counters and memory."""
+    cprofile_output = tmp_path / "simulation.prof"
+
+    controller = CarSimulatorController()
+    controller.enable_profiling(cprofile_output)
+
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "1 2 N", "FFRFFFFRRL")
+    controller.add_car("B", "7 8 W", "FFLFFFFFFF")
+    controller.run_simulation()
+    controller.get_simulation_result()
+
+    report = controller.get_profile_report()
+    for phase in ("parsing", "simulate", "update_simulation_cars", "simulate_step", "move_car", "result_formatting"):
+        assert(report["phases"][phase]["calls"] > 0)
+
+    assert(sum(report["step_histogram"].values()) == report["phases"]["simulate_step"]["calls"])
+    counters = report["counters"]
+    assert((counters["steps"], counters["moves"], counters["rotations"], counters["wall_bumps"], counters["collisions"]) == (7, 12, 2, 0, 2))
+    assert(report["memory"]["peak_bytes"] > 0)
+    assert(cprofile_output.is_file())
+
+    # Instrumentation removed on disable.
+    controller.disable_profiling()
+    assert("add_car" not in vars(controller))
+    assert("simulate_step" not in vars(controller.simulator))
+    assert(controller.get_profile_report() is None)
+
+def test_profile_report_batch():
+    """Runs on packed arrays are timed as a whole and report their engine."""
+    controller = CarSimulatorController()
+    controller.enable_profiling()
+    controller.set_field_dimension("200 200")
+    for index in range(200):
+        controller.add_car(f"C{index}", f"{index} {index % 50} N", "FFRFFLFFRR" * 10)
+    controller.run_simulation()
+
+    report = controller.get_profile_report()
+    assert(report["engine"] == "BATCH")
+    assert(report["phases"]["simulate_batch"]["calls"] == 1 and report["phases"]["simulate_batch"]["seconds"] > 0)
+    controller.disable_profiling()
+    assert("simulate_batch" not in vars(controller.simulator))
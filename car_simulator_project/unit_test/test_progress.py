@@ -0,0 +1,50 @@
+import asyncio
+
+from ..car_simulator_controller.controller import CarSimulatorController
+from ..car_simulator.engine_enum           import Engine
+
+def create_controller(engine: Engine | None = None) -> CarSimulatorController:
+    """Two cars colliding at step 7."""
+    controller = CarSimulatorController()
+    controller.simulator.set_engine(engine)
+    controller.set_field_dimension("10 10")
+    controller.add_car("A", "1 2 N", "FFRFFFFRRL")
+    controller.add_car("B", "7 8 W", "FFLFFFFFFF")
+    return controller
+
+def test_simulate_iter_slices():
+    """Progress yielded every slice, with the same result as a blocking run."""
+    for engine in (Engine.STEPWISE, Engine.BATCH):
+        controller = create_controller(engine)
+        steps      = [progress.step for progress in controller.iterate_simulation(slice_steps = 2, slice_ms = None)]
+
+        assert(steps == [2, 4, 6])
+        assert(controller.get_simulation_result() == ["- A, collides with B at (5,4) at step 7",
+                                                      "- B, collides with A at (5,4) at step 7"])
+
+def test_simulate_iter_pause_cancel():
+    """A run resumes where it paused, and closing it cancels the run."""
+    controller = create_controller(Engine.STEPWISE)
+    run        = controller.iterate_simulation(slice_steps = 2, slice_ms = None)
+
+    assert(next(run).step == 2)
+    assert(controller.simulator.stats.steps == 2)
+    assert(next(run).step == 4)
+
+    run.close()
+    assert(controller.simulator.stats.steps == 4)
+    assert(controller.get_simulation_result() == ["- A, (2,4) E", "- B, (5,7) S"])
+
+def test_run_simulation_async_interleaved():
+    """Several runs interleave on one event loop."""
+    controllers = [create_controller(Engine.STEPWISE), create_controller(Engine.BATCH)]
+    updates     = []
+
+    async def run_all():
+        await asyncio.gather(*(controller.run_simulation_async(0, lambda progress, index = index: updates.append(index))
+                               for index, controller in enumerate(controllers)))
+
+    asyncio.run(run_all())
+
+    assert(updates[:4] == [0, 1, 0, 1])
+    assert(all(controller.get_simulation_result()[0] == "- A, collides with B at (5,4) at step 7" for controller in controllers))
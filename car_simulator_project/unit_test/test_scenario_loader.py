@@ -0,0 +1,58 @@
+from ..car_simulator_controller.controller      import CarSimulatorController
+from ..car_simulator_controller.scenario_loader import load_scenario_file
+from ..utility.position                         import Vector2D
+
+def write_scenario(tmp_path, lines: list[str]) -> str:
+    """Write a scenario file and return its path."""
+    path = tmp_path / "scenario.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_load_scenario_file_chunks(tmp_path):
+    """Small chunks merge into the same fleet as one chunk, in file order."""
+    lines = ["30 30"] + [f"C{i}, {i} {i % 7} N, FFRL" for i in range(30)]
+    path  = write_scenario(tmp_path, lines)
+
+    single  = load_scenario_file(path, workers = 1)
+    chunked = load_scenario_file(path, workers = 1, chunk_bytes = 16)
+    assert(single.ok() and chunked.ok())
+
+    dimension, fleet = chunked.object
+    assert(dimension == Vector2D(30, 30))
+    assert(len(fleet) == 30 and fleet.get_name(29) == "C29" and fleet.get_commands(0) == "FFRL")
+    assert(list(fleet.xs) == list(single.object[1].xs) and list(fleet.ys) == list(single.object[1].ys))
+
+def test_load_scenario_file_parallel(tmp_path):
+    """Chunks parsed in worker processes report errors with original line numbers."""
+    lines = ["10 10", "A, 1 2 N, FFRFFFFRRL", "", "B, 1 2 W, FF", "C, 3 x N, F",
+             "A, 4 4 E, FX", "A, 5 5 E, F", "D, 10 0 S, F"]
+    path  = write_scenario(tmp_path, lines)
+
+    result = load_scenario_file(path, workers = 2, chunk_bytes = 8)
+    assert(not result.ok())
+    assert(result.error.split("\n") == ["Line 4: Another car is already in position (1,2).",
+                                        "Line 5: Y position must be an integer.",
+                                        "Line 6: Command 'X' is not valid. Valid commands are ['L', 'R', 'F'].",
+                                        "Line 7: Car with name A already exists.",
+                                        "Line 8: Position (10,0) is out of the field bounds."])
+
+def test_controller_load_scenario_file(tmp_path):
+    """Loaded cars are added to the simulator."""
+    path = write_scenario(tmp_path, ["10 10", "A, 1 2 N, FFRFFFFRRL", "B, 7 8 W, FFLFFFFFFF"])
+
+    controller = CarSimulatorController()
+    assert(controller.load_scenario_file(path, workers = 1).ok())
+
+    controller.run_simulation()
+    assert(controller.get_simulation_result() == ["- A, collides with B at (5,4) at step 7",
+                                                  "- B, collides with A at (5,4) at step 7"])
+
+def test_controller_load_scenario_file_invalid(tmp_path):
+    """A file with cars clashing with the field is not applied, the field is unchanged."""
+    controller = CarSimulatorController()
+    controller.set_field_dimension("20 20")
+    controller.add_car("A", "15 15 N", "F")
+
+    path = write_scenario(tmp_path, ["10 10", "A, 1 2 N, FF"])
+    assert(controller.load_scenario_file(path, workers = 1).error == "Car with name A already exists.")
+    assert(controller.simulator.world.dimension == Vector2D(20, 20) and len(controller.simulator.world.cars) == 1)
@@ -0,0 +1,76 @@
+import logging
+
+from ..car_simulator.simulator      import CarSimulator
+from ..car_simulator.car            import Car
+from ..car_simulator.collision_enum import CollisionMode
+from ..utility.position             import Vector2D, Direction
+from ..utility.command_enum         import Command
+
+def create_simulator(width: int = 10, height: int = 10) -> CarSimulator:
+    """Create a simulator with a world of width x height."""
+    simulator = CarSimulator(logging.getLogger(__name__))
+    simulator.set_world_dimension(Vector2D(width, height))
+    return simulator
+
+def test_simulator_add_cars():
+    """Batch of valid cars is added together."""
+    simulator = create_simulator()
+
+    cars   = [Car("A", Vector2D(1, 1), Direction.N, []),
+              Car("B", Vector2D(2, 2), Direction.E, [])]
+    result = simulator.add_cars(cars)
+    assert(result.ok())
+    assert(simulator.world.cars == cars)
+
+def test_simulator_add_cars_rejected():
+    """Invalid batch reports every problem and adds nothing."""
+    simulator = create_simulator()
+    simulator.add_car(Car("A", Vector2D(0, 0), Direction.N, []))
+
+    cars   = [Car("A", Vector2D(1, 1), Direction.N, []),  # Existing name.
+              Car("B", Vector2D(0, 0), Direction.N, []),  # Existing position.
+              Car("C", Vector2D(5, 5), Direction.N, []),
+              Car("C", Vector2D(5, 5), Direction.N, []),  # Duplicated name and position.
+              Car("D", Vector2D(10, 3), Direction.N, [])] # Out of bounds.
+    result = simulator.add_cars(cars)
+    assert(not result.ok())
+
+    errors = result.error.split("\n")
+    assert("Car with name A already exists." in errors)
+    assert("Another car is already in position (0,0)." in errors)
+    assert("Car with name C is duplicated in the batch." in errors)
+    assert("Position (5,5) is duplicated in the batch." in errors)
+    assert("Position (10,3) is out of the field bounds." in errors)
+    assert(len(errors) == 5)
+    assert(len(simulator.world.cars) == 1)
+
+def test_simulator_head_on_swap():
+    """Cars swapping cells head-on only collide in edge crossing mode."""
+    for collision_mode, collided in [(CollisionMode.CELL, False), (CollisionMode.EDGE, True)]:
+        simulator = CarSimulator(logging.getLogger(__name__), collision_mode)
+        simulator.set_world_dimension(Vector2D(10, 10))
+
+        car_a = Car("A", Vector2D(1, 1), Direction.E, Command.string_to_commands("FF"))
+        car_b = Car("B", Vector2D(2, 1), Direction.W, Command.string_to_commands("FF"))
+        simulator.add_cars([car_a, car_b])
+        simulator.simulate()
+
+        assert(car_a.has_collided() == collided)
+        assert(car_b.has_collided() == collided)
+
+    assert(car_a.get_current_status() == "A, collides with B at (2,1) at step 1")
+    assert(car_b.get_current_status() == "B, collides with A at (1,1) at step 1")
+
+def test_simulator_collision_with_finished_car():
+    """Car driving into a car without remaining commands collides with it."""
+    simulator = create_simulator()
+
+    car_a = Car("A", Vector2D(0, 0), Direction.N, Command.string_to_commands("F"))
+    car_b = Car("B", Vector2D(3, 1), Direction.W, Command.string_to_commands("FFFFF"))
+    car_c = Car("C", Vector2D(9, 9), Direction.S, Command.string_to_commands("LL"))
+    simulator.add_cars([car_a, car_b, car_c])
+    simulator.simulate()
+
+    assert(simulator.get_simulation_result() == ["- A, collides with B at (0,1) at step 3",
+                                                 "- B, collides with A at (0,1) at step 3",
+                                                 "- C, (9,9) N"])
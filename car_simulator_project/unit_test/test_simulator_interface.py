@@ -2,7 +2,7 @@ import sys
 from pathlib import Path
 
 from .config                             import *
-from ..car_simulator_interface.interface import CarSimulatorInterface
+from ..car_simulator_interface.interface import CarSimulatorInterface, CONST_CARLISTPAGESIZE
 
 def interface_run():
     """Run the test interface."""
@@ -40,4 +40,30 @@ def test_simulator_interface(capsys):
 
         assert stdout.out == expected, f"Test file input: {test_input.name}, output: {test_output.name} failed."
 
-    sys.stdin = sys_stdin
\ No newline at end of file
+    sys.stdin = sys_stdin
+
+def test_car_list_incremental(capsys):
+    """Car list renders only new cars and shows the last page of long lists.
+
+    Arguments:
+        capsys: Captures stdout from car simulator interface.
+    """
+    interface = CarSimulatorInterface()
+    interface.controller.set_field_dimension("100 100")
+    for index in range(CONST_CARLISTPAGESIZE + 2):
+        interface.controller.add_car(f"C{index}", f"{index} 0 N", "F")
+        interface.display_car_list()
+    interface.flush_output()
+
+    assert(len(interface.car_lines) == CONST_CARLISTPAGESIZE + 2)
+    assert(interface.controller.simulator.world.cars[0].initial_status == "C0, (0,0) N, F")
+
+    last_list = capsys.readouterr().out.split("Your current list of cars are:\n")[-1]
+    lines     = last_list.splitlines()
+    assert(lines[0] == "... 2 earlier cars not shown.")
+    assert(lines[1] == "- C2, (2,0) N, F" and lines[CONST_CARLISTPAGESIZE] == f"- C{CONST_CARLISTPAGESIZE + 1}, ({CONST_CARLISTPAGESIZE + 1},0) N, F")
+
+    interface.display_simulation_result()
+    interface.flush_output()
+    result_list = capsys.readouterr().out.split("Your current list of cars are:\n")[-1].split("After simulation")[0]
+    assert(result_list.splitlines()[0] == "- C0, (0,0) N, F" and len(result_list.split("\n- ")) == CONST_CARLISTPAGESIZE + 2)
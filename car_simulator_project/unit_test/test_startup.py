@@ -0,0 +1,13 @@
+import subprocess
+import sys
+from pathlib import Path
+
+def test_startup_lazy_imports():
+    """Launch path does not import profiling, argument parsing or logging."""
+    code = ("import sys, car_simulator_project.__main__ as m; "
+            "from car_simulator_project.car_simulator_interface.interface import CarSimulatorInterface; "
+            "CarSimulatorInterface(); "
+            "print(*(name in sys.modules for name in ('argparse', 'cProfile', 'tracemalloc', 'logging')))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parents[2],
+                            capture_output=True, text=True, check=True)
+    assert(result.stdout.split() == ["False", "False", "False", "False"])
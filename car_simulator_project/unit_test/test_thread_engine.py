@@ -0,0 +1,41 @@
+import random
+
+from .simulation                    import simulate_scenario
+from ..car_simulator                import simulator as simulator_module, planner
+from ..car_simulator.scenario       import Scenario, generate_random_scenario
+from ..car_simulator.engine_enum    import Engine
+from ..car_simulator.collision_enum import CollisionMode
+from ..car_simulator.thread_engine  import split_shards
+
+def create_scenario(cars: int, side: int) -> Scenario:
+    """Random dense scenario."""
+    return generate_random_scenario(random.Random(0), side, side, cars, 30, min_width = side, min_height = side, min_cars = cars)
+
+def test_split_shards():
+    """Shards are contiguous and keep the order of the cars."""
+    assert(split_shards(list(range(10)), 4) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]])
+    assert(split_shards([], 4) == [])
+
+def test_thread_engine_fallback():
+    """The planner only chooses threads on a free-threaded interpreter, an override
+    plans the moves in this thread."""
+    scenario = create_scenario(2000, 80)
+    assert(simulate_scenario(scenario, None, CollisionMode.CELL, history = True, threads = 4).run_metadata["engine"] == "STEPWISE")
+
+    simulator = simulate_scenario(scenario, Engine.THREADS, CollisionMode.CELL, history = True, threads = 4)
+    assert(simulator.run_metadata["engine"] == "THREADS")
+    assert("planned in this thread" in simulator.run_metadata["reasons"][-1])
+    assert(simulator.get_simulation_result() == simulate_scenario(scenario, None, CollisionMode.CELL, history = True).get_simulation_result())
+
+def test_thread_engine(monkeypatch):
+    """Moves planned by a thread pool and merged in order match stepping every car."""
+    monkeypatch.setattr(simulator_module, "is_free_threaded", lambda: True)
+    monkeypatch.setattr(planner, "is_free_threaded", lambda: True)
+
+    scenario = create_scenario(2000, 80)
+    for collision_mode in CollisionMode:
+        expected  = simulate_scenario(scenario, None, collision_mode, history = True)
+        simulator = simulate_scenario(scenario, None, collision_mode, history = True, threads = 4)
+        assert(simulator.run_metadata["engine"] == "THREADS")
+        assert(simulator.get_simulation_result() == expected.get_simulation_result())
+        assert(simulator.stats.to_dict() == expected.stats.to_dict())
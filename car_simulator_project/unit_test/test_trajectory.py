@@ -0,0 +1,97 @@
+import logging
+import random
+
+from ..car_simulator.trajectory   import TrajectoryTemplate, TemplateCache
+from ..car_simulator.reach        import find_isolated_cars
+from ..car_simulator.car          import Car
+from ..car_simulator.packed_fleet import PackedFleet
+from ..car_simulator.simulator    import CarSimulator
+from ..car_simulator.scenario     import Scenario
+from ..car_simulator.engine_enum  import Engine
+from ..utility.position           import Vector2D, Direction
+from ..utility.command_enum       import Command
+
+def test_template_path():
+    """Template positions and directions match running the commands step by step."""
+    commands = "FFRFFFLLLFRRRRF"
+    template = TrajectoryTemplate(tuple(Command.string_to_commands(commands)), Direction.N)
+    car      = Car("A", Vector2D(0, 0), Direction.N, Command.string_to_commands(commands))
+    for step, command in enumerate(car.commands):
+        assert(template.get_position(Vector2D(0, 0), step) == car.position)
+        assert(template.get_direction(step) == car.direction)
+        match command:
+            case Command.L:
+                car.rotate_left()
+            case Command.R:
+                car.rotate_right()
+            case Command.F:
+                car.position = car.get_new_forward_position()
+
+    assert(template.get_position(Vector2D(0, 0), len(commands)) == car.position == Vector2D(3, 0))
+    assert(template.get_direction(len(commands)) == car.direction == Direction.S)
+    assert(template.get_reach_box(Vector2D(0, 0)) == (0, 0, 3, 2))
+
+def test_template_fits():
+    """A path fits the field only if no move is blocked by the field bounds."""
+    template  = TrajectoryTemplate(tuple(Command.string_to_commands("FFRFF")), Direction.N)
+    dimension = Vector2D(5, 5)
+    assert(template.fits(Vector2D(0, 0), dimension))
+    assert(template.fits(Vector2D(2, 2), dimension))
+    assert(not template.fits(Vector2D(3, 0), dimension))
+    assert(not template.fits(Vector2D(0, 3), dimension))
+
+    empty = TrajectoryTemplate((), Direction.E)
+    assert(empty.fits(Vector2D(4, 4), dimension) and empty.get_direction(0) == Direction.E)
+
+def test_template_sharing():
+    """Identical commands share one immutable command tuple, one template and one buffer range."""
+    assert(Command.string_to_commands("FFLR") is Command.string_to_commands("FFLR"))
+    assert(isinstance(Command.string_to_commands("FFLR"), tuple))
+
+    templates = TemplateCache()
+    first     = templates.get(Command.string_to_commands("FFLR"), Direction.N)
+    assert(templates.get(Command.string_to_commands("FFLR"), Direction.N) is first)
+    assert(templates.get(Command.string_to_commands("FFLR"), Direction.S) is not first)
+    assert(len(templates) == 2 and templates.hits == 1)
+
+    fleet = PackedFleet()
+    fleet.add_car(0, "A", 0, 0, Direction.N, "FFLR")
+    fleet.add_car(0, "B", 1, 0, Direction.N, "FFLR")
+    fleet.add_car(0, "C", 2, 0, Direction.N, "")
+    other = PackedFleet()
+    other.add_car(0, "D", 3, 0, Direction.N, "")
+    other.add_car(0, "E", 4, 0, Direction.N, "RR")
+    other.add_car(0, "F", 5, 0, Direction.N, "FFLR")
+    fleet.extend(other)
+    assert(len(fleet.command_buffer) == 6)
+    assert([fleet.get_commands(car) for car in range(len(fleet))] == ["FFLR", "FFLR", "", "", "RR", "FFLR"])
+
+def test_template_reach():
+    """Cars on straight paths away from each other are isolated by their path boxes."""
+    dimension = Vector2D(20, 20)
+    car_a     = Car("A", Vector2D(5, 5), Direction.S, Command.string_to_commands("FFFF"))
+    car_b     = Car("B", Vector2D(7, 5), Direction.N, Command.string_to_commands("FFFF"))
+    assert(find_isolated_cars([car_a, car_b], dimension) == [])
+    assert(find_isolated_cars([car_a, car_b], dimension, templates = TemplateCache()) == [car_a, car_b])
+
+def test_template_fast_forward():
+    """Fast-forward with shared templates gives the same results as the stepwise engine."""
+    rng       = random.Random(0)
+    width     = 400
+    routes    = ["".join(rng.choices("FFFLR", k=60)) for _ in range(5)]
+    cells     = rng.sample(range(width * width), 300)
+    scenario  = Scenario(Vector2D(width, width), [(f"C{index}", Vector2D(cell % width, cell // width),
+                                                   rng.choice(list(Direction)), rng.choice(routes))
+                                                  for index, cell in enumerate(cells)])
+
+    results = []
+    for engine in (Engine.STEPWISE, Engine.FAST_FORWARD):
+        simulator = CarSimulator(logging.getLogger(__name__))
+        simulator.set_engine(engine)
+        simulator.set_world_dimension(scenario.dimension)
+        simulator.add_cars(scenario.create_cars())
+        simulator.simulate()
+        results.append(simulator.get_simulation_result())
+
+    assert(results[0] == results[1])
+    assert(simulator.stats.fast_forwarded > 0 and len(simulator.templates) <= 20)
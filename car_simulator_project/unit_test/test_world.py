@@ -43,4 +43,28 @@ def test_world_out_of_bounds():
     assert(world.out_of_bounds(Vector2D(101, 51))   == True)
     assert(world.out_of_bounds(Vector2D(101, 0))    == True)
     assert(world.out_of_bounds(Vector2D(0, 51))     == True)
-    assert(world.out_of_bounds(Vector2D(1000, 500)) == True)
\ No newline at end of file
+    assert(world.out_of_bounds(Vector2D(1000, 500)) == True)
+
+def test_world_compacting_index():
+    """Test empty positions are deleted and retired cars stay obstacles."""
+    world = World()
+    world.dimension = Vector2D(10, 10)
+
+    car_a = Car("A", Vector2D(3, 3), Direction.N, [])
+    car_b = Car("B", Vector2D(5, 5), Direction.N, [])
+    world.add_car(car_a)
+    world.add_car(car_b)
+
+    # Left position is deleted.
+    world.move_car(car_a, Vector2D(3, 4))
+    assert(world.has_car_at_position(Vector2D(3, 3)) == False)
+    assert(world.get_index_size() == (2, 0))
+
+    # Retired car is still an obstacle.
+    world.retire_car(car_b)
+    assert(world.get_index_size() == (1, 1))
+    assert(world.has_car_at_position(Vector2D(5, 5)) == True)
+
+    world.move_car(car_a, Vector2D(5, 5))
+    assert(world.is_car_collided(car_a) == True)
+    assert(world.get_collided_cars(car_a) == [car_b])
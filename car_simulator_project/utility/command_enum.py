@@ -1,5 +1,6 @@
-from enum   import Enum
-from typing import Self
+from enum      import Enum
+from functools import lru_cache
+from typing    import Self
 
 class Command(Enum):
     """Car Commands."""
@@ -18,10 +19,13 @@ class Command(Enum):
         return "".join(command.name for command in commands)
     
     @staticmethod
-    def string_to_commands(commands: str) -> list[Self]:
+    @lru_cache(maxsize = 4096)
+    def string_to_commands(commands: str) -> tuple[Self, ...]:
         """Converts string to commands.
+
+        Identical strings share one immutable tuple of commands.
         
         Returns:
-            list[Command]: List of car commands.
+            tuple[Command, ...]: Tuple of car commands.
         """
-        return [Command[command] for command in commands]
\ No newline at end of file
+        return tuple(Command[command] for command in commands)
\ No newline at end of file
@@ -4,4 +4,41 @@ def get_root_package() -> str:
     Returns:
         str: Directory name of current package.
     """
-    return __package__.split(".")[0]
\ No newline at end of file
+    return __package__.split(".")[0]
+
+class LazyLogger:
+    """Logger proxy that sets up the real logger on first use.
+
+    Logger methods are cached on the proxy after first use, so later calls cost 
+    the same as calling the real logger.
+
+    Attributes:
+        setup: (Callable) Function setting up and returning the real logger.
+        logger: (logging.Logger) The real logger, None until first use.
+    """
+
+    def __init__(self, setup):
+        """Initialization.
+
+        Arguments:
+            setup: (Callable) Function setting up and returning the real logger.
+        """
+        self.setup  = setup
+        self.logger = None
+
+    def __getattr__(self, name: str):
+        """Get attribute of the real logger, setting it up if needed.
+
+        Arguments:
+            name: (str) Attribute name.
+
+        Returns:
+            Attribute of the real logger.
+        """
+        if self.logger is None:
+            self.logger = self.setup()
+
+        value = getattr(self.logger, name)
+        if callable(value):
+            setattr(self, name, value)
+        return value
@@ -0,0 +1,9 @@
+import sys
+
+from car_simulator_project.benchmark.benchmark import main
+
+# Run benchmarks.
+try:
+    sys.exit(main())
+except KeyboardInterrupt:
+    pass
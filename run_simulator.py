@@ -1,19 +1,15 @@
-from pathlib import Path
-import sys, subprocess
+import sys
 
-CONST_PROJNAME    = "car_simulator_project"
-CONST_WIN32       = "win32"
-cwd               = Path.cwd()
-project_directory = cwd / CONST_PROJNAME
+from car_simulator_project.__main__ import main
 
-# Install requirements.
-subprocess.run(['pip', 'install', '-r', 'requirements.txt'], cwd=project_directory)
+CONST_CLEARCONSOLE = "\033[2J\033[H" # ANSI clear screen and move cursor home.
 
-# Clear console.
-subprocess.run("cls" if sys.platform == CONST_WIN32 else "clear", shell=True)
+# Clear console without spawning a shell.
+if sys.stdout.isatty():
+    print(CONST_CLEARCONSOLE, end="", flush=True)
 
-# Run simulator.
+# Run simulator in process.
 try:
-    subprocess.run(['py', '-m', CONST_PROJNAME], cwd=cwd)
+    main()
 except KeyboardInterrupt:
-    pass
\ No newline at end of file
+    pass